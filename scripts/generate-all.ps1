@@ -67,6 +67,11 @@ if (-not $SkipJava) {
 }
 if (-not $SkipPython) {
   Invoke-Generator -Generator "python" -ConfigPath "config/openapi-generator/python.yaml" -OutputPath "sdks/python/generated"
+  Write-Host "Generating Python SDK models"
+  python (Join-Path $repoRoot "sdks/python/scripts/generate_models.py")
+  if ($LASTEXITCODE -ne 0) {
+    throw "Model generation failed for Python"
+  }
 }
 
 Write-Host "All requested generators completed."
@@ -0,0 +1,70 @@
+"""Memory held by bulk results as models versus a ``PaymentBatch``.
+
+Run with ``python benchmarks/bench_batch.py [count]`` from ``sdks/python``. Each
+payment is decoded from a JSON body the way a bulk read would receive it.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from delopay import PaymentBatch, PaymentResponse  # noqa: E402
+
+STATUSES = ("COMPLETED", "FAILED", "PENDING", "REFUNDED")
+CURRENCIES = ("EUR", "USD", "GBP")
+
+
+def body(index: int) -> bytes:
+    return json.dumps(
+        {
+            "paymentId": f"9f1c2b7e-0000-4000-8000-{index:012d}",
+            "clientOrderId": f"order_{index:08d}",
+            "provider": "STRIPE",
+            "status": STATUSES[index % len(STATUSES)],
+            "amount": round(index % 10_000 / 100, 2),
+            "amountPaid": 0.0,
+            "currency": CURRENCIES[index % len(CURRENCIES)],
+            "description": f"Order {index}",
+            "customerEmail": f"customer{index}@example.com",
+            "checkoutUrl": f"https://checkout.example.com/{index}",
+            "providerPaymentId": f"pi_{index}",
+            "createdAt": "2026-01-01T12:00:00Z",
+            "expiresAt": "2026-01-01T12:30:00Z",
+            "metadata": {"cart": f"c_{index}", "channel": "web", "items": "3"},
+        }
+    ).encode("utf-8")
+
+
+def measure(build) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return held / 1e6, elapsed
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    bodies = [body(index) for index in range(count)]
+
+    models_mb, models_s = measure(
+        lambda: [PaymentResponse.from_dict(json.loads(raw)) for raw in bodies]
+    )
+    batch_mb, batch_s = measure(lambda: PaymentBatch(json.loads(raw) for raw in bodies))
+
+    print(f"{count} payments")
+    print(f"list[PaymentResponse] {models_mb:8.1f} MB  {models_s:5.2f} s")
+    print(f"PaymentBatch          {batch_mb:8.1f} MB  {batch_s:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
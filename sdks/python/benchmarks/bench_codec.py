@@ -0,0 +1,74 @@
+"""Micro-benchmark of per-request JSON cost for each codec.
+
+Run with ``python benchmarks/bench_codec.py`` from ``sdks/python``. Each
+round encodes a create-payment payload and decodes a payment response, which
+is the JSON work one ``payments.create`` call does.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from delopay.codec import OrjsonCodec, StdlibCodec, orjson  # noqa: E402
+
+REQUEST = {
+    "clientOrderId": "order_000123",
+    "amount": 49.99,
+    "currency": "EUR",
+    "provider": "STRIPE",
+    "description": "Order 000123",
+    "customerEmail": "customer@example.com",
+    "callbackUrl": "https://merchant.example.com/delopay/callbacks",
+    "metadata": {"cart": "c_42", "channel": "web", "items": "3"},
+}
+RESPONSE = json.dumps(
+    {
+        **REQUEST,
+        "paymentId": "pay_0f9c2b7e",
+        "status": "PENDING",
+        "amountPaid": 0,
+        "checkoutUrl": "https://checkout.example.com/pay_0f9c2b7e",
+        "providerPaymentId": "pi_3NzQ",
+        "createdAt": "2026-01-01T12:00:00Z",
+        "expiresAt": "2026-01-01T12:30:00Z",
+    }
+).encode("utf-8")
+
+
+def str_pipeline() -> None:
+    json.dumps(REQUEST).encode("utf-8")
+    json.loads(RESPONSE.decode("utf-8"))
+
+
+def codec_pipeline(codec) -> None:
+    codec.dumps(REQUEST)
+    codec.loads(RESPONSE)
+
+
+def measure(func, number: int = 50_000) -> float:
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main() -> None:
+    stdlib = StdlibCodec()
+    results = {
+        "stdlib via str (previous)": measure(str_pipeline),
+        "StdlibCodec (bytes)": measure(lambda: codec_pipeline(stdlib)),
+    }
+    if orjson is not None:
+        fast = OrjsonCodec()
+        results["OrjsonCodec"] = measure(lambda: codec_pipeline(fast))
+
+    baseline = results["stdlib via str (previous)"]
+    for name, micros in results.items():
+        print(f"{name:28} {micros:6.2f} us/request  {baseline / micros:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Generate ``src/delopay/models.py`` from ``openapi/openapi.json``.
+
+Run ``python scripts/generate_models.py`` from ``sdks/python`` after the spec
+changes, or pass ``--check`` to fail (exit 1) when the committed models have
+drifted from the spec.
+
+Schemas used as a request body get a ``to_payload`` encoder that omits unset
+fields; every other object schema gets a ``from_dict`` decoder. Both are
+emitted as straight-line code specialised to the schema, so no generic
+``asdict``/filter pass runs per object. String enums become ``StrEnum``
+classes; decoders map known values onto members and keep unknown values as
+plain strings so a newer server never breaks an older client. The models in
+``LAZY_MODELS`` also get a ``Lazy`` subclass whose fields are read-through
+properties over the wrapped response.
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SPEC = ROOT.parents[1] / "openapi" / "openapi.json"
+OUTPUT = ROOT / "src" / "delopay" / "models.py"
+
+# Fields the SDK sends that the published spec does not describe yet.
+EXTRA_PROPERTIES: dict[str, dict[str, Any]] = {
+    "UpdatePaymentRequest": {
+        "amount": {"type": "number"},
+        "amountPaid": {"type": "number"},
+        "currency": {"type": "string"},
+        "status": {"$ref": "#/components/schemas/PaymentStatus"},
+    },
+}
+
+HEADER = """\
+# Generated by scripts/generate_models.py from openapi/openapi.json.
+# Do not edit by hand; run ``python scripts/generate_models.py`` instead.
+"""
+
+# Response models that also get a ``Lazy`` read-through variant.
+LAZY_MODELS = ("PaymentResponse", "RefundResponse")
+
+LAZY_BODY = """\
+    __slots__ = ("_raw", "_data", "_codec")
+
+    def __init__(
+        self, raw: dict[str, Any] | bytes, codec: JsonCodec | None = None
+    ) -> None:
+        if isinstance(raw, dict):
+            self._raw = raw
+        else:
+            self._data = bytes(raw)
+            self._codec = codec
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for ``_raw`` while the wrapped bytes are still undecoded.
+        if name != "_raw":
+            raise AttributeError(name)
+        raw = (self._codec or _DEFAULT_CODEC).loads(self._data)
+        if not isinstance(raw, dict):
+            raise ValueError("response body must be a JSON object")
+        self._raw = raw
+        del self._data
+        return raw
+
+    def materialize(self) -> {name}:
+        return {name}.from_dict(self._raw)"""
+
+PREAMBLE = """\
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+
+from .codec import JsonCodec, default_codec
+
+_DEFAULT_CODEC = default_codec()
+
+
+def _members(enum: type[StrEnum]) -> dict[Any, Any]:
+    return {member.value: member for member in enum}"""
+
+PRIMITIVES = {"string": "str", "number": "float", "integer": "int", "boolean": "bool"}
+
+
+def snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def constant_case(name: str) -> str:
+    return snake_case(name).upper()
+
+
+class Generator:
+    def __init__(self, spec: dict[str, Any]) -> None:
+        self.schemas: dict[str, dict[str, Any]] = spec["components"]["schemas"]
+        self.requests = self._request_schemas(spec)
+        self.enums = [name for name, schema in self.schemas.items() if "enum" in schema]
+        self.lines: list[str] = []
+
+    @staticmethod
+    def _request_schemas(spec: dict[str, Any]) -> set[str]:
+        names = set()
+        for operations in spec["paths"].values():
+            for operation in operations.values():
+                content = operation.get("requestBody", {}).get("content", {})
+                for media in content.values():
+                    names.add(media["schema"]["$ref"].rsplit("/", 1)[1])
+        return names
+
+    def render(self) -> str:
+        self.lines = [HEADER, PREAMBLE]
+        for name in self.enums:
+            self._enum(name)
+        for name, schema in self.schemas.items():
+            if name in self.enums:
+                continue
+            properties = {**schema["properties"], **EXTRA_PROPERTIES.get(name, {})}
+            if name in self.requests:
+                self._request(name, properties, set(schema.get("required", ())))
+            else:
+                self._response(name, properties)
+        for name in LAZY_MODELS:
+            self._lazy(name, self.schemas[name]["properties"])
+        return "\n".join(self.lines) + "\n"
+
+    def _emit(self, *lines: str) -> None:
+        self.lines.extend(lines)
+
+    def _enum(self, name: str) -> None:
+        self._emit("", "", f"class {name}(StrEnum):")
+        for value in self.schemas[name]["enum"]:
+            self._emit(f'    {value} = "{value}"')
+        self._emit("", "", f"_{constant_case(name)}_BY_VALUE = _members({name})")
+
+    def _ref(self, prop: dict[str, Any]) -> str | None:
+        ref = prop.get("$ref")
+        return ref.rsplit("/", 1)[1] if ref else None
+
+    def _annotation(self, prop: dict[str, Any]) -> str:
+        ref = self._ref(prop)
+        if ref in self.enums:
+            return f"{ref} | str"
+        if ref:
+            return ref
+        kind = prop["type"]
+        if kind == "array":
+            return f"list[{self._annotation(prop['items'])}]"
+        if kind == "object":
+            return "dict[str, Any]"
+        return PRIMITIVES[kind]
+
+    def _request(
+        self, name: str, properties: dict[str, Any], required: set[str]
+    ) -> None:
+        ordered = [key for key in properties if key in required]
+        ordered += [key for key in properties if key not in required]
+
+        self._emit("", "", "@dataclass(slots=True)", f"class {name}:")
+        for key in ordered:
+            annotation = self._annotation(properties[key])
+            if key in required:
+                self._emit(f"    {snake_case(key)}: {annotation}")
+            else:
+                self._emit(f"    {snake_case(key)}: {annotation} | None = None")
+
+        self._emit("", "    def to_payload(self) -> dict[str, Any]:")
+        self._emit("        payload: dict[str, Any] = {}")
+        for key in ordered:
+            attribute = snake_case(key)
+            self._emit(
+                f"        if self.{attribute} is not None:",
+                f'            payload["{key}"] = self.{attribute}',
+            )
+        self._emit("        return payload")
+
+    def _response(self, name: str, properties: dict[str, Any]) -> None:
+        self._emit("", "", "@dataclass(slots=True)", f"class {name}:")
+        for key, prop in properties.items():
+            annotation = self._annotation(prop)
+            kind = prop.get("type")
+            if kind == "array":
+                default = "field(default_factory=list)"
+            elif kind == "object":
+                default = "field(default_factory=dict)"
+            elif kind == "boolean":
+                default = "False"
+            elif kind == "integer":
+                default = "0"
+            else:
+                annotation += " | None"
+                default = "None"
+            self._emit(f"    {snake_case(key)}: {annotation} = {default}")
+
+        self._emit(
+            "",
+            "    @staticmethod",
+            f'    def from_dict(raw: dict[str, Any]) -> "{name}":',
+            "        get = raw.get",
+        )
+        enum_keys = [
+            key for key, prop in properties.items() if self._ref(prop) in self.enums
+        ]
+        for key in enum_keys:
+            self._emit(f'        {snake_case(key)} = get("{key}")')
+        # Positional arguments in field order: keyword parsing costs more than
+        # the dict lookups themselves.
+        self._emit(f"        return {name}(")
+        for key, prop in properties.items():
+            line = f"            {self._decoder(key, prop)},"
+            item = self._ref(prop.get("items", {}))
+            if len(line) > 88 and item:
+                # Reflow the comprehension the way black does.
+                self._emit(
+                    "            [",
+                    f"                {item}.from_dict(item)",
+                    f'                for item in get("{key}") or ()',
+                    "            ],",
+                )
+            else:
+                self._emit(line)
+        self._emit("        )")
+
+    def _lazy(self, name: str, properties: dict[str, Any]) -> None:
+        self._emit(
+            "",
+            "",
+            f"class Lazy{name}({name}):",
+            f'    """``{name}`` that decodes each field when it is read."""',
+            "",
+            LAZY_BODY.replace("{name}", name),
+        )
+        for key, prop in properties.items():
+            attribute = snake_case(key)
+            annotation = self._annotation(prop)
+            ref = self._ref(prop)
+            kind = prop.get("type")
+            if kind == "array" and self._ref(prop["items"]):
+                raise ValueError(f"{name}.{key}: lazy nested models are unsupported")
+            if kind not in ("array", "object"):
+                annotation += " | None"
+            self._emit(
+                "",
+                "    @property",
+                f"    def {attribute}(self) -> {annotation}:",
+            )
+            if ref is not None and ref in self.enums:
+                self._emit(
+                    f'        value = self._raw.get("{key}")',
+                    f"        return _{constant_case(ref)}_BY_VALUE.get(value, value)",
+                )
+            elif kind in ("array", "object"):
+                # Stored back so that in-place changes to the default persist.
+                empty = "[]" if kind == "array" else "{}"
+                self._emit(
+                    f'        value = self._raw.get("{key}")',
+                    "        if value is None:",
+                    f'            value = self._raw["{key}"] = {empty}',
+                    "        return value",
+                )
+            else:
+                self._emit(f'        return self._raw.get("{key}")')
+            self._emit(
+                "",
+                f"    @{attribute}.setter",
+                f"    def {attribute}(self, value: {annotation}) -> None:",
+                f'        self._raw["{key}"] = value',
+            )
+
+    def _decoder(self, key: str, prop: dict[str, Any]) -> str:
+        ref = self._ref(prop)
+        attribute = snake_case(key)
+        if ref is not None and ref in self.enums:
+            return f"_{constant_case(ref)}_BY_VALUE.get({attribute}, {attribute})"
+        kind = prop.get("type")
+        if kind == "array":
+            item = self._ref(prop["items"])
+            if item:
+                return f'[{item}.from_dict(item) for item in get("{key}") or ()]'
+            return f'list(get("{key}") or ())'
+        if kind == "object":
+            return f'get("{key}") or {{}}'
+        if kind == "boolean":
+            return f'bool(get("{key}", False))'
+        if kind == "integer":
+            return f'int(get("{key}", 0))'
+        return f'get("{key}")'
+
+
+def generate(spec_path: Path = SPEC) -> str:
+    spec = json.loads(spec_path.read_text(encoding="utf-8"))
+    return Generator(spec).render()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with status 1 if models.py differs from the generated output",
+    )
+    args = parser.parse_args(argv)
+
+    expected = generate()
+    if not args.check:
+        OUTPUT.write_text(expected, encoding="utf-8")
+        return 0
+
+    current = OUTPUT.read_text(encoding="utf-8")
+    if current == expected:
+        return 0
+    diff = difflib.unified_diff(
+        current.splitlines(keepends=True),
+        expected.splitlines(keepends=True),
+        fromfile=str(OUTPUT.relative_to(ROOT)),
+        tofile="generated",
+    )
+    sys.stdout.writelines(diff)
+    print("models.py is out of date; run python scripts/generate_models.py")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,21 @@
-from .client import DelopayClient
+from .batch import PaymentBatch, PaymentRow
+from .cache import CacheStats, ResponseCache, TTLCache
+from .callbacks import CallbackReceiver, ReceiverStats
+from .circuit import CircuitBreaker, CircuitState
+from .client import AsyncDelopayClient, DelopayClient
+from .codec import JsonCodec, OrjsonCodec, StdlibCodec
 from .errors import ApiError
+from .hedge import HedgePolicy, HedgeStats
+from .idempotency import IdempotencyJournal, IdempotencyRecord
+from .metrics import RequestMetrics, RequestStats
 from .models import (
     CreatePaymentRequest,
+    LazyPaymentResponse,
+    LazyRefundResponse,
     PaymentMethodsResponse,
+    PaymentProviderType,
     PaymentResponse,
+    PaymentStatus,
     ProviderClientConfig,
     ProviderInfo,
     ProviderListResponse,
@@ -12,18 +24,65 @@ from .models import (
     ResendCallbacksResponse,
     UpdatePaymentRequest,
 )
+from .outbox import OutboxEntry, OutboxStats, PaymentOutbox
+from .polling import PollSchedule, StatusEvent
+from .ratelimit import RateLimiter, SharedTokenBucket, TokenBucket
+from .retry import RetryBudget
+from .sharding import ShardedExecutor, ShardStats
+from .sharedcache import SharedCache
+from .store import PaymentStore, StoreStats
+from .tenants import DelopayClientFactory, TenantClient
 
 __all__ = [
     "ApiError",
+    "AsyncDelopayClient",
+    "CacheStats",
+    "CallbackReceiver",
+    "CircuitBreaker",
+    "CircuitState",
     "CreatePaymentRequest",
     "DelopayClient",
+    "DelopayClientFactory",
+    "HedgePolicy",
+    "HedgeStats",
+    "IdempotencyJournal",
+    "IdempotencyRecord",
+    "JsonCodec",
+    "LazyPaymentResponse",
+    "LazyRefundResponse",
+    "OrjsonCodec",
+    "OutboxEntry",
+    "OutboxStats",
+    "PaymentBatch",
     "PaymentMethodsResponse",
+    "PaymentOutbox",
+    "PaymentProviderType",
     "PaymentResponse",
+    "PaymentRow",
+    "PaymentStatus",
+    "PaymentStore",
+    "PollSchedule",
     "ProviderClientConfig",
     "ProviderInfo",
     "ProviderListResponse",
+    "RateLimiter",
+    "ReceiverStats",
     "RefundPaymentRequest",
     "RefundResponse",
+    "RequestMetrics",
+    "RequestStats",
     "ResendCallbacksResponse",
+    "ResponseCache",
+    "RetryBudget",
+    "ShardStats",
+    "ShardedExecutor",
+    "SharedCache",
+    "SharedTokenBucket",
+    "StatusEvent",
+    "StdlibCodec",
+    "StoreStats",
+    "TTLCache",
+    "TenantClient",
+    "TokenBucket",
     "UpdatePaymentRequest",
 ]
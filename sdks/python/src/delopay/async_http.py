@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import asyncio
+import ssl
+import time
+from http.client import HTTPMessage, parse_headers
+from io import BytesIO
+from typing import Any
+from urllib.parse import urlsplit
+
+from . import forksafe
+from .codec import JsonCodec, default_codec
+from .errors import ApiError
+from .http import IDEMPOTENT_METHODS, api_error, backoff_delay, build_url
+from .pool import DEFAULT_PORTS, PoolKey, is_replayable
+
+MAX_LINE_BYTES = 65_536
+NETWORK_ERRORS = (
+    OSError,
+    TimeoutError,
+    asyncio.IncompleteReadError,
+    asyncio.LimitOverrunError,
+)
+STALE_ERRORS = (
+    asyncio.IncompleteReadError,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class AsyncResponse:
+    __slots__ = ("status", "reason", "headers", "body")
+
+    def __init__(
+        self, status: int, reason: str, headers: HTTPMessage, body: bytes
+    ) -> None:
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "last_used")
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    def is_dropped(self) -> bool:
+        return self.reader.at_eof() or self.writer.is_closing()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    """HTTP/1.1 keep-alive pool on asyncio streams, keyed by origin."""
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 10,
+        idle_timeout: float = 60.0,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self._maxsize = maxsize
+        self._idle_timeout = idle_timeout
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._idle: dict[PoolKey, list[_Connection]] = {}
+        self._closed = False
+        forksafe.register(self)
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None,
+        timeout: float,
+    ) -> AsyncResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+
+        key = (scheme, parts.hostname.lower(), parts.port or DEFAULT_PORTS[scheme])
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        head = _encode_head(method, target, parts.netloc, headers, body)
+        replayable = is_replayable(method, headers)
+
+        async with asyncio.timeout(timeout):
+            for attempt in range(2):
+                conn, reused = await self._acquire(key)
+                sent = False
+                try:
+                    conn.writer.write(head)
+                    if body:
+                        conn.writer.write(body)
+                    await conn.writer.drain()
+                    sent = True
+                    status_line = await conn.reader.readuntil(b"\r\n")
+                except STALE_ERRORS:
+                    conn.close()
+                    # The server closed an idle keep-alive socket; retry once on a
+                    # fresh connection, unless the server may already have acted
+                    # on a request that is unsafe to send twice.
+                    if reused and attempt == 0 and (replayable or not sent):
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+
+                try:
+                    response, keep_alive = await _read_response(
+                        conn.reader, method, status_line
+                    )
+                except BaseException:
+                    conn.close()
+                    raise
+
+                if keep_alive:
+                    self._release(key, conn)
+                else:
+                    conn.close()
+                return response
+
+        raise ConnectionError("connection pool exhausted reconnect attempts")
+
+    def idle_count(self) -> int:
+        return sum(len(bucket) for bucket in self._idle.values())
+
+    async def aclose(self) -> None:
+        self._closed = True
+        connections = [conn for bucket in self._idle.values() for conn in bucket]
+        self._idle.clear()
+
+        for conn in connections:
+            conn.close()
+        for conn in connections:
+            try:
+                await conn.writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+    def _after_fork(self) -> None:
+        # Idle streams are bound to the parent's event loop and cannot be used
+        # or closed from here; the child opens its own.
+        self._idle = {}
+
+    async def _acquire(self, key: PoolKey) -> tuple[_Connection, bool]:
+        bucket = self._idle.get(key)
+        now = time.monotonic()
+        while bucket:
+            conn = bucket.pop()
+            if now - conn.last_used > self._idle_timeout or conn.is_dropped():
+                conn.close()
+                continue
+            return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            reader, writer = await asyncio.open_connection(
+                host, port, ssl=self._ssl_context, server_hostname=host
+            )
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return _Connection(reader, writer), False
+
+    def _release(self, key: PoolKey, conn: _Connection) -> None:
+        bucket = self._idle.setdefault(key, [])
+        if self._closed or len(bucket) >= self._maxsize:
+            conn.close()
+            return
+
+        conn.last_used = time.monotonic()
+        bucket.append(conn)
+
+
+class AsyncHttpClient:
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        base_url: str,
+        timeout_ms: int,
+        max_retries: int,
+        pool: AsyncConnectionPool | None = None,
+        json_codec: JsonCodec | None = None,
+    ) -> None:
+        if not api_key:
+            raise ValueError("api_key is required")
+
+        self._api_key = api_key
+        self._base_url = base_url
+        self._timeout_seconds = timeout_ms / 1000
+        self._max_retries = max_retries
+        self._pool = pool or AsyncConnectionPool()
+        self._codec = json_codec or default_codec()
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        payload: dict[str, Any] | None = None,
+        query: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        method_upper = method.upper()
+        retries = self._max_retries if method_upper in IDEMPOTENT_METHODS else 0
+
+        for attempt in range(retries + 1):
+            try:
+                response = await self._send_once(method_upper, path, payload, query)
+            except NETWORK_ERRORS as exc:
+                if attempt < retries:
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+
+                raise ApiError(
+                    status=0, message="Network request failed", raw=str(exc)
+                ) from exc
+
+            if 200 <= response.status < 300:
+                if not response.body:
+                    return None
+                return self._codec.loads(response.body)
+
+            if response.status >= 500 and attempt < retries:
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            raise api_error(
+                response.status,
+                response.reason,
+                response.headers,
+                response.body,
+                self._codec,
+            )
+
+        raise ApiError(status=0, message="Request exhausted retries")
+
+    async def _send_once(
+        self,
+        method: str,
+        path: str,
+        payload: dict[str, Any] | None,
+        query: dict[str, Any] | None,
+    ) -> AsyncResponse:
+        url = build_url(self._base_url, path, query)
+        data = self._codec.dumps(payload) if payload is not None else None
+
+        headers = {
+            "Authorization": f"Bearer {self._api_key}",
+            "Accept": "application/json",
+        }
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+
+        return await self._pool.send(method, url, headers, data, self._timeout_seconds)
+
+
+def _encode_head(
+    method: str,
+    target: str,
+    host: str,
+    headers: dict[str, str],
+    body: bytes | None,
+) -> bytes:
+    lines = [f"{method} {target} HTTP/1.1", f"Host: {host}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    if body is not None or method in {"POST", "PUT", "PATCH"}:
+        lines.append(f"Content-Length: {len(body or b'')}")
+    lines.append("\r\n")
+    return "\r\n".join(lines).encode("latin-1")
+
+
+async def _read_response(
+    reader: asyncio.StreamReader, method: str, status_line: bytes
+) -> tuple[AsyncResponse, bool]:
+    version, _, rest = status_line.decode("latin-1").rstrip("\r\n").partition(" ")
+    status_text, _, reason = rest.partition(" ")
+    if not version.startswith("HTTP/") or not status_text.isdigit():
+        raise ConnectionError(f"malformed status line: {status_line!r}")
+    status = int(status_text)
+    headers = await read_headers(reader)
+
+    connection = (headers.get("Connection") or "").lower()
+    keep_alive = version == "HTTP/1.1" and connection != "close"
+
+    if method == "HEAD" or status in {204, 304} or 100 <= status < 200:
+        body = b""
+    elif "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+        body = await read_chunked(reader)
+    elif headers.get("Content-Length") is not None:
+        body = await reader.readexactly(int(headers["Content-Length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+
+    return AsyncResponse(status, reason, headers, body), keep_alive
+
+
+async def read_headers(reader: asyncio.StreamReader) -> HTTPMessage:
+    """Read an HTTP/1.1 header block up to its blank line."""
+    header_bytes = bytearray()
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        header_bytes += line
+        if len(header_bytes) > MAX_LINE_BYTES:
+            raise ConnectionError("headers too large")
+    return parse_headers(BytesIO(bytes(header_bytes) + b"\r\n"))
+
+
+class BodyTooLargeError(Exception):
+    """Raised when a message body exceeds the reader's byte limit."""
+
+
+async def read_chunked(
+    reader: asyncio.StreamReader, max_bytes: int | None = None
+) -> bytes:
+    """Read a chunked body, raising ``BodyTooLargeError`` once it passes ``max_bytes``.
+
+    The limit also covers each chunk-size line, and is checked against the
+    declared chunk size before that chunk is read.
+    """
+    body = bytearray()
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        if max_bytes is not None and len(size_line) > max_bytes:
+            raise BodyTooLargeError
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError as exc:
+            raise ConnectionError(f"malformed chunk size: {size_line!r}") from exc
+        if size == 0:
+            break
+        if max_bytes is not None and len(body) + size > max_bytes:
+            raise BodyTooLargeError
+        body += await reader.readexactly(size)
+        await reader.readexactly(2)
+
+    # Discard trailers up to the terminating blank line.
+    trailer_bytes = 0
+    while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+        trailer_bytes += len(line)
+        if max_bytes is not None and trailer_bytes > max_bytes:
+            raise BodyTooLargeError
+    return bytes(body)
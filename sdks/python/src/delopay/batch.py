@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import fields
+from operator import attrgetter
+from typing import Any
+
+from .codec import JsonCodec, StdlibCodec
+from .errors import ApiError
+from .models import LazyPaymentResponse, PaymentResponse
+
+COLUMNS = tuple(field.name for field in fields(PaymentResponse))
+NUMERIC_COLUMNS = ("amount", "amount_paid")
+CATEGORICAL_COLUMNS = ("status", "currency", "provider")
+METADATA_COLUMN = "metadata"
+OBJECT_COLUMNS = tuple(
+    name
+    for name in COLUMNS
+    if name not in NUMERIC_COLUMNS
+    and name not in CATEGORICAL_COLUMNS
+    and name != METADATA_COLUMN
+)
+_COLUMN_SET = frozenset(COLUMNS)
+_read_objects = attrgetter(*OBJECT_COLUMNS)
+# orjson returns small outputs in ~1 KiB buffers; stdlib output is exact-size.
+_DEFAULT_CODEC = StdlibCodec()
+
+
+class _Categories:
+    __slots__ = ("values", "codes")
+
+    def __init__(self) -> None:
+        # Code 0 is reserved for a missing value.
+        self.values: list[Any] = [None]
+        self.codes: dict[Any, int] = {None: 0}
+
+    def code(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class PaymentRow:
+    """View of one payment in a ``PaymentBatch``.
+
+    Reads the same attributes as ``PaymentResponse`` straight from the batch
+    columns; ``materialize()`` builds the dataclass.
+    """
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: PaymentBatch, index: int) -> None:
+        self._batch = batch
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in _COLUMN_SET:
+            raise AttributeError(name)
+        return self._batch._value(name, self._index)
+
+    def materialize(self) -> PaymentResponse:
+        batch, index = self._batch, self._index
+        return PaymentResponse(*(batch._value(name, index) for name in COLUMNS))
+
+    def __repr__(self) -> str:
+        return f"PaymentRow(payment_id={self.payment_id!r}, status={self.status!r})"
+
+
+class PaymentBatch:
+    """Column-oriented collection of payments for large result sets.
+
+    ``amount`` and ``amount_paid`` are kept in float arrays (missing values as
+    NaN), ``status``, ``currency`` and ``provider`` as integer codes into a
+    shared table of distinct values, and ``metadata`` as encoded JSON that is
+    decoded only when read. The remaining fields are plain lists. Iterating
+    yields ``PaymentRow`` views rather than ``PaymentResponse`` objects.
+    """
+
+    def __init__(
+        self,
+        payments: Iterable[PaymentResponse | Mapping[str, Any]] = (),
+        *,
+        json_codec: JsonCodec | None = None,
+    ) -> None:
+        self._codec = json_codec or _DEFAULT_CODEC
+        self._numbers = {name: array("d") for name in NUMERIC_COLUMNS}
+        self._categories = {name: _Categories() for name in CATEGORICAL_COLUMNS}
+        self._codes = {name: array("I") for name in CATEGORICAL_COLUMNS}
+        self._objects: dict[str, list[Any]] = {name: [] for name in OBJECT_COLUMNS}
+        self._metadata: list[bytes | None] = []
+        self._size = 0
+        self.extend(payments)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[PaymentRow]:
+        for index in range(self._size):
+            yield PaymentRow(self, index)
+
+    def __getitem__(self, index: int) -> PaymentRow:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("PaymentBatch index out of range")
+        return PaymentRow(self, index)
+
+    def append(self, payment: PaymentResponse | Mapping[str, Any]) -> None:
+        """Add a payment, given as a model or as a raw camelCase response."""
+        if not isinstance(payment, PaymentResponse):
+            payment = LazyPaymentResponse(dict(payment))
+
+        for name, numbers in self._numbers.items():
+            value = getattr(payment, name)
+            numbers.append(math.nan if value is None else float(value))
+        for name, codes in self._codes.items():
+            codes.append(self._categories[name].code(getattr(payment, name)))
+        for values, value in zip(
+            self._objects.values(), _read_objects(payment), strict=True
+        ):
+            values.append(value)
+        metadata = payment.metadata
+        self._metadata.append(self._codec.dumps(metadata) if metadata else None)
+        self._size += 1
+
+    def extend(self, payments: Iterable[PaymentResponse | Mapping[str, Any]]) -> None:
+        for payment in payments:
+            self.append(payment)
+
+    def extend_results(
+        self, results: Iterable[tuple[str, PaymentResponse | ApiError]]
+    ) -> dict[str, ApiError]:
+        """Append the payments from a bulk read and return its failures by key."""
+        failed: dict[str, ApiError] = {}
+        for key, outcome in results:
+            if isinstance(outcome, ApiError):
+                failed[key] = outcome
+            else:
+                self.append(outcome)
+        return failed
+
+    def column(self, name: str) -> list[Any]:
+        self._check_column(name)
+        return [self._value(name, index) for index in range(self._size)]
+
+    def filter(
+        self, predicate: Callable[[PaymentRow], bool] | None = None, **equals: Any
+    ) -> PaymentBatch:
+        """Return the payments whose columns equal ``equals`` and match ``predicate``.
+
+        Equality on the categorical columns compares integer codes, so
+        ``batch.filter(status="FAILED")`` never builds a row.
+        """
+        indices: Sequence[int] = range(self._size)
+        for name, expected in equals.items():
+            self._check_column(name)
+            codes = self._codes.get(name)
+            if codes is not None:
+                code = self._categories[name].codes.get(expected)
+                indices = [index for index in indices if codes[index] == code]
+            else:
+                indices = [
+                    index for index in indices if self._value(name, index) == expected
+                ]
+        if predicate is not None:
+            indices = [index for index in indices if predicate(PaymentRow(self, index))]
+        return self._take(indices)
+
+    def group_by(self, name: str) -> dict[Any, PaymentBatch]:
+        self._check_column(name)
+        if name == METADATA_COLUMN:
+            raise ValueError("cannot group by metadata")
+
+        groups: dict[Any, list[int]] = {}
+        codes = self._codes.get(name)
+        if codes is not None:
+            for index, code in enumerate(codes):
+                groups.setdefault(code, []).append(index)
+            values = self._categories[name].values
+            return {values[code]: self._take(group) for code, group in groups.items()}
+
+        for index in range(self._size):
+            groups.setdefault(self._value(name, index), []).append(index)
+        return {value: self._take(group) for value, group in groups.items()}
+
+    def sum(self, name: str = "amount") -> float:
+        """Sum a numeric column, skipping missing values."""
+        numbers = self._numbers.get(name)
+        if numbers is None:
+            raise ValueError(f"{name} is not a numeric column")
+        return math.fsum(value for value in numbers if not math.isnan(value))
+
+    def _check_column(self, name: str) -> None:
+        if name not in _COLUMN_SET:
+            raise ValueError(f"unknown column: {name}")
+
+    def _value(self, name: str, index: int) -> Any:
+        numbers = self._numbers.get(name)
+        if numbers is not None:
+            value = numbers[index]
+            return None if math.isnan(value) else value
+        codes = self._codes.get(name)
+        if codes is not None:
+            return self._categories[name].values[codes[index]]
+        if name == METADATA_COLUMN:
+            blob = self._metadata[index]
+            return self._codec.loads(blob) if blob is not None else {}
+        return self._objects[name][index]
+
+    def _take(self, indices: Sequence[int]) -> PaymentBatch:
+        batch = PaymentBatch(json_codec=self._codec)
+        # Value tables are shared: codes stay valid and appends only add values.
+        batch._categories = self._categories
+        for name, numbers in self._numbers.items():
+            batch._numbers[name] = array("d", [numbers[index] for index in indices])
+        for name, codes in self._codes.items():
+            batch._codes[name] = array("I", [codes[index] for index in indices])
+        for name, values in self._objects.items():
+            batch._objects[name] = [values[index] for index in indices]
+        batch._metadata = [self._metadata[index] for index in indices]
+        batch._size = len(indices)
+        return batch
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+from .errors import ApiError
+from .http import AMBIGUOUS_STATUSES
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MIN_SAMPLES = 20
+
+STARTED = "started"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+UNRESOLVED = "unresolved"
+
+
+@dataclass(slots=True)
+class BulkReport(Generic[T]):
+    succeeded: dict[str, T] = field(default_factory=dict)
+    failed: dict[str, ApiError] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    unresolved: list[str] = field(default_factory=list)
+    rejected: list[str] = field(default_factory=list)
+    stopped: bool = False
+
+    @property
+    def attempted(self) -> int:
+        return len(self.succeeded) + len(self.failed)
+
+    @property
+    def error_rate(self) -> float:
+        return len(self.failed) / self.attempted if self.attempted else 0.0
+
+
+def iter_results(
+    func: Callable[[str], T],
+    keys: Iterable[str],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = False,
+) -> Iterator[tuple[str, T | ApiError]]:
+    """Call ``func`` for each distinct key on a bounded thread pool.
+
+    Keys are consumed lazily and at most ``2 * max_workers`` calls are in flight,
+    so arbitrarily long inputs run in constant memory apart from the set used
+    for de-duplication. An ``ApiError`` is yielded in place of the result
+    instead of aborting the batch.
+    """
+    seen: set[str] = set()
+
+    def calls() -> Iterator[tuple[str, tuple[Any, ...]]]:
+        for key in keys:
+            if key not in seen:
+                seen.add(key)
+                yield key, (key,)
+
+    return execute_calls(func, calls(), max_workers=max_workers, ordered=ordered)
+
+
+def run_mutations(
+    func: Callable[..., T],
+    items: Iterable[tuple[str, tuple[Any, ...]]],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    checkpoint: str | os.PathLike[str] | None = None,
+    max_error_rate: float | None = None,
+    min_samples: int = DEFAULT_MIN_SAMPLES,
+    keyed: bool = False,
+) -> BulkReport[T]:
+    """Apply a non-idempotent call once per payment and report every outcome.
+
+    Each payment is attempted at most once: exact repeats are skipped, and a
+    further call for a payment with different arguments is ``rejected`` unsent
+    so it can go in a later batch. The optional ``checkpoint`` file records,
+    per payment and arguments, when a call starts and how it ended so a rerun
+    skips finished work. Calls that started but never recorded an outcome, and
+    unkeyed calls that ended with a status-0, 5xx, 409 or 429 error and may
+    have been applied, are reported as ``unresolved`` rather than sent again.
+    Pass ``keyed=True`` when every call carries an ``Idempotency-Key``. When
+    ``max_error_rate`` is exceeded after ``min_samples`` outcomes, no new calls
+    are started and ``stopped`` is set.
+    """
+    report: BulkReport[T] = BulkReport()
+    journal = _Checkpoint(checkpoint) if checkpoint is not None else None
+    seen: dict[str, str | None] = {}
+    digests: dict[str, str | None] = {}
+    ambiguous = 0
+
+    def tripped() -> bool:
+        if max_error_rate is None:
+            return False
+        samples = report.attempted + ambiguous
+        errors = len(report.failed) + ambiguous
+        return samples >= min_samples and errors / samples > max_error_rate
+
+    def calls() -> Iterator[tuple[str, tuple[Any, ...]]]:
+        for key, args in items:
+            if tripped():
+                report.stopped = True
+                return
+
+            digest = _digest(args)
+            if key in seen:
+                if seen[key] == digest:
+                    report.skipped.append(key)
+                else:
+                    report.rejected.append(key)
+                continue
+            seen[key] = digest
+
+            state = journal.state(key, digest) if journal is not None else None
+            if state in {SUCCEEDED, FAILED}:
+                report.skipped.append(key)
+                continue
+            if state in {STARTED, UNRESOLVED}:
+                report.unresolved.append(key)
+                continue
+
+            digests[key] = digest
+            if journal is not None:
+                journal.record(key, digest, STARTED)
+            yield key, args
+
+    try:
+        for key, outcome in execute_calls(func, calls(), max_workers=max_workers):
+            digest = digests.pop(key)
+            if isinstance(outcome, ApiError):
+                state = FAILED
+                if not keyed and _is_ambiguous(outcome):
+                    state = UNRESOLVED
+                    ambiguous += 1
+                    report.unresolved.append(key)
+                else:
+                    report.failed[key] = outcome
+                if journal is not None:
+                    journal.record(key, digest, state, status=outcome.status)
+            else:
+                report.succeeded[key] = outcome
+                if journal is not None:
+                    journal.record(key, digest, SUCCEEDED)
+    finally:
+        if journal is not None:
+            journal.close()
+
+    return report
+
+
+def _is_ambiguous(error: ApiError) -> bool:
+    return (
+        error.status == 0 or error.status >= 500 or error.status in AMBIGUOUS_STATUSES
+    )
+
+
+def _digest(args: tuple[Any, ...]) -> str | None:
+    # The first argument is the key itself; hash what is sent for it.
+    if len(args) < 2:
+        return None
+    encoded = json.dumps(args[1:], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def execute_calls(
+    func: Callable[..., T],
+    calls: Iterable[tuple[str, tuple[Any, ...]]],
+    *,
+    max_workers: int,
+    ordered: bool = False,
+) -> Iterator[tuple[str, T | ApiError]]:
+    """Run ``func(*args)`` for each ``(key, args)`` call on a bounded thread pool.
+
+    Calls are consumed lazily with at most ``2 * max_workers`` in flight, and
+    ``(key, result)`` pairs are yielded as they complete, or in input order when
+    ``ordered`` is set. An ``ApiError`` is yielded in place of the result.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    window = max_workers * 2
+    pending: deque[tuple[str, Future[T]]] = deque()
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="delopay-bulk"
+    )
+
+    try:
+        for key, args in calls:
+            pending.append((key, executor.submit(func, *args)))
+
+            if len(pending) >= window:
+                yield from _drain(pending, ordered, until=window - 1)
+
+        yield from _drain(pending, ordered, until=0)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _drain(
+    pending: deque[tuple[str, Future[T]]], ordered: bool, *, until: int
+) -> Iterator[tuple[str, T | ApiError]]:
+    while len(pending) > until:
+        if ordered:
+            key, future = pending.popleft()
+            outcome = _outcome(future)
+            yield key, outcome
+            continue
+
+        done, _ = wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+        for item in [item for item in pending if item[1] in done]:
+            pending.remove(item)
+            outcome = _outcome(item[1])
+            yield item[0], outcome
+
+
+def _outcome(future: Future[T]) -> T | ApiError:
+    try:
+        return future.result()
+    except ApiError as exc:
+        return exc
+
+
+class _Checkpoint:
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._states: dict[tuple[str, str | None], str] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-write leaves a torn final line; ignore it.
+                        continue
+                    digest = record.get("digest")
+                    self._states[(record["key"], digest)] = record["state"]
+
+        self._handle = open(path, "a", encoding="utf-8")
+
+    def state(self, key: str, digest: str | None) -> str | None:
+        state = self._states.get((key, digest))
+        if state is None and digest is not None:
+            # Records written without arguments cover every call for the key.
+            state = self._states.get((key, None))
+        return state
+
+    def record(self, key: str, digest: str | None, state: str, **extra: Any) -> None:
+        self._states[(key, digest)] = state
+        record: dict[str, Any] = {"key": key}
+        if digest is not None:
+            record["digest"] = digest
+        record.update(state=state, **extra)
+        self._handle.write(json.dumps(record) + "\n")
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
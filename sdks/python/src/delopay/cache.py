@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from dataclasses import dataclass, replace
+from typing import Any, Protocol, TypeVar
+
+from . import forksafe
+from .errors import ApiError
+
+T = TypeVar("T")
+
+# Client errors that describe the request rather than a transient server state.
+NON_CACHEABLE_STATUSES = {408, 429}
+
+CacheKey = tuple[Hashable, ...]
+
+
+class ResponseCache(Protocol):
+    def get_or_load(self, key: CacheKey, loader: Callable[[], T]) -> T: ...
+
+    def invalidate(self, *prefix: Hashable) -> None: ...
+
+    def stats(self) -> CacheStats: ...
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    evictions: int = 0
+    negative_hits: int = 0
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+    error: ApiError | None = None
+
+
+class TTLCache:
+    """Bounded, thread-safe response cache with stale-while-revalidate.
+
+    Keys are tuples whose first element names the cached operation, so TTLs can
+    be set per operation through ``ttls``. Entries past their TTL but within
+    ``stale_ttl`` are served immediately while one background thread reloads
+    them; older entries are reloaded inline. With ``negative_ttl`` set, 4xx
+    ``ApiError``s are cached for that long and re-raised on lookup.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 300.0,
+        ttls: Mapping[str, float] | None = None,
+        stale_ttl: float = 0.0,
+        negative_ttl: float = 0.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self._ttl = ttl
+        self._ttls = dict(ttls or {})
+        self._stale_ttl = stale_ttl
+        self._negative_ttl = negative_ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._refreshing: set[CacheKey] = set()
+        self._generation = 0
+        self._stats = CacheStats()
+        forksafe.register(self)
+
+    def get_or_load(self, key: CacheKey, loader: Callable[[], T]) -> T:
+        now = self._clock()
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                if entry.error is not None:
+                    self._stats.negative_hits += 1
+                    raise replace(entry.error)
+                self._stats.hits += 1
+                return entry.value
+
+            if entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self._stats.stale_hits += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(
+                        target=self._refresh,
+                        args=(key, loader, generation),
+                        name="delopay-cache-refresh",
+                        daemon=True,
+                    ).start()
+                return entry.value
+
+            self._stats.misses += 1
+
+        try:
+            value = loader()
+        except ApiError as exc:
+            if self._negative_ttl > 0 and _is_cacheable_error(exc):
+                self._store_error(key, exc, generation)
+            raise
+
+        self._store(key, value, generation)
+        return value
+
+    def invalidate(self, *prefix: Hashable) -> None:
+        with self._lock:
+            # Loads that started before this call must not repopulate the cache.
+            self._generation += 1
+            if not prefix:
+                self._entries.clear()
+                return
+
+            size = len(prefix)
+            for key in [key for key in self._entries if key[:size] == prefix]:
+                del self._entries[key]
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _after_fork(self) -> None:
+        # Refresh threads ran in the parent; let this process start its own.
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def _ttl_for(self, key: CacheKey) -> float:
+        return self._ttls.get(str(key[0]), self._ttl) if key else self._ttl
+
+    def _store(self, key: CacheKey, value: Any, generation: int) -> None:
+        fresh_until = self._clock() + self._ttl_for(key)
+        entry = _Entry(value, fresh_until, fresh_until + self._stale_ttl)
+        self._put(key, entry, generation)
+
+    def _store_error(self, key: CacheKey, error: ApiError, generation: int) -> None:
+        expires = self._clock() + self._negative_ttl
+        self._put(key, _Entry(None, expires, expires, error), generation)
+
+    def _put(self, key: CacheKey, entry: _Entry, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def _refresh(
+        self, key: CacheKey, loader: Callable[[], Any], generation: int
+    ) -> None:
+        try:
+            value = loader()
+        except Exception:
+            with self._lock:
+                self._stats.refresh_errors += 1
+        else:
+            self._store(key, value, generation)
+            with self._lock:
+                self._stats.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+def _is_cacheable_error(error: ApiError) -> bool:
+    return 400 <= error.status < 500 and error.status not in NON_CACHEABLE_STATUSES
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from dataclasses import dataclass, replace
+from http import HTTPStatus
+from http.client import HTTPMessage
+from typing import Any
+
+from .async_http import (
+    AsyncConnectionPool,
+    BodyTooLargeError,
+    read_chunked,
+    read_headers,
+)
+from .codec import JsonCodec, default_codec
+from .models import PaymentResponse, RefundResponse
+
+CallbackEvent = PaymentResponse | RefundResponse
+BatchHandler = Callable[[list[CallbackEvent]], Awaitable[Any]]
+
+DEFAULT_MAX_BODY_BYTES = 1_048_576
+# Advertised to senders when the receiver is shedding load.
+RETRY_AFTER_SECONDS = 1
+_DEFAULT_CODEC = default_codec()
+READ_ERRORS = (
+    ConnectionError,
+    asyncio.IncompleteReadError,
+    asyncio.LimitOverrunError,
+    ValueError,
+)
+
+
+@dataclass(slots=True)
+class ReceiverStats:
+    received: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    rejected: int = 0
+    delivered: int = 0
+    batches: int = 0
+    handler_errors: int = 0
+
+
+class _DedupWindow:
+    __slots__ = ("_keys", "_maxsize")
+
+    def __init__(self, maxsize: int) -> None:
+        self._keys: OrderedDict[Hashable, None] = OrderedDict()
+        self._maxsize = maxsize
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable) -> None:
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        while len(self._keys) > self._maxsize:
+            self._keys.popitem(last=False)
+
+
+class CallbackReceiver:
+    """Asyncio HTTP endpoint that batches Delopay callbacks into a handler.
+
+    Bodies are decoded into ``PaymentResponse`` (or ``RefundResponse`` when they
+    carry a ``refundId``) and deduplicated by ID and status over the last
+    ``dedup_window`` deliveries. ``handler`` receives batches of up to
+    ``batch_size`` events, collected for at most ``batch_interval`` seconds.
+
+    A callback is acknowledged only once its batch has been handled, so a
+    handler error answers 500 and the sender retries. When ``queue_size``
+    callbacks are already waiting, new ones wait up to ``enqueue_timeout``
+    seconds for room and are then refused with 503 and ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        *,
+        path: str = "/",
+        batch_size: int = 100,
+        batch_interval: float = 0.05,
+        queue_size: int = 10_000,
+        enqueue_timeout: float = 1.0,
+        dedup_window: int = 100_000,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        json_codec: JsonCodec | None = None,
+    ) -> None:
+        if batch_size < 1 or queue_size < 1:
+            raise ValueError("batch_size and queue_size must be at least 1")
+
+        self._handler = handler
+        self._path = path
+        self._batch_size = batch_size
+        self._batch_interval = batch_interval
+        self._queue_size = queue_size
+        self._enqueue_timeout = enqueue_timeout
+        self._max_body_bytes = max_body_bytes
+        self._codec = json_codec or _DEFAULT_CODEC
+        self._seen = _DedupWindow(dedup_window)
+        self._pending: dict[Hashable, asyncio.Future[HTTPStatus]] = {}
+        self._stats = ReceiverStats()
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._server: asyncio.Server | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+
+    @property
+    def port(self) -> int | None:
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._ensure_worker()
+        self._server = await asyncio.start_server(self._serve, host, port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        if self._queue is not None:
+            await self._queue.join()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+        for writer in list(self._connections):
+            writer.close()
+
+    async def __aenter__(self) -> CallbackReceiver:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    def stats(self) -> ReceiverStats:
+        return replace(self._stats)
+
+    async def submit(self, body: bytes) -> HTTPStatus:
+        """Process one callback body and return the HTTP status to answer."""
+        self._stats.received += 1
+        try:
+            event = decode_callback(body, self._codec)
+        except ValueError:
+            self._stats.invalid += 1
+            return HTTPStatus.BAD_REQUEST
+
+        key = callback_key(event)
+        if key in self._seen:
+            self._stats.duplicates += 1
+            return HTTPStatus.OK
+
+        # A retry of a callback that is still queued shares its outcome.
+        future = self._pending.get(key)
+        if future is not None:
+            self._stats.duplicates += 1
+            return await asyncio.shield(future)
+
+        queue = self._ensure_worker()
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            async with asyncio.timeout(self._enqueue_timeout):
+                await queue.put((key, event, future))
+        except TimeoutError:
+            del self._pending[key]
+            self._stats.rejected += 1
+            future.set_result(HTTPStatus.SERVICE_UNAVAILABLE)
+        return await asyncio.shield(future)
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._queue_size)
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(
+                self._deliver(self._queue)
+            )
+        return self._queue
+
+    async def _deliver(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self._batch_interval
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    async with asyncio.timeout(remaining):
+                        batch.append(await queue.get())
+                except TimeoutError:
+                    break
+
+            await self._handle(batch)
+            for _ in batch:
+                queue.task_done()
+
+    async def _handle(
+        self, batch: list[tuple[Hashable, CallbackEvent, asyncio.Future[HTTPStatus]]]
+    ) -> None:
+        status = HTTPStatus.OK
+        try:
+            await self._handler([event for _, event, _ in batch])
+        except Exception as exc:
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            self._stats.handler_errors += 1
+            asyncio.get_running_loop().call_exception_handler(
+                {"message": "Callback handler failed", "exception": exc}
+            )
+        else:
+            self._stats.delivered += len(batch)
+            for key, _, _ in batch:
+                self._seen.add(key)
+
+        self._stats.batches += 1
+        for key, _, future in batch:
+            self._pending.pop(key, None)
+            if not future.done():
+                future.set_result(status)
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader, self._max_body_bytes)
+                except BodyTooLargeError:
+                    writer.write(_encode_status(HTTPStatus.REQUEST_ENTITY_TOO_LARGE))
+                    await writer.drain()
+                    break
+                except READ_ERRORS:
+                    break
+                if request is None:
+                    break
+
+                method, target, keep_alive, body = request
+                if target.partition("?")[0] != self._path:
+                    status = HTTPStatus.NOT_FOUND
+                elif method != "POST":
+                    status = HTTPStatus.METHOD_NOT_ALLOWED
+                else:
+                    status = await self.submit(body)
+
+                writer.write(_encode_status(status, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except OSError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+
+def decode_callback(body: bytes, codec: JsonCodec | None = None) -> CallbackEvent:
+    raw = (codec or _DEFAULT_CODEC).loads(body)
+    if not isinstance(raw, dict):
+        raise ValueError("callback body must be a JSON object")
+    if "refundId" in raw:
+        return RefundResponse.from_dict(raw)
+    return PaymentResponse.from_dict(raw)
+
+
+def callback_key(event: CallbackEvent) -> Hashable:
+    if isinstance(event, RefundResponse):
+        return ("refund", event.refund_id, event.status)
+    return ("payment", event.payment_id, event.status)
+
+
+async def replay(
+    url: str,
+    bodies: Iterable[bytes],
+    *,
+    concurrency: int = 64,
+    timeout: float = 10.0,
+) -> Counter[int]:
+    """POST each body to ``url`` over keep-alive connections; count statuses."""
+    pool = AsyncConnectionPool(maxsize=concurrency)
+    statuses: Counter[int] = Counter()
+    pending = iter(bodies)
+    headers = {"Content-Type": "application/json"}
+
+    async def sender() -> None:
+        for body in pending:
+            response = await pool.send("POST", url, headers, body, timeout)
+            statuses[response.status] += 1
+
+    try:
+        await asyncio.gather(*(sender() for _ in range(concurrency)))
+    finally:
+        await pool.aclose()
+    return statuses
+
+
+async def _read_request(
+    reader: asyncio.StreamReader, max_body_bytes: int
+) -> tuple[str, str, bool, bytes] | None:
+    try:
+        request_line = await reader.readuntil(b"\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial:
+            return None
+        raise
+
+    method, target, version = request_line.decode("latin-1").split()
+    headers: HTTPMessage = await read_headers(reader)
+    connection = (headers.get("Connection") or "").lower()
+    keep_alive = version == "HTTP/1.1" and connection != "close"
+
+    if "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+        body = await read_chunked(reader, max_body_bytes)
+    else:
+        length = int(headers.get("Content-Length") or 0)
+        if length > max_body_bytes:
+            raise BodyTooLargeError
+        body = await reader.readexactly(length)
+    return method, target, keep_alive, body
+
+
+def _encode_status(status: HTTPStatus, keep_alive: bool = False) -> bytes:
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Length: 0"]
+    if status == HTTPStatus.SERVICE_UNAVAILABLE:
+        lines.append(f"Retry-After: {RETRY_AFTER_SECONDS}")
+    if not keep_alive:
+        lines.append("Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
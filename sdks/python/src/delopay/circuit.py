@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from enum import Enum
+
+from . import forksafe
+from .errors import ApiError
+
+CIRCUIT_OPEN_CODE = "CIRCUIT_OPEN"
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+StateListener = Callable[[str, CircuitState, CircuitState], None]
+
+
+class _Circuit:
+    __slots__ = (
+        "state",
+        "window",
+        "opened_at",
+        "probing_since",
+        "probes",
+        "probe_successes",
+    )
+
+    def __init__(self, window_size: int) -> None:
+        self.state = CircuitState.CLOSED
+        self.window: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self.opened_at = 0.0
+        self.probing_since = 0.0
+        self.probes = 0
+        self.probe_successes = 0
+
+
+class CircuitBreaker:
+    """Per-route circuit breaker over a sliding window of recent calls.
+
+    A route opens when, over at least ``minimum_calls`` of the last
+    ``window_size`` calls, the failure rate reaches ``failure_rate_threshold``
+    or the share of calls slower than ``slow_call_seconds`` reaches
+    ``slow_call_rate_threshold``. Open routes fail fast for ``open_seconds``,
+    then admit ``half_open_calls`` probes; all must succeed to close again.
+    Probes that have not all reported back after ``half_open_timeout``
+    (default ``open_seconds``) are written off and a new round is admitted.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float | None = None,
+        slow_call_rate_threshold: float = 1.0,
+        minimum_calls: int = 10,
+        window_size: int = 50,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 3,
+        half_open_timeout: float | None = None,
+        on_state_change: StateListener | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if minimum_calls < 1 or window_size < minimum_calls:
+            raise ValueError("window_size must be at least minimum_calls >= 1")
+
+        self._failure_rate_threshold = failure_rate_threshold
+        self._slow_call_seconds = slow_call_seconds
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._minimum_calls = minimum_calls
+        self._window_size = window_size
+        self._open_seconds = open_seconds
+        self._half_open_calls = half_open_calls
+        self._half_open_timeout = (
+            half_open_timeout if half_open_timeout is not None else open_seconds
+        )
+        self._on_state_change = on_state_change
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._circuits: dict[str, _Circuit] = {}
+        forksafe.register(self)
+
+    def state(self, route: str) -> CircuitState:
+        with self._lock:
+            circuit = self._circuits.get(route)
+            return circuit.state if circuit is not None else CircuitState.CLOSED
+
+    def before_call(self, route: str) -> None:
+        """Raise a fast-fail ``ApiError`` if ``route`` is not accepting calls."""
+        transition = None
+        with self._lock:
+            circuit = self._circuit(route)
+            if circuit.state is CircuitState.OPEN:
+                if self._clock() - circuit.opened_at < self._open_seconds:
+                    raise _open_error(route)
+                transition = self._move(route, circuit, CircuitState.HALF_OPEN)
+
+            if circuit.state is CircuitState.HALF_OPEN:
+                if circuit.probes >= self._half_open_calls:
+                    now = self._clock()
+                    if now - circuit.probing_since < self._half_open_timeout:
+                        raise _open_error(route)
+                    # The outstanding probes never reported back; start over.
+                    circuit.probes = circuit.probe_successes = 0
+                    circuit.probing_since = now
+                circuit.probes += 1
+        self._notify(transition)
+
+    def release(self, route: str) -> None:
+        """Return the slot taken by ``before_call`` for a call that was not made."""
+        with self._lock:
+            circuit = self._circuits.get(route)
+            if (
+                circuit is not None
+                and circuit.state is CircuitState.HALF_OPEN
+                and circuit.probes > 0
+            ):
+                circuit.probes -= 1
+
+    def record(self, route: str, *, failed: bool, duration: float) -> None:
+        slow = (
+            self._slow_call_seconds is not None and duration >= self._slow_call_seconds
+        )
+        transition = None
+        with self._lock:
+            circuit = self._circuit(route)
+            if circuit.state is CircuitState.HALF_OPEN:
+                if failed or slow:
+                    transition = self._move(route, circuit, CircuitState.OPEN)
+                else:
+                    circuit.probe_successes += 1
+                    if circuit.probe_successes >= self._half_open_calls:
+                        transition = self._move(route, circuit, CircuitState.CLOSED)
+            elif circuit.state is CircuitState.CLOSED:
+                circuit.window.append((failed, slow))
+                if self._should_open(circuit):
+                    transition = self._move(route, circuit, CircuitState.OPEN)
+        self._notify(transition)
+
+    def reset(self, route: str | None = None) -> None:
+        with self._lock:
+            if route is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(route, None)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _circuit(self, route: str) -> _Circuit:
+        circuit = self._circuits.get(route)
+        if circuit is None:
+            circuit = self._circuits[route] = _Circuit(self._window_size)
+        return circuit
+
+    def _should_open(self, circuit: _Circuit) -> bool:
+        calls = len(circuit.window)
+        if calls < self._minimum_calls:
+            return False
+
+        failures = sum(1 for failed, _ in circuit.window if failed)
+        slow_calls = sum(1 for _, slow in circuit.window if slow)
+        return (
+            failures / calls >= self._failure_rate_threshold
+            or slow_calls / calls >= self._slow_call_rate_threshold
+        )
+
+    def _move(
+        self, route: str, circuit: _Circuit, state: CircuitState
+    ) -> tuple[str, CircuitState, CircuitState]:
+        previous = circuit.state
+        circuit.state = state
+        circuit.probes = 0
+        circuit.probe_successes = 0
+        if state is CircuitState.OPEN:
+            circuit.opened_at = self._clock()
+        elif state is CircuitState.HALF_OPEN:
+            circuit.probing_since = self._clock()
+        elif state is CircuitState.CLOSED:
+            circuit.window.clear()
+        return route, previous, state
+
+    def _notify(
+        self, transition: tuple[str, CircuitState, CircuitState] | None
+    ) -> None:
+        if transition is not None and self._on_state_change is not None:
+            self._on_state_change(*transition)
+
+
+def _open_error(route: str) -> ApiError:
+    return ApiError(
+        status=0,
+        message=f"Circuit open for {route}",
+        code=CIRCUIT_OPEN_CODE,
+    )
@@ -1,8 +1,22 @@
 from __future__ import annotations
 
+from typing import Any
+
+from . import forksafe
+from .async_http import AsyncConnectionPool, AsyncHttpClient
+from .cache import ResponseCache
+from .circuit import CircuitBreaker
+from .codec import JsonCodec
+from .hedge import HedgePolicy
 from .http import HttpClient
-from .payments import PaymentsClient
-from .providers import ProvidersClient
+from .idempotency import IdempotencyJournal
+from .payments import AsyncPaymentsClient, PaymentsClient
+from .pool import ConnectionPool
+from .providers import AsyncProvidersClient, ProvidersClient
+from .ratelimit import RateLimiter
+from .retry import RetryBudget
+from .singleflight import SingleFlight
+from .store import PaymentStore
 
 
 class DelopayClient:
@@ -13,12 +27,123 @@ class DelopayClient:
         base_url: str = "https://sandbox-delopay.deloxity.com",
         timeout_ms: int = 30_000,
         max_retries: int = 2,
+        pool_maxsize: int = 10,
+        pool_idle_timeout_ms: int = 60_000,
+        providers_cache: ResponseCache | None = None,
+        coalesce_requests: bool = False,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        connect_timeout_ms: int | None = None,
+        deadline_ms: int | None = None,
+        retry_budget: RetryBudget | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        json_codec: JsonCodec | None = None,
+        lazy_models: bool = False,
+        idempotency_journal: IdempotencyJournal | None = None,
+        payment_store: PaymentStore | None = None,
+    ) -> None:
+        pool = (
+            ConnectionPool(
+                maxsize=pool_maxsize, idle_timeout=pool_idle_timeout_ms / 1000
+            )
+            if pool_maxsize > 0
+            else None
+        )
+        self._http = HttpClient(
+            api_key=api_key,
+            base_url=base_url,
+            timeout_ms=timeout_ms,
+            max_retries=max_retries,
+            pool=pool,
+            single_flight=SingleFlight() if coalesce_requests else None,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            connect_timeout_ms=connect_timeout_ms,
+            deadline_ms=deadline_ms,
+            retry_budget=retry_budget,
+            hedge_policy=hedge_policy,
+            json_codec=json_codec,
+            idempotency_journal=idempotency_journal,
+        )
+        self.payments = PaymentsClient(
+            self._http, lazy_models=lazy_models, store=payment_store
+        )
+        self.providers = ProvidersClient(self._http, providers_cache)
+
+    @property
+    def single_flight(self) -> SingleFlight | None:
+        return self._http.single_flight
+
+    @property
+    def rate_limiter(self) -> RateLimiter | None:
+        return self._http.rate_limiter
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker | None:
+        return self._http.circuit_breaker
+
+    @property
+    def retry_budget(self) -> RetryBudget | None:
+        return self._http.retry_budget
+
+    @property
+    def hedge_policy(self) -> HedgePolicy | None:
+        return self._http.hedge_policy
+
+    @property
+    def idempotency_journal(self) -> IdempotencyJournal | None:
+        return self._http.idempotency_journal
+
+    def close(self) -> None:
+        self._http.close()
+
+    def after_fork(self) -> None:
+        """Reset connections, locks and threads inherited from a parent process.
+
+        This already happens after ``os.fork()``. Call it at the start of a
+        worker only when the server forks without running Python's fork
+        hooks; it is a no-op when nothing needs resetting.
+        """
+        forksafe.after_fork()
+
+    def __enter__(self) -> DelopayClient:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class AsyncDelopayClient:
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        base_url: str = "https://sandbox-delopay.deloxity.com",
+        timeout_ms: int = 30_000,
+        max_retries: int = 2,
+        pool_maxsize: int = 10,
+        pool_idle_timeout_ms: int = 60_000,
+        json_codec: JsonCodec | None = None,
+        lazy_models: bool = False,
     ) -> None:
-        http = HttpClient(
+        self._http = AsyncHttpClient(
             api_key=api_key,
             base_url=base_url,
             timeout_ms=timeout_ms,
             max_retries=max_retries,
+            pool=AsyncConnectionPool(
+                maxsize=pool_maxsize, idle_timeout=pool_idle_timeout_ms / 1000
+            ),
+            json_codec=json_codec,
         )
-        self.payments = PaymentsClient(http)
-        self.providers = ProvidersClient(http)
+        self.payments = AsyncPaymentsClient(self._http, lazy_models=lazy_models)
+        self.providers = AsyncProvidersClient(self._http)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> AsyncDelopayClient:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
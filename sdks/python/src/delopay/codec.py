@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Protocol
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None  # type: ignore[assignment]
+
+
+class JsonCodec(Protocol):
+    def dumps(self, value: Any) -> bytes: ...
+
+    def loads(self, data: bytes) -> Any: ...
+
+
+# Built once: json.dumps constructs a new encoder whenever options are passed.
+_COMPACT_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+class StdlibCodec:
+    __slots__ = ()
+
+    def dumps(self, value: Any) -> bytes:
+        return _COMPACT_ENCODER.encode(value).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ValueError("orjson is not installed")
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+def default_codec() -> JsonCodec:
+    """Return the fastest available codec: orjson if installed, else stdlib."""
+    return OrjsonCodec() if orjson is not None else StdlibCodec()
@@ -10,5 +10,12 @@ class ApiError(Exception):
     request_id: str | None = None
     raw: Any = None
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Exception pickling replays ``args``, which the dataclass never sets.
+        return (
+            type(self),
+            (self.status, self.message, self.code, self.request_id, self.raw),
+        )
+
     def __str__(self) -> str:
         return f"ApiError(status={self.status}, message={self.message})"
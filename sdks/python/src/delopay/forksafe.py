@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import os
+import weakref
+from typing import Any
+
+_objects: weakref.WeakSet[Any] = weakref.WeakSet()
+_pid = os.getpid()
+
+
+def register(obj: Any) -> None:
+    """Reset ``obj`` with its ``_after_fork`` method in forked children."""
+    _objects.add(obj)
+
+
+def after_fork() -> None:
+    """Reset the per-process state of SDK objects inherited from a parent.
+
+    Locks are replaced, inherited sockets and in-flight bookkeeping are
+    dropped, and background threads are restarted lazily. This runs on its
+    own after ``os.fork()``; call it by hand only where a server forks
+    without running Python's fork hooks. It does nothing in the process that
+    created the objects and nothing on a second call.
+    """
+    global _pid
+    pid = os.getpid()
+    if pid == _pid:
+        return
+    _pid = pid
+    for obj in list(_objects):
+        obj._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=after_fork)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, replace
+from typing import TypeVar
+
+from . import forksafe
+from .retry import RetryBudget
+
+T = TypeVar("T")
+
+DEFAULT_HEDGE_RATIO = 0.05
+
+
+class HedgeDropped(Exception):
+    """Raised by a hedge callable that decided not to send its request."""
+
+
+@dataclass(slots=True)
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+
+
+class HedgePolicy:
+    """Sends a second copy of a slow idempotent request and keeps the first reply.
+
+    The hedge fires after a fixed ``delay`` in seconds or, when no delay is
+    given, after the ``percentile`` latency of the last ``window_size``
+    attempts (no hedging until ``min_samples`` have been seen). ``budget``
+    bounds hedges to a share of requests, 5% by default, and at most
+    ``max_workers`` hedges are in flight at once; beyond that a slow request
+    simply waits. The losing attempt cannot be interrupted mid-flight; its
+    result is discarded.
+    """
+
+    def __init__(
+        self,
+        delay: float | None = None,
+        *,
+        percentile: float = 0.95,
+        min_delay: float = 0.005,
+        window_size: int = 200,
+        min_samples: int = 20,
+        budget: RetryBudget | None = None,
+        max_workers: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 < percentile <= 1:
+            raise ValueError("percentile must be in (0, 1]")
+        if window_size < min_samples:
+            raise ValueError("window_size must be at least min_samples")
+
+        self._fixed_delay = delay
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        self._budget = budget or RetryBudget(DEFAULT_HEDGE_RATIO, min_per_second=0)
+        self._max_workers = max_workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hedge_slots = threading.BoundedSemaphore(max_workers)
+        self._latencies: deque[float] = deque(maxlen=window_size)
+        self._stats = HedgeStats()
+        forksafe.register(self)
+
+    def delay(self) -> float | None:
+        """Return the current hedge delay, or ``None`` while still sampling."""
+        if self._fixed_delay is not None:
+            return self._fixed_delay
+
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = max(0, math.ceil(self._percentile * len(ordered)) - 1)
+        return max(self._min_delay, ordered[index])
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def run(self, primary: Callable[[], T], hedge: Callable[[], T] | None = None) -> T:
+        """Run ``primary``, racing it against ``hedge`` if it is slow.
+
+        While the delay is still being sampled there is nothing to race, so
+        ``primary`` runs on the caller's thread. ``hedge`` may raise
+        `HedgeDropped` to skip the hedge, e.g. when the rate limiter is dry.
+        """
+        with self._lock:
+            self._stats.requests += 1
+        self._budget.record_request()
+
+        delay = self.delay()
+        if delay is None:
+            return self._timed(primary)()
+
+        first = self._start(primary)
+        if wait([first], timeout=delay).done:
+            return first.result()
+        if not self._hedge_slots.acquire(blocking=False):
+            return first.result()
+        if not self._budget.try_spend():
+            self._hedge_slots.release()
+            return first.result()
+
+        with self._lock:
+            self._stats.hedged += 1
+        second = self._start(hedge or primary)
+        second.add_done_callback(lambda _: self._hedge_slots.release())
+
+        pending: set[Future] = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self._stats.hedge_wins += 1
+                    return future.result()
+        # Both attempts failed; report the primary's error.
+        return first.result()
+
+    def stats(self) -> HedgeStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def close(self) -> None:
+        """Kept for symmetry with the client; attempts run on their own threads
+        and finish by themselves."""
+
+    def _after_fork(self) -> None:
+        # Attempt threads did not survive the fork, so neither did their slots.
+        self._lock = threading.Lock()
+        self._hedge_slots = threading.BoundedSemaphore(self._max_workers)
+
+    def _timed(self, func: Callable[[], T]) -> Callable[[], T]:
+        """Wrap ``func`` to record its latency from the moment it starts."""
+
+        def call() -> T:
+            started = self._clock()
+            result = func()
+            self.observe(self._clock() - started)
+            return result
+
+        return call
+
+    def _start(self, func: Callable[[], T]) -> Future:
+        # A thread per attempt rather than a shared pool: a bounded pool would
+        # cap concurrent requests and queue hedges behind slow primaries.
+        future: Future = Future()
+        timed = self._timed(func)
+
+        def target() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = timed()
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=target, name="delopay-hedge", daemon=True).start()
+        return future
@@ -1,15 +1,33 @@
 from __future__ import annotations
 
-import json
+import hashlib
+import random
 import time
 from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode, urljoin
-from urllib.request import Request, urlopen
+from urllib.request import Request
 
+from .circuit import CircuitBreaker
+from .codec import JsonCodec, StdlibCodec, default_codec
 from .errors import ApiError
+from .hedge import HedgeDropped, HedgePolicy
+from .idempotency import IDEMPOTENCY_HEADER, SUCCEEDED, IdempotencyJournal
+from .metrics import RequestMetrics
+from .pool import ConnectionPool, PooledRequest, urlopen
+from .ratelimit import RateLimiter
+from .retry import RetryBudget
+from .routes import route_template
+from .singleflight import SingleFlight
 
 IDEMPOTENT_METHODS = {"GET", "HEAD"}
+BACKOFF_BASE_SECONDS = 0.1
+BACKOFF_CAP_SECONDS = 1.0
+DEADLINE_EXCEEDED_CODE = "DEADLINE_EXCEEDED"
+# Statuses after which a mutation may or may not have been applied.
+AMBIGUOUS_STATUSES = {409, 429}
+
+_STDLIB_CODEC = StdlibCodec()
 
 
 class HttpClient:
@@ -20,6 +38,17 @@ class HttpClient:
         base_url: str,
         timeout_ms: int,
         max_retries: int,
+        pool: ConnectionPool | None = None,
+        single_flight: SingleFlight | None = None,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        connect_timeout_ms: int | None = None,
+        deadline_ms: int | None = None,
+        retry_budget: RetryBudget | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        json_codec: JsonCodec | None = None,
+        idempotency_journal: IdempotencyJournal | None = None,
+        metrics: RequestMetrics | None = None,
     ) -> None:
         if not api_key:
             raise ValueError("api_key is required")
@@ -27,7 +56,59 @@ class HttpClient:
         self._api_key = api_key
         self._base_url = base_url
         self._timeout_seconds = timeout_ms / 1000
+        self._connect_timeout_seconds = (
+            connect_timeout_ms / 1000
+            if connect_timeout_ms is not None
+            else self._timeout_seconds
+        )
+        self._deadline_seconds = deadline_ms / 1000 if deadline_ms is not None else None
         self._max_retries = max_retries
+        self._retry_budget = retry_budget
+        self._pool = pool
+        self._single_flight = single_flight
+        self._rate_limiter = rate_limiter
+        self._circuit_breaker = circuit_breaker
+        self._hedge_policy = hedge_policy
+        self._codec = json_codec or default_codec()
+        self._idempotency_journal = idempotency_journal
+        self._metrics = metrics
+
+    @property
+    def retry_budget(self) -> RetryBudget | None:
+        return self._retry_budget
+
+    @property
+    def single_flight(self) -> SingleFlight | None:
+        return self._single_flight
+
+    @property
+    def rate_limiter(self) -> RateLimiter | None:
+        return self._rate_limiter
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker | None:
+        return self._circuit_breaker
+
+    @property
+    def hedge_policy(self) -> HedgePolicy | None:
+        return self._hedge_policy
+
+    @property
+    def key_digest(self) -> str:
+        """A short digest of the API key, safe to put in shared cache keys."""
+        return hashlib.sha256(self._api_key.encode()).hexdigest()[:16]
+
+    @property
+    def idempotency_journal(self) -> IdempotencyJournal | None:
+        return self._idempotency_journal
+
+    @property
+    def metrics(self) -> RequestMetrics | None:
+        return self._metrics
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
 
     def request(
         self,
@@ -35,58 +116,244 @@ class HttpClient:
         path: str,
         payload: dict[str, Any] | None = None,
         query: dict[str, Any] | None = None,
+        *,
+        idempotency_key: str | None = None,
     ) -> dict[str, Any] | None:
+        """Send a request and return the decoded JSON body.
+
+        Mutations sent with an ``Idempotency-Key``, given as
+        ``idempotency_key`` or assigned by the journal, are retried like
+        reads.
+        """
         method_upper = method.upper()
-        retries = self._max_retries if method_upper in IDEMPOTENT_METHODS else 0
+        if method_upper in IDEMPOTENT_METHODS:
+            if self._single_flight is not None:
+                # Clients sharing a SingleFlight must not share each other's data.
+                key = (
+                    self._api_key,
+                    method_upper,
+                    build_url(self._base_url, path, query),
+                )
+                return self._single_flight.do(
+                    key, lambda: self._request(method_upper, path, payload, query)
+                )
+        elif self._idempotency_journal is not None:
+            return self._journaled_request(
+                method_upper, path, payload, query, idempotency_key
+            )
+        return self._request(method_upper, path, payload, query, idempotency_key)
+
+    def _journaled_request(
+        self,
+        method_upper: str,
+        path: str,
+        payload: dict[str, Any] | None,
+        query: dict[str, Any] | None,
+        idempotency_key: str | None,
+    ) -> dict[str, Any] | None:
+        journal = self._idempotency_journal
+        assert journal is not None
+        record = journal.begin(
+            method_upper, build_url("", path, query), payload, idempotency_key
+        )
+        if record.state == SUCCEEDED:
+            return record.response
+
+        try:
+            result = self._request(method_upper, path, payload, query, record.key)
+        except ApiError as exc:
+            if 400 <= exc.status < 500 and exc.status not in AMBIGUOUS_STATUSES:
+                journal.fail(record.key, exc.status)
+            else:
+                journal.release(record.key)
+            raise
+        except BaseException:
+            journal.release(record.key)
+            raise
+        journal.succeed(record.key, result)
+        return result
+
+    def _request(
+        self,
+        method_upper: str,
+        path: str,
+        payload: dict[str, Any] | None,
+        query: dict[str, Any] | None,
+        idempotency_key: str | None = None,
+    ) -> dict[str, Any] | None:
+        metrics = self._metrics
+        if metrics is None:
+            return self._request_with_retries(
+                method_upper, path, payload, query, idempotency_key
+            )
+        metrics.record(requests=1)
+        try:
+            return self._request_with_retries(
+                method_upper, path, payload, query, idempotency_key
+            )
+        except ApiError:
+            metrics.record(failures=1)
+            raise
+
+    def _request_with_retries(
+        self,
+        method_upper: str,
+        path: str,
+        payload: dict[str, Any] | None,
+        query: dict[str, Any] | None,
+        idempotency_key: str | None,
+    ) -> dict[str, Any] | None:
+        idempotent = method_upper in IDEMPOTENT_METHODS or idempotency_key is not None
+        limiter = self._rate_limiter
+        group = limiter.classify(method_upper, path) if limiter is not None else None
+        breaker = self._circuit_breaker
+        route = f"{method_upper} {route_template(path)}"
+        deadline = (
+            time.monotonic() + self._deadline_seconds
+            if self._deadline_seconds is not None
+            else None
+        )
+        if self._retry_budget is not None:
+            self._retry_budget.record_request()
+
+        for attempt in range(self._max_retries + 1):
+            # Check the deadline before anything that may block or take a slot.
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise _deadline_exceeded()
+            if breaker is not None:
+                breaker.before_call(route)
 
-        for attempt in range(retries + 1):
+            sent = False
             try:
-                return self._send_once(method_upper, path, payload, query)
+                if limiter is not None and group is not None:
+                    if not limiter.acquire(group, timeout=remaining):
+                        raise _deadline_exceeded()
+
+                started = time.monotonic()
+                if deadline is not None and started >= deadline:
+                    raise _deadline_exceeded()
+
+                sent = True
+                result = self._send(
+                    method_upper, path, payload, query, group, deadline, idempotency_key
+                )
             except HTTPError as exc:
-                body_text = exc.read().decode("utf-8") if exc.fp else ""
-                parsed = _parse_json(body_text)
-                request_id = exc.headers.get("x-request-id") if exc.headers else None
-                code = None
-                message = exc.msg or "Request failed"
-
-                if isinstance(parsed, dict):
-                    message = str(
-                        parsed.get("message") or parsed.get("error") or message
+                if breaker is not None:
+                    breaker.record(
+                        route,
+                        failed=exc.code >= 500,
+                        duration=time.monotonic() - started,
                     )
-                    code = parsed.get("code") or parsed.get("errorCode")
-                    request_id = request_id or parsed.get("requestId")
+                body = exc.read() if exc.fp else b""
+                if exc.code == 429 and self._metrics is not None:
+                    self._metrics.record(throttled=1)
+                if limiter is not None and group is not None:
+                    pause = limiter.observe(group, exc.code, exc.headers)
+                    # A 429 does not prove the request went unprocessed, so only
+                    # requests that are safe to send twice wait and go again.
+                    if (
+                        exc.code == 429
+                        and idempotent
+                        and pause is not None
+                        and pause <= limiter.max_wait
+                        and self._may_retry(attempt, pause, deadline)
+                    ):
+                        continue
 
-                if exc.code >= 500 and attempt < retries:
-                    _sleep(attempt)
-                    continue
+                if exc.code >= 500 and idempotent:
+                    delay = backoff_delay(attempt)
+                    if self._may_retry(attempt, delay, deadline):
+                        time.sleep(delay)
+                        continue
 
-                raise ApiError(
-                    status=exc.code,
-                    message=message,
-                    code=str(code) if code is not None else None,
-                    request_id=str(request_id) if request_id is not None else None,
-                    raw=parsed if parsed is not None else body_text,
+                raise api_error(
+                    exc.code, exc.msg, exc.headers, body, self._codec
                 ) from exc
             except URLError as exc:
-                if attempt < retries:
-                    _sleep(attempt)
-                    continue
+                if breaker is not None:
+                    breaker.record(
+                        route, failed=True, duration=time.monotonic() - started
+                    )
+                if idempotent:
+                    delay = backoff_delay(attempt)
+                    if self._may_retry(attempt, delay, deadline):
+                        time.sleep(delay)
+                        continue
 
                 raise ApiError(
                     status=0, message="Network request failed", raw=str(exc.reason)
                 ) from exc
+            except BaseException:
+                # Every other exit must settle the call too, or a half-open probe
+                # slot is never given back and the route stays open for good.
+                if breaker is not None:
+                    if sent:
+                        breaker.record(
+                            route, failed=True, duration=time.monotonic() - started
+                        )
+                    else:
+                        breaker.release(route)
+                raise
+
+            if breaker is not None:
+                breaker.record(route, failed=False, duration=time.monotonic() - started)
+            return result
 
         raise ApiError(status=0, message="Request exhausted retries")
 
+    def _may_retry(self, attempt: int, delay: float, deadline: float | None) -> bool:
+        if attempt >= self._max_retries:
+            return False
+        # Leave no retry that could only start after the deadline has passed.
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        return self._retry_budget is None or self._retry_budget.try_spend()
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        payload: dict[str, Any] | None,
+        query: dict[str, Any] | None,
+        group: str | None,
+        deadline: float | None,
+        idempotency_key: str | None = None,
+    ) -> dict[str, Any] | None:
+        hedge = self._hedge_policy
+        if hedge is None or method not in IDEMPOTENT_METHODS:
+            return self._send_once(
+                method, path, payload, query, group, deadline, idempotency_key
+            )
+
+        def send() -> dict[str, Any] | None:
+            return self._send_once(method, path, payload, query, group, deadline)
+
+        def send_hedge() -> dict[str, Any] | None:
+            # The hedge is an extra request and must pass the limiter too. It
+            # only helps if sent now, so without a deadline it never waits.
+            if self._rate_limiter is not None and group is not None:
+                remaining = 0.0 if deadline is None else deadline - time.monotonic()
+                if not self._rate_limiter.acquire(group, timeout=max(0.0, remaining)):
+                    raise HedgeDropped()
+            return send()
+
+        return hedge.run(send, send_hedge)
+
     def _send_once(
         self,
         method: str,
         path: str,
         payload: dict[str, Any] | None,
         query: dict[str, Any] | None,
+        group: str | None = None,
+        deadline: float | None = None,
+        idempotency_key: str | None = None,
     ) -> dict[str, Any] | None:
-        url = self._build_url(path, query)
-        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        if self._metrics is not None:
+            self._metrics.record(attempts=1)
+        url = build_url(self._base_url, path, query)
+        data = self._codec.dumps(payload) if payload is not None else None
 
         headers = {
             "Authorization": f"Bearer {self._api_key}",
@@ -94,39 +361,95 @@ class HttpClient:
         }
         if data is not None:
             headers["Content-Type"] = "application/json"
+        if idempotency_key is not None:
+            headers[IDEMPOTENCY_HEADER] = idempotency_key
+
+        timeout = self._timeout_seconds
+        connect_timeout = self._connect_timeout_seconds
+        if deadline is not None:
+            remaining = max(0.001, deadline - time.monotonic())
+            timeout = min(timeout, remaining)
+            connect_timeout = min(connect_timeout, remaining)
 
-        request = Request(url=url, data=data, method=method, headers=headers)
-        with urlopen(request, timeout=self._timeout_seconds) as response:
-            raw = response.read().decode("utf-8")
+        request: Request
+        if self._pool is not None:
+            request = PooledRequest(
+                url=url,
+                data=data,
+                method=method,
+                headers=headers,
+                pool=self._pool,
+                connect_timeout=connect_timeout,
+            )
+        else:
+            request = Request(url=url, data=data, method=method, headers=headers)
+        with urlopen(request, timeout=timeout) as response:
+            if self._rate_limiter is not None and group is not None:
+                self._rate_limiter.observe(group, response.status, response.headers)
+            raw = response.read()
             if not raw:
                 return None
-            return json.loads(raw)
+            return self._codec.loads(raw)
+
+
+def build_url(base_url: str, path: str, query: dict[str, Any] | None) -> str:
+    base = base_url if base_url.endswith("/") else f"{base_url}/"
+    clean_path = path[1:] if path.startswith("/") else path
+    url = urljoin(base, clean_path)
+
+    if not query:
+        return url
+
+    filtered = {key: value for key, value in query.items() if value is not None}
+    if not filtered:
+        return url
 
-    def _build_url(self, path: str, query: dict[str, Any] | None) -> str:
-        base = self._base_url if self._base_url.endswith("/") else f"{self._base_url}/"
-        clean_path = path[1:] if path.startswith("/") else path
-        url = urljoin(base, clean_path)
+    return f"{url}?{urlencode(filtered)}"
 
-        if not query:
-            return url
 
-        filtered = {key: value for key, value in query.items() if value is not None}
-        if not filtered:
-            return url
+def api_error(
+    status: int,
+    reason: str | None,
+    headers: Any,
+    body: bytes,
+    codec: JsonCodec | None = None,
+) -> ApiError:
+    parsed = _parse_json(body, codec or _STDLIB_CODEC)
+    request_id = headers.get("x-request-id") if headers else None
+    code = None
+    message = reason or "Request failed"
 
-        return f"{url}?{urlencode(filtered)}"
+    if isinstance(parsed, dict):
+        message = str(parsed.get("message") or parsed.get("error") or message)
+        code = parsed.get("code") or parsed.get("errorCode")
+        request_id = request_id or parsed.get("requestId")
 
+    return ApiError(
+        status=status,
+        message=message,
+        code=str(code) if code is not None else None,
+        request_id=str(request_id) if request_id is not None else None,
+        raw=parsed if parsed is not None else body.decode("utf-8", "replace"),
+    )
 
-def _parse_json(raw: str) -> Any:
+
+def _deadline_exceeded() -> ApiError:
+    return ApiError(
+        status=0, message="Request deadline exceeded", code=DEADLINE_EXCEEDED_CODE
+    )
+
+
+def backoff_delay(attempt: int) -> float:
+    # Full jitter spreads retries from many clients across the whole window.
+    ceiling = min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+    return random.uniform(0, ceiling)
+
+
+def _parse_json(raw: bytes, codec: JsonCodec) -> Any:
     if not raw:
         return None
 
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        return raw
-
-
-def _sleep(attempt: int) -> None:
-    delay = min(1.0, 0.1 * (2**attempt))
-    time.sleep(delay)
+        return codec.loads(raw)
+    except ValueError:
+        return raw.decode("utf-8", "replace")
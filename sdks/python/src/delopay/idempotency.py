@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from . import forksafe
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+PENDING = "pending"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency (
+    key TEXT PRIMARY KEY,
+    request_hash TEXT NOT NULL,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    state TEXT NOT NULL,
+    status INTEGER,
+    response TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_pending
+    ON idempotency (request_hash) WHERE state = 'pending';
+"""
+_COLUMNS = "key, request_hash, method, path, state, status, response"
+
+
+@dataclass(slots=True)
+class IdempotencyRecord:
+    key: str
+    request_hash: str
+    method: str
+    path: str
+    state: str
+    status: int | None = None
+    response: Any = None
+
+
+class IdempotencyJournal:
+    """SQLite record of the idempotency key used for each mutating request.
+
+    A key is stored as pending before its request is sent and marked succeeded
+    or failed once the API has answered. A request that ends without a
+    definite answer stays pending, and the next identical request (same
+    method, path and payload), in this process or after a restart, is sent
+    with the same key so the API can de-duplicate it. Finished records older
+    than ``max_age`` seconds are pruned when the journal is opened. An
+    in-memory ``":memory:"`` journal forgets its keys on exit and needs
+    ``durable=False``.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        max_age: float = DEFAULT_MAX_AGE,
+        durable: bool = True,
+    ) -> None:
+        if durable and os.fspath(path) == ":memory:":
+            raise ValueError("an in-memory journal is not durable; pass durable=False")
+
+        self._path = path
+        self._durable = durable
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._active: set[str] = set()
+        self._inherited: list[sqlite3.Connection] = []
+        self._db = self._connect()
+        self._db.executescript(_SCHEMA)
+        self.prune()
+        forksafe.register(self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Each process opens its own connection to the same file.
+        journal = partial(type(self), max_age=self._max_age, durable=self._durable)
+        return (journal, (self._path,))
+
+    def begin(
+        self,
+        method: str,
+        path: str,
+        payload: Any = None,
+        key: str | None = None,
+    ) -> IdempotencyRecord:
+        """Return the record to send a request under, creating it if needed.
+
+        With an explicit ``key``, a finished record is returned as is so its
+        stored outcome can be replayed; reusing the key for a different
+        request raises ``ValueError``. Without one, the oldest pending record
+        for the same request that is not in flight here is reused.
+        """
+        request_hash = _request_hash(method, path, payload)
+        with self._lock:
+            if key is not None:
+                record = self._select("key = ?", (key,))
+                if record is not None and record.request_hash != request_hash:
+                    raise ValueError(
+                        f"idempotency key {key!r} was used for a different request"
+                    )
+            else:
+                record = next(
+                    (
+                        candidate
+                        for candidate in self._select_all(
+                            "request_hash = ? AND state = ? ORDER BY updated",
+                            (request_hash, PENDING),
+                        )
+                        if candidate.key not in self._active
+                    ),
+                    None,
+                )
+
+            if record is None:
+                record = IdempotencyRecord(
+                    key=key or uuid.uuid4().hex,
+                    request_hash=request_hash,
+                    method=method,
+                    path=path,
+                    state=PENDING,
+                )
+                self._db.execute(
+                    "INSERT INTO idempotency "
+                    "(key, request_hash, method, path, state, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (record.key, request_hash, method, path, PENDING, time.time()),
+                )
+            if record.state != SUCCEEDED:
+                self._active.add(record.key)
+            return record
+
+    def succeed(self, key: str, response: Any) -> None:
+        self._finish(key, SUCCEEDED, None, json.dumps(response))
+
+    def fail(self, key: str, status: int) -> None:
+        self._finish(key, FAILED, status, None)
+
+    def release(self, key: str) -> None:
+        """Leave ``key`` pending after an ambiguous failure."""
+        with self._lock:
+            self._active.discard(key)
+
+    def get(self, key: str) -> IdempotencyRecord | None:
+        with self._lock:
+            return self._select("key = ?", (key,))
+
+    def pending(self) -> list[IdempotencyRecord]:
+        """Return requests whose outcome is unknown, oldest first."""
+        with self._lock:
+            return self._select_all("state = ? ORDER BY updated", (PENDING,))
+
+    def prune(self, max_age: float | None = None) -> int:
+        """Delete finished records older than ``max_age`` seconds."""
+        cutoff = time.time() - (max_age if max_age is not None else self._max_age)
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM idempotency WHERE state != ? AND updated < ?",
+                (PENDING, cutoff),
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(
+            self._path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        if os.fspath(self._path) != ":memory:":
+            # WAL commits survive a process crash and let other processes read.
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        # Keys in flight belong to the parent's threads.
+        self._active = set()
+        if os.fspath(self._path) != ":memory:":
+            # SQLite connections must not cross a fork, not even to be closed,
+            # so the inherited one is kept unused and the file reopened.
+            self._inherited.append(self._db)
+            self._db = self._connect()
+
+    def _finish(
+        self, key: str, state: str, status: int | None, response: str | None
+    ) -> None:
+        with self._lock:
+            self._active.discard(key)
+            self._db.execute(
+                "UPDATE idempotency SET state = ?, status = ?, response = ?, "
+                "updated = ? WHERE key = ?",
+                (state, status, response, time.time(), key),
+            )
+
+    def _select(
+        self, where: str, parameters: tuple[Any, ...]
+    ) -> IdempotencyRecord | None:
+        records = self._select_all(f"{where} LIMIT 1", parameters)
+        return records[0] if records else None
+
+    def _select_all(
+        self, where: str, parameters: tuple[Any, ...]
+    ) -> list[IdempotencyRecord]:
+        rows = self._db.execute(
+            f"SELECT {_COLUMNS} FROM idempotency WHERE {where}", parameters
+        ).fetchall()
+        records = []
+        for key, request_hash, method, path, state, status, response in rows:
+            records.append(
+                IdempotencyRecord(
+                    key,
+                    request_hash,
+                    method,
+                    path,
+                    state,
+                    status,
+                    json.loads(response) if response is not None else None,
+                )
+            )
+        return records
+
+
+def _request_hash(method: str, path: str, payload: Any) -> str:
+    canonical = json.dumps(
+        [method, path, payload], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, replace
+
+from . import forksafe
+
+
+@dataclass(slots=True)
+class RequestStats:
+    requests: int = 0
+    attempts: int = 0
+    failures: int = 0
+    throttled: int = 0
+
+
+class RequestMetrics:
+    """Counts API calls made through an ``HttpClient``.
+
+    ``requests`` counts calls, ``attempts`` the HTTP requests sent for them
+    (including retries and hedges), ``failures`` the calls that raised
+    ``ApiError`` and ``throttled`` the 429 responses received.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats = RequestStats()
+        forksafe.register(self)
+
+    def record(
+        self,
+        *,
+        requests: int = 0,
+        attempts: int = 0,
+        failures: int = 0,
+        throttled: int = 0,
+    ) -> None:
+        with self._lock:
+            self._stats.requests += requests
+            self._stats.attempts += attempts
+            self._stats.failures += failures
+            self._stats.throttled += throttled
+
+    def stats(self) -> RequestStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
@@ -1,17 +1,53 @@
+# Generated by scripts/generate_models.py from openapi/openapi.json.
+# Do not edit by hand; run ``python scripts/generate_models.py`` instead.
+
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
+from enum import StrEnum
 from typing import Any
 
+from .codec import JsonCodec, default_codec
+
+_DEFAULT_CODEC = default_codec()
+
+
+def _members(enum: type[StrEnum]) -> dict[Any, Any]:
+    return {member.value: member for member in enum}
+
+
+class PaymentProviderType(StrEnum):
+    STRIPE = "STRIPE"
+    PAYPAL = "PAYPAL"
+    NOWPAYMENTS = "NOWPAYMENTS"
+    PAYSAFE = "PAYSAFE"
+
+
+_PAYMENT_PROVIDER_TYPE_BY_VALUE = _members(PaymentProviderType)
+
+
+class PaymentStatus(StrEnum):
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    REQUIRES_ACTION = "REQUIRES_ACTION"
+    NEEDS_CAPTURING = "NEEDS_CAPTURING"
+    PARTIALLY_PAYED = "PARTIALLY_PAYED"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    EXPIRED = "EXPIRED"
+    CANCELLED = "CANCELLED"
+    REFUNDED = "REFUNDED"
+    PARTIALLY_REFUNDED = "PARTIALLY_REFUNDED"
+    DISPUTED = "DISPUTED"
+
 
-def _drop_none(payload: dict[str, Any]) -> dict[str, Any]:
-    return {key: value for key, value in payload.items() if value is not None}
+_PAYMENT_STATUS_BY_VALUE = _members(PaymentStatus)
 
 
 @dataclass(slots=True)
 class CreatePaymentRequest:
     client_order_id: str
-    provider: str
+    provider: PaymentProviderType | str
     amount: float
     currency: str
     success_url: str
@@ -23,20 +59,30 @@ class CreatePaymentRequest:
     auto_capture: bool | None = None
 
     def to_payload(self) -> dict[str, Any]:
-        payload = {
-            "clientOrderId": self.client_order_id,
-            "provider": self.provider,
-            "amount": self.amount,
-            "currency": self.currency,
-            "successUrl": self.success_url,
-            "cancelUrl": self.cancel_url,
-            "description": self.description,
-            "customerEmail": self.customer_email,
-            "callbackUrl": self.callback_url,
-            "metadata": self.metadata,
-            "autoCapture": self.auto_capture,
-        }
-        return _drop_none(payload)
+        payload: dict[str, Any] = {}
+        if self.client_order_id is not None:
+            payload["clientOrderId"] = self.client_order_id
+        if self.provider is not None:
+            payload["provider"] = self.provider
+        if self.amount is not None:
+            payload["amount"] = self.amount
+        if self.currency is not None:
+            payload["currency"] = self.currency
+        if self.success_url is not None:
+            payload["successUrl"] = self.success_url
+        if self.cancel_url is not None:
+            payload["cancelUrl"] = self.cancel_url
+        if self.description is not None:
+            payload["description"] = self.description
+        if self.customer_email is not None:
+            payload["customerEmail"] = self.customer_email
+        if self.callback_url is not None:
+            payload["callbackUrl"] = self.callback_url
+        if self.metadata is not None:
+            payload["metadata"] = self.metadata
+        if self.auto_capture is not None:
+            payload["autoCapture"] = self.auto_capture
+        return payload
 
 
 @dataclass(slots=True)
@@ -48,20 +94,27 @@ class UpdatePaymentRequest:
     amount: float | None = None
     amount_paid: float | None = None
     currency: str | None = None
-    status: str | None = None
+    status: PaymentStatus | str | None = None
 
     def to_payload(self) -> dict[str, Any]:
-        payload = {
-            "metadata": self.metadata,
-            "callbackUrl": self.callback_url,
-            "description": self.description,
-            "customerEmail": self.customer_email,
-            "amount": self.amount,
-            "amountPaid": self.amount_paid,
-            "currency": self.currency,
-            "status": self.status,
-        }
-        return _drop_none(payload)
+        payload: dict[str, Any] = {}
+        if self.metadata is not None:
+            payload["metadata"] = self.metadata
+        if self.callback_url is not None:
+            payload["callbackUrl"] = self.callback_url
+        if self.description is not None:
+            payload["description"] = self.description
+        if self.customer_email is not None:
+            payload["customerEmail"] = self.customer_email
+        if self.amount is not None:
+            payload["amount"] = self.amount
+        if self.amount_paid is not None:
+            payload["amountPaid"] = self.amount_paid
+        if self.currency is not None:
+            payload["currency"] = self.currency
+        if self.status is not None:
+            payload["status"] = self.status
+        return payload
 
 
 @dataclass(slots=True)
@@ -70,15 +123,20 @@ class RefundPaymentRequest:
     reason: str | None = None
 
     def to_payload(self) -> dict[str, Any]:
-        return _drop_none(asdict(self))
+        payload: dict[str, Any] = {}
+        if self.amount is not None:
+            payload["amount"] = self.amount
+        if self.reason is not None:
+            payload["reason"] = self.reason
+        return payload
 
 
 @dataclass(slots=True)
 class PaymentResponse:
     payment_id: str | None = None
     client_order_id: str | None = None
-    provider: str | None = None
-    status: str | None = None
+    provider: PaymentProviderType | str | None = None
+    status: PaymentStatus | str | None = None
     amount: float | None = None
     amount_paid: float | None = None
     currency: str | None = None
@@ -94,23 +152,26 @@ class PaymentResponse:
 
     @staticmethod
     def from_dict(raw: dict[str, Any]) -> "PaymentResponse":
+        get = raw.get
+        provider = get("provider")
+        status = get("status")
         return PaymentResponse(
-            payment_id=raw.get("paymentId"),
-            client_order_id=raw.get("clientOrderId"),
-            provider=raw.get("provider"),
-            status=raw.get("status"),
-            amount=raw.get("amount"),
-            amount_paid=raw.get("amountPaid"),
-            currency=raw.get("currency"),
-            description=raw.get("description"),
-            customer_email=raw.get("customerEmail"),
-            checkout_url=raw.get("checkoutUrl"),
-            provider_payment_id=raw.get("providerPaymentId"),
-            created_at=raw.get("createdAt"),
-            completed_at=raw.get("completedAt"),
-            expires_at=raw.get("expiresAt"),
-            metadata=raw.get("metadata") or {},
-            error_message=raw.get("errorMessage"),
+            get("paymentId"),
+            get("clientOrderId"),
+            _PAYMENT_PROVIDER_TYPE_BY_VALUE.get(provider, provider),
+            _PAYMENT_STATUS_BY_VALUE.get(status, status),
+            get("amount"),
+            get("amountPaid"),
+            get("currency"),
+            get("description"),
+            get("customerEmail"),
+            get("checkoutUrl"),
+            get("providerPaymentId"),
+            get("createdAt"),
+            get("completedAt"),
+            get("expiresAt"),
+            get("metadata") or {},
+            get("errorMessage"),
         )
 
 
@@ -130,18 +191,19 @@ class RefundResponse:
 
     @staticmethod
     def from_dict(raw: dict[str, Any]) -> "RefundResponse":
+        get = raw.get
         return RefundResponse(
-            refund_id=raw.get("refundId"),
-            payment_id=raw.get("paymentId"),
-            provider_refund_id=raw.get("providerRefundId"),
-            amount=raw.get("amount"),
-            original_amount=raw.get("originalAmount"),
-            remaining_amount=raw.get("remainingAmount"),
-            status=raw.get("status"),
-            reason=raw.get("reason"),
-            created_at=raw.get("createdAt"),
-            completed_at=raw.get("completedAt"),
-            error_message=raw.get("errorMessage"),
+            get("refundId"),
+            get("paymentId"),
+            get("providerRefundId"),
+            get("amount"),
+            get("originalAmount"),
+            get("remainingAmount"),
+            get("status"),
+            get("reason"),
+            get("createdAt"),
+            get("completedAt"),
+            get("errorMessage"),
         )
 
 
@@ -151,7 +213,10 @@ class ResendCallbacksResponse:
 
     @staticmethod
     def from_dict(raw: dict[str, Any]) -> "ResendCallbacksResponse":
-        return ResendCallbacksResponse(resent=int(raw.get("resent", 0)))
+        get = raw.get
+        return ResendCallbacksResponse(
+            int(get("resent", 0)),
+        )
 
 
 @dataclass(slots=True)
@@ -165,13 +230,14 @@ class ProviderInfo:
 
     @staticmethod
     def from_dict(raw: dict[str, Any]) -> "ProviderInfo":
+        get = raw.get
         return ProviderInfo(
-            id=raw.get("id"),
-            name=raw.get("name"),
-            enabled=bool(raw.get("enabled", False)),
-            supported_currencies=list(raw.get("supportedCurrencies") or []),
-            features=list(raw.get("features") or []),
-            supported_crypto=list(raw.get("supportedCrypto") or []),
+            get("id"),
+            get("name"),
+            bool(get("enabled", False)),
+            list(get("supportedCurrencies") or ()),
+            list(get("features") or ()),
+            list(get("supportedCrypto") or ()),
         )
 
 
@@ -181,10 +247,9 @@ class ProviderListResponse:
 
     @staticmethod
     def from_dict(raw: dict[str, Any]) -> "ProviderListResponse":
+        get = raw.get
         return ProviderListResponse(
-            providers=[
-                ProviderInfo.from_dict(item) for item in raw.get("providers") or []
-            ]
+            [ProviderInfo.from_dict(item) for item in get("providers") or ()],
         )
 
 
@@ -196,25 +261,11 @@ class ProviderClientConfig:
 
     @staticmethod
     def from_dict(raw: dict[str, Any]) -> "ProviderClientConfig":
+        get = raw.get
         return ProviderClientConfig(
-            provider=raw.get("provider"),
-            publishable_key=raw.get("publishableKey"),
-            client_id=raw.get("clientId"),
-        )
-
-
-@dataclass(slots=True)
-class PaymentMethodDetail:
-    type: str | None = None
-    name: str | None = None
-    icon: str | None = None
-
-    @staticmethod
-    def from_dict(raw: dict[str, Any]) -> "PaymentMethodDetail":
-        return PaymentMethodDetail(
-            type=raw.get("type"),
-            name=raw.get("name"),
-            icon=raw.get("icon"),
+            get("provider"),
+            get("publishableKey"),
+            get("clientId"),
         )
 
 
@@ -228,13 +279,309 @@ class PaymentMethodsResponse:
 
     @staticmethod
     def from_dict(raw: dict[str, Any]) -> "PaymentMethodsResponse":
+        get = raw.get
         return PaymentMethodsResponse(
-            success=bool(raw.get("success", False)),
-            merchant_country=raw.get("merchantCountry"),
-            customer_country=raw.get("customerCountry"),
-            currency=raw.get("currency"),
-            payment_methods=[
+            bool(get("success", False)),
+            get("merchantCountry"),
+            get("customerCountry"),
+            get("currency"),
+            [
                 PaymentMethodDetail.from_dict(item)
-                for item in raw.get("paymentMethods") or []
+                for item in get("paymentMethods") or ()
             ],
         )
+
+
+@dataclass(slots=True)
+class PaymentMethodDetail:
+    type: str | None = None
+    name: str | None = None
+    icon: str | None = None
+
+    @staticmethod
+    def from_dict(raw: dict[str, Any]) -> "PaymentMethodDetail":
+        get = raw.get
+        return PaymentMethodDetail(
+            get("type"),
+            get("name"),
+            get("icon"),
+        )
+
+
+class LazyPaymentResponse(PaymentResponse):
+    """``PaymentResponse`` that decodes each field when it is read."""
+
+    __slots__ = ("_raw", "_data", "_codec")
+
+    def __init__(
+        self, raw: dict[str, Any] | bytes, codec: JsonCodec | None = None
+    ) -> None:
+        if isinstance(raw, dict):
+            self._raw = raw
+        else:
+            self._data = bytes(raw)
+            self._codec = codec
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for ``_raw`` while the wrapped bytes are still undecoded.
+        if name != "_raw":
+            raise AttributeError(name)
+        raw = (self._codec or _DEFAULT_CODEC).loads(self._data)
+        if not isinstance(raw, dict):
+            raise ValueError("response body must be a JSON object")
+        self._raw = raw
+        del self._data
+        return raw
+
+    def materialize(self) -> PaymentResponse:
+        return PaymentResponse.from_dict(self._raw)
+
+    @property
+    def payment_id(self) -> str | None:
+        return self._raw.get("paymentId")
+
+    @payment_id.setter
+    def payment_id(self, value: str | None) -> None:
+        self._raw["paymentId"] = value
+
+    @property
+    def client_order_id(self) -> str | None:
+        return self._raw.get("clientOrderId")
+
+    @client_order_id.setter
+    def client_order_id(self, value: str | None) -> None:
+        self._raw["clientOrderId"] = value
+
+    @property
+    def provider(self) -> PaymentProviderType | str | None:
+        value = self._raw.get("provider")
+        return _PAYMENT_PROVIDER_TYPE_BY_VALUE.get(value, value)
+
+    @provider.setter
+    def provider(self, value: PaymentProviderType | str | None) -> None:
+        self._raw["provider"] = value
+
+    @property
+    def status(self) -> PaymentStatus | str | None:
+        value = self._raw.get("status")
+        return _PAYMENT_STATUS_BY_VALUE.get(value, value)
+
+    @status.setter
+    def status(self, value: PaymentStatus | str | None) -> None:
+        self._raw["status"] = value
+
+    @property
+    def amount(self) -> float | None:
+        return self._raw.get("amount")
+
+    @amount.setter
+    def amount(self, value: float | None) -> None:
+        self._raw["amount"] = value
+
+    @property
+    def amount_paid(self) -> float | None:
+        return self._raw.get("amountPaid")
+
+    @amount_paid.setter
+    def amount_paid(self, value: float | None) -> None:
+        self._raw["amountPaid"] = value
+
+    @property
+    def currency(self) -> str | None:
+        return self._raw.get("currency")
+
+    @currency.setter
+    def currency(self, value: str | None) -> None:
+        self._raw["currency"] = value
+
+    @property
+    def description(self) -> str | None:
+        return self._raw.get("description")
+
+    @description.setter
+    def description(self, value: str | None) -> None:
+        self._raw["description"] = value
+
+    @property
+    def customer_email(self) -> str | None:
+        return self._raw.get("customerEmail")
+
+    @customer_email.setter
+    def customer_email(self, value: str | None) -> None:
+        self._raw["customerEmail"] = value
+
+    @property
+    def checkout_url(self) -> str | None:
+        return self._raw.get("checkoutUrl")
+
+    @checkout_url.setter
+    def checkout_url(self, value: str | None) -> None:
+        self._raw["checkoutUrl"] = value
+
+    @property
+    def provider_payment_id(self) -> str | None:
+        return self._raw.get("providerPaymentId")
+
+    @provider_payment_id.setter
+    def provider_payment_id(self, value: str | None) -> None:
+        self._raw["providerPaymentId"] = value
+
+    @property
+    def created_at(self) -> str | None:
+        return self._raw.get("createdAt")
+
+    @created_at.setter
+    def created_at(self, value: str | None) -> None:
+        self._raw["createdAt"] = value
+
+    @property
+    def completed_at(self) -> str | None:
+        return self._raw.get("completedAt")
+
+    @completed_at.setter
+    def completed_at(self, value: str | None) -> None:
+        self._raw["completedAt"] = value
+
+    @property
+    def expires_at(self) -> str | None:
+        return self._raw.get("expiresAt")
+
+    @expires_at.setter
+    def expires_at(self, value: str | None) -> None:
+        self._raw["expiresAt"] = value
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        value = self._raw.get("metadata")
+        if value is None:
+            value = self._raw["metadata"] = {}
+        return value
+
+    @metadata.setter
+    def metadata(self, value: dict[str, Any]) -> None:
+        self._raw["metadata"] = value
+
+    @property
+    def error_message(self) -> str | None:
+        return self._raw.get("errorMessage")
+
+    @error_message.setter
+    def error_message(self, value: str | None) -> None:
+        self._raw["errorMessage"] = value
+
+
+class LazyRefundResponse(RefundResponse):
+    """``RefundResponse`` that decodes each field when it is read."""
+
+    __slots__ = ("_raw", "_data", "_codec")
+
+    def __init__(
+        self, raw: dict[str, Any] | bytes, codec: JsonCodec | None = None
+    ) -> None:
+        if isinstance(raw, dict):
+            self._raw = raw
+        else:
+            self._data = bytes(raw)
+            self._codec = codec
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for ``_raw`` while the wrapped bytes are still undecoded.
+        if name != "_raw":
+            raise AttributeError(name)
+        raw = (self._codec or _DEFAULT_CODEC).loads(self._data)
+        if not isinstance(raw, dict):
+            raise ValueError("response body must be a JSON object")
+        self._raw = raw
+        del self._data
+        return raw
+
+    def materialize(self) -> RefundResponse:
+        return RefundResponse.from_dict(self._raw)
+
+    @property
+    def refund_id(self) -> str | None:
+        return self._raw.get("refundId")
+
+    @refund_id.setter
+    def refund_id(self, value: str | None) -> None:
+        self._raw["refundId"] = value
+
+    @property
+    def payment_id(self) -> str | None:
+        return self._raw.get("paymentId")
+
+    @payment_id.setter
+    def payment_id(self, value: str | None) -> None:
+        self._raw["paymentId"] = value
+
+    @property
+    def provider_refund_id(self) -> str | None:
+        return self._raw.get("providerRefundId")
+
+    @provider_refund_id.setter
+    def provider_refund_id(self, value: str | None) -> None:
+        self._raw["providerRefundId"] = value
+
+    @property
+    def amount(self) -> float | None:
+        return self._raw.get("amount")
+
+    @amount.setter
+    def amount(self, value: float | None) -> None:
+        self._raw["amount"] = value
+
+    @property
+    def original_amount(self) -> float | None:
+        return self._raw.get("originalAmount")
+
+    @original_amount.setter
+    def original_amount(self, value: float | None) -> None:
+        self._raw["originalAmount"] = value
+
+    @property
+    def remaining_amount(self) -> float | None:
+        return self._raw.get("remainingAmount")
+
+    @remaining_amount.setter
+    def remaining_amount(self, value: float | None) -> None:
+        self._raw["remainingAmount"] = value
+
+    @property
+    def status(self) -> str | None:
+        return self._raw.get("status")
+
+    @status.setter
+    def status(self, value: str | None) -> None:
+        self._raw["status"] = value
+
+    @property
+    def reason(self) -> str | None:
+        return self._raw.get("reason")
+
+    @reason.setter
+    def reason(self, value: str | None) -> None:
+        self._raw["reason"] = value
+
+    @property
+    def created_at(self) -> str | None:
+        return self._raw.get("createdAt")
+
+    @created_at.setter
+    def created_at(self, value: str | None) -> None:
+        self._raw["createdAt"] = value
+
+    @property
+    def completed_at(self) -> str | None:
+        return self._raw.get("completedAt")
+
+    @completed_at.setter
+    def completed_at(self, value: str | None) -> None:
+        self._raw["completedAt"] = value
+
+    @property
+    def error_message(self) -> str | None:
+        return self._raw.get("errorMessage")
+
+    @error_message.setter
+    def error_message(self, value: str | None) -> None:
+        self._raw["errorMessage"] = value
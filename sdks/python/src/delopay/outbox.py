@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, fields, replace
+from typing import Any
+
+from . import forksafe
+from .errors import ApiError
+from .models import CreatePaymentRequest, PaymentResponse
+from .payments import PaymentsClient, to_payload
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 300.0
+
+PENDING = "pending"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    client_order_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    payment TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (state, next_attempt);
+"""
+_PAYMENT_FIELDS = tuple(field.name for field in fields(PaymentResponse))
+
+
+@dataclass(slots=True)
+class OutboxEntry:
+    client_order_id: str
+    state: str
+    attempts: int = 0
+    payment: PaymentResponse | None = None
+    error: ApiError | None = None
+
+
+@dataclass(slots=True)
+class OutboxStats:
+    submitted: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    handler_errors: int = 0
+
+
+class PaymentOutbox:
+    """Durable queue of payment creations sent by background threads.
+
+    ``submit`` commits the request to a SQLite file and returns at once;
+    ``workers`` threads then call ``payments.create`` with an idempotency key
+    derived from the order ID, so the client's rate limiter still applies.
+    Network errors, 5xx and 429 are retried with jittered exponential backoff
+    up to ``max_attempts``, and a 409 is resolved by looking the order up.
+    The final outcome is passed to ``on_result`` and kept for
+    ``get(client_order_id)``. Orders left pending by a previous process are
+    sent when the outbox is opened again. An in-memory ``":memory:"`` outbox
+    loses its queue with the process and needs ``durable=False``.
+    """
+
+    def __init__(
+        self,
+        payments: PaymentsClient,
+        path: str | os.PathLike[str],
+        *,
+        durable: bool = True,
+        workers: int = DEFAULT_WORKERS,
+        on_result: Callable[[str, PaymentResponse | ApiError], None] | None = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if workers < 1 or max_attempts < 1:
+            raise ValueError("workers and max_attempts must be at least 1")
+        in_memory = os.fspath(path) == ":memory:"
+        if in_memory and durable:
+            raise ValueError("an in-memory outbox is not durable; pass durable=False")
+
+        self._payments = payments
+        self._on_result = on_result
+        self._max_attempts = max_attempts
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._claimed: set[str] = set()
+        self._closed = False
+        # Orders still pending when close() finished; None while open or unknown.
+        self._left_pending: int | None = None
+        self._inherited: list[sqlite3.Connection] = []
+        self._stats = OutboxStats()
+        self._db = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        if not in_memory:
+            # An acknowledged order must survive power loss, not only a crash.
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(_SCHEMA)
+        self._threads = [
+            threading.Thread(
+                target=self._run, name=f"delopay-outbox-{index}", daemon=True
+            )
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        forksafe.register(self)
+
+    def __enter__(self) -> PaymentOutbox:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def submit(self, request: CreatePaymentRequest | dict[str, Any]) -> str:
+        """Queue a payment and return its ``client_order_id``."""
+        return self.submit_many([request])[0]
+
+    def submit_many(
+        self, requests: Iterable[CreatePaymentRequest | dict[str, Any]]
+    ) -> list[str]:
+        """Queue several payments in one transaction.
+
+        Submitting an order ID again with the same request is a no-op; with a
+        different request it raises ``ValueError`` and nothing is queued.
+        """
+        rows = []
+        for request in requests:
+            body = to_payload(request)
+            client_order_id = body.get("clientOrderId")
+            if not client_order_id:
+                raise ValueError("outbox requests need a clientOrderId")
+            rows.append((str(client_order_id), json.dumps(body, sort_keys=True)))
+
+        with self._condition:
+            self._check_open()
+            added = 0
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for client_order_id, payload in rows:
+                    existing = self._db.execute(
+                        "SELECT payload FROM outbox WHERE client_order_id = ?",
+                        (client_order_id,),
+                    ).fetchone()
+                    if existing is not None:
+                        if existing[0] != payload:
+                            raise ValueError(
+                                f"order {client_order_id!r} was queued with a "
+                                "different request"
+                            )
+                        continue
+                    self._db.execute(
+                        "INSERT INTO outbox "
+                        "(client_order_id, payload, state, next_attempt) "
+                        "VALUES (?, ?, ?, ?)",
+                        (client_order_id, payload, PENDING, self._clock()),
+                    )
+                    added += 1
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            self._stats.submitted += added
+            self._condition.notify_all()
+        return [client_order_id for client_order_id, _ in rows]
+
+    def get(self, client_order_id: str) -> OutboxEntry | None:
+        with self._condition:
+            self._check_open()
+            row = self._db.execute(
+                "SELECT state, attempts, payment, error FROM outbox "
+                "WHERE client_order_id = ?",
+                (client_order_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        state, attempts, payment, error = row
+        return OutboxEntry(
+            client_order_id,
+            state,
+            attempts,
+            PaymentResponse.from_dict(json.loads(payment)) if payment else None,
+            ApiError(**json.loads(error)) if error else None,
+        )
+
+    def pending(self) -> int:
+        with self._condition:
+            self._check_open()
+            return self._count_pending()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until no order is pending; return False on timeout.
+
+        A closed outbox sends nothing more, so this returns at once: True only
+        if close() left no order pending.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                if self._closed:
+                    return self._left_pending == 0
+                if not self._count_pending():
+                    return True
+                remaining = (
+                    deadline - time.monotonic() if deadline is not None else None
+                )
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+
+    def stats(self) -> OutboxStats:
+        with self._condition:
+            return replace(self._stats)
+
+    def close(self) -> None:
+        """Stop the workers after their current call; pending orders stay queued."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        with self._condition:
+            self._left_pending = self._count_pending()
+            self._db.close()
+            self._condition.notify_all()
+
+    def _after_fork(self) -> None:
+        # The workers stay in the parent, which still owns the database
+        # connection; a child that needs an outbox opens its own. SQLite
+        # connections must not cross a fork, not even to be closed, so the
+        # inherited one is kept referenced and unused.
+        self._condition = threading.Condition()
+        self._closed = True
+        self._left_pending = None
+        self._inherited.append(self._db)
+        self._threads = []
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                claim = self._claim()
+                while claim is None or isinstance(claim, float):
+                    if self._closed:
+                        return
+                    self._condition.wait(claim)
+                    claim = self._claim()
+                client_order_id, payload, attempts = claim
+
+            outcome = self._deliver(client_order_id, payload)
+            self._record(client_order_id, attempts + 1, outcome)
+
+    def _claim(self) -> tuple[str, dict[str, Any], int] | float | None:
+        # Returns a claimed order, the seconds until one is due, or None.
+        if self._closed:
+            return None
+        rows = self._db.execute(
+            "SELECT client_order_id, payload, attempts, next_attempt FROM outbox "
+            "WHERE state = ? ORDER BY next_attempt, rowid LIMIT ?",
+            (PENDING, len(self._claimed) + 1),
+        ).fetchall()
+        for client_order_id, payload, attempts, next_attempt in rows:
+            if client_order_id in self._claimed:
+                continue
+            wait = next_attempt - self._clock()
+            if wait > 0:
+                return wait
+            self._claimed.add(client_order_id)
+            return client_order_id, json.loads(payload), attempts
+        return None
+
+    def _deliver(
+        self, client_order_id: str, payload: dict[str, Any]
+    ) -> PaymentResponse | ApiError:
+        try:
+            return self._payments.create(
+                payload, idempotency_key=f"outbox-{client_order_id}"
+            )
+        except ApiError as exc:
+            if exc.status != 409:
+                return exc
+        except Exception as exc:
+            return ApiError(status=0, message="Outbox delivery failed", raw=repr(exc))
+
+        # The order exists, most likely from an attempt whose reply was lost.
+        try:
+            return self._payments.get_by_order(client_order_id)
+        except ApiError as exc:
+            return exc
+
+    def _record(
+        self, client_order_id: str, attempts: int, outcome: PaymentResponse | ApiError
+    ) -> None:
+        final = True
+        with self._condition:
+            # Released only once the new state is stored, so no other worker
+            # can pick the order up in between.
+            self._claimed.discard(client_order_id)
+            if not isinstance(outcome, ApiError):
+                self._stats.succeeded += 1
+                self._update(
+                    client_order_id,
+                    state=SUCCEEDED,
+                    attempts=attempts,
+                    payment=json.dumps(_payment_payload(outcome)),
+                )
+            elif _is_retryable(outcome) and attempts < self._max_attempts:
+                final = False
+                self._stats.retries += 1
+                self._update(
+                    client_order_id,
+                    attempts=attempts,
+                    next_attempt=self._clock() + _backoff(attempts),
+                )
+            else:
+                self._stats.failed += 1
+                self._update(
+                    client_order_id,
+                    state=FAILED,
+                    attempts=attempts,
+                    error=json.dumps(
+                        {
+                            "status": outcome.status,
+                            "message": outcome.message,
+                            "code": outcome.code,
+                            "request_id": outcome.request_id,
+                        }
+                    ),
+                )
+            self._condition.notify_all()
+
+        if final and self._on_result is not None:
+            try:
+                self._on_result(client_order_id, outcome)
+            except Exception:
+                with self._condition:
+                    self._stats.handler_errors += 1
+
+    def _update(self, client_order_id: str, **values: Any) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in values)
+        self._db.execute(
+            f"UPDATE outbox SET {assignments} WHERE client_order_id = ?",
+            (*values.values(), client_order_id),
+        )
+
+    def _count_pending(self) -> int:
+        row = self._db.execute(
+            "SELECT COUNT(*) FROM outbox WHERE state = ?", (PENDING,)
+        ).fetchone()
+        return int(row[0])
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise ValueError("outbox is closed")
+
+
+def _is_retryable(error: ApiError) -> bool:
+    return error.status == 0 or error.status == 429 or error.status >= 500
+
+
+def _backoff(attempts: int) -> float:
+    ceiling = min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return random.uniform(0, ceiling)
+
+
+def _payment_payload(payment: PaymentResponse) -> dict[str, Any]:
+    return {_camel_case(name): getattr(payment, name) for name in _PAYMENT_FIELDS}
+
+
+def _camel_case(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(part.title() for part in rest)
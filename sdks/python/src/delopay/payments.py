@@ -1,68 +1,349 @@
 from __future__ import annotations
 
+import os
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from dataclasses import asdict, is_dataclass
 from typing import Any
 from urllib.parse import quote
 
+from .async_http import AsyncHttpClient
+from .bulk import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_MIN_SAMPLES,
+    BulkReport,
+    iter_results,
+    run_mutations,
+)
+from .errors import ApiError
 from .http import HttpClient
 from .models import (
     CreatePaymentRequest,
+    LazyPaymentResponse,
+    LazyRefundResponse,
     PaymentResponse,
     RefundPaymentRequest,
     RefundResponse,
     ResendCallbacksResponse,
     UpdatePaymentRequest,
 )
+from .polling import FINAL_STATUSES, PollSchedule, StatusEvent, wait_for_status, watch
+from .store import PaymentStore
 
 
 class PaymentsClient:
-    def __init__(self, http: HttpClient) -> None:
+    def __init__(
+        self,
+        http: HttpClient,
+        *,
+        lazy_models: bool = False,
+        store: PaymentStore | None = None,
+        tenant: str | None = None,
+    ) -> None:
         self._http = http
+        self._payment, self._refund = _decoders(lazy_models)
+        self._store = store
+        if store is not None:
+            store.bind(tenant or http.key_digest)
+
+    @property
+    def store(self) -> PaymentStore | None:
+        return self._store
 
-    def create(self, request: CreatePaymentRequest | dict[str, Any]) -> PaymentResponse:
-        raw = self._http.request("POST", "/api/payments/create", _to_payload(request))
-        return PaymentResponse.from_dict(raw or {})
+    def invalidate(
+        self, payment_id: str | None = None, *, client_order_id: str | None = None
+    ) -> None:
+        if self._store is not None:
+            self._store.invalidate(payment_id, client_order_id=client_order_id)
+
+    def create(
+        self,
+        request: CreatePaymentRequest | dict[str, Any],
+        *,
+        idempotency_key: str | None = None,
+    ) -> PaymentResponse:
+        raw = self._http.request(
+            "POST",
+            "/api/payments/create",
+            to_payload(request),
+            idempotency_key=idempotency_key,
+        )
+        return self._stored(self._payment(raw or {}))
 
     def get(self, payment_id: str) -> PaymentResponse:
-        raw = self._http.request("GET", f"/api/payments/{quote(payment_id, safe='')}")
-        return PaymentResponse.from_dict(raw or {})
+        if self._store is not None:
+            return self._store.get_or_load(payment_id, lambda: self._fetch(payment_id))
+        return self._fetch(payment_id)
 
     def get_by_order(self, client_order_id: str) -> PaymentResponse:
-        raw = self._http.request(
-            "GET", f"/api/payments/by-order/{quote(client_order_id, safe='')}"
+        if self._store is not None:
+            return self._store.get_by_order_or_load(
+                client_order_id, lambda: self._fetch_by_order(client_order_id)
+            )
+        return self._fetch_by_order(client_order_id)
+
+    def get_many(
+        self,
+        payment_ids: Iterable[str],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = False,
+    ) -> Iterator[tuple[str, PaymentResponse | ApiError]]:
+        return iter_results(
+            self.get, payment_ids, max_workers=max_workers, ordered=ordered
+        )
+
+    def get_by_order_many(
+        self,
+        client_order_ids: Iterable[str],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = False,
+    ) -> Iterator[tuple[str, PaymentResponse | ApiError]]:
+        return iter_results(
+            self.get_by_order,
+            client_order_ids,
+            max_workers=max_workers,
+            ordered=ordered,
+        )
+
+    def wait_for_status(
+        self,
+        payment_id: str,
+        targets: str | Iterable[str],
+        timeout: float,
+        *,
+        schedule: PollSchedule | None = None,
+    ) -> PaymentResponse:
+        return wait_for_status(
+            self._poll,
+            payment_id,
+            [targets] if isinstance(targets, str) else targets,
+            timeout,
+            schedule=schedule or PollSchedule(),
+        )
+
+    def watch(
+        self,
+        payment_ids: Iterable[str],
+        *,
+        until: Iterable[str] = FINAL_STATUSES,
+        schedule: PollSchedule | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float | None = None,
+    ) -> Iterator[StatusEvent]:
+        return watch(
+            self._poll,
+            payment_ids,
+            until=until,
+            schedule=schedule or PollSchedule(),
+            max_workers=max_workers,
+            timeout=timeout,
         )
-        return PaymentResponse.from_dict(raw or {})
 
     def update(
-        self, payment_id: str, request: UpdatePaymentRequest | dict[str, Any]
+        self,
+        payment_id: str,
+        request: UpdatePaymentRequest | dict[str, Any],
+        *,
+        idempotency_key: str | None = None,
     ) -> PaymentResponse:
         raw = self._http.request(
-            "PUT", f"/api/payments/{quote(payment_id, safe='')}", _to_payload(request)
+            "PUT",
+            f"/api/payments/{quote(payment_id, safe='')}",
+            to_payload(request),
+            idempotency_key=idempotency_key,
         )
-        return PaymentResponse.from_dict(raw or {})
+        return self._stored(self._payment(raw or {}))
 
-    def capture(self, payment_id: str) -> PaymentResponse:
+    def capture(
+        self, payment_id: str, *, idempotency_key: str | None = None
+    ) -> PaymentResponse:
         raw = self._http.request(
-            "POST", f"/api/payments/{quote(payment_id, safe='')}/capture"
+            "POST",
+            f"/api/payments/{quote(payment_id, safe='')}/capture",
+            idempotency_key=idempotency_key,
         )
-        return PaymentResponse.from_dict(raw or {})
+        return self._stored(self._payment(raw or {}))
 
     def refund(
-        self, payment_id: str, request: RefundPaymentRequest | dict[str, Any]
+        self,
+        payment_id: str,
+        request: RefundPaymentRequest | dict[str, Any],
+        *,
+        idempotency_key: str | None = None,
     ) -> RefundResponse:
         raw = self._http.request(
             "POST",
             f"/api/payments/{quote(payment_id, safe='')}/refund",
-            _to_payload(request),
+            to_payload(request),
+            idempotency_key=idempotency_key,
         )
-        return RefundResponse.from_dict(raw or {})
+        # The refund response does not carry the payment's new status.
+        self.invalidate(payment_id)
+        return self._refund(raw or {})
 
     def resend_failed_callbacks(self) -> ResendCallbacksResponse:
         raw = self._http.request("POST", "/api/payments/resend-failed-callbacks")
         return ResendCallbacksResponse.from_dict(raw or {})
 
+    def capture_many(
+        self,
+        payment_ids: Iterable[str],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        checkpoint: str | os.PathLike[str] | None = None,
+        max_error_rate: float | None = None,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ) -> BulkReport[PaymentResponse]:
+        return run_mutations(
+            self.capture,
+            ((payment_id, (payment_id,)) for payment_id in payment_ids),
+            max_workers=max_workers,
+            checkpoint=checkpoint,
+            max_error_rate=max_error_rate,
+            min_samples=min_samples,
+            keyed=self._http.idempotency_journal is not None,
+        )
+
+    def refund_many(
+        self,
+        refunds: (
+            Mapping[str, RefundPaymentRequest | dict[str, Any]]
+            | Iterable[tuple[str, RefundPaymentRequest | dict[str, Any]]]
+        ),
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        checkpoint: str | os.PathLike[str] | None = None,
+        max_error_rate: float | None = None,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ) -> BulkReport[RefundResponse]:
+        return run_mutations(
+            self.refund,
+            _keyed_calls(refunds),
+            max_workers=max_workers,
+            checkpoint=checkpoint,
+            max_error_rate=max_error_rate,
+            min_samples=min_samples,
+            keyed=self._http.idempotency_journal is not None,
+        )
+
+    def update_many(
+        self,
+        updates: (
+            Mapping[str, UpdatePaymentRequest | dict[str, Any]]
+            | Iterable[tuple[str, UpdatePaymentRequest | dict[str, Any]]]
+        ),
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        checkpoint: str | os.PathLike[str] | None = None,
+        max_error_rate: float | None = None,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ) -> BulkReport[PaymentResponse]:
+        return run_mutations(
+            self.update,
+            _keyed_calls(updates),
+            max_workers=max_workers,
+            checkpoint=checkpoint,
+            max_error_rate=max_error_rate,
+            min_samples=min_samples,
+            keyed=self._http.idempotency_journal is not None,
+        )
+
+    def _fetch(self, payment_id: str) -> PaymentResponse:
+        raw = self._http.request("GET", f"/api/payments/{quote(payment_id, safe='')}")
+        return self._payment(raw or {})
+
+    def _fetch_by_order(self, client_order_id: str) -> PaymentResponse:
+        raw = self._http.request(
+            "GET", f"/api/payments/by-order/{quote(client_order_id, safe='')}"
+        )
+        return self._payment(raw or {})
+
+    def _poll(self, payment_id: str) -> PaymentResponse:
+        # Polling looks for changes, so it reads past the store but refreshes it.
+        return self._stored(self._fetch(payment_id))
+
+    def _stored(self, payment: PaymentResponse) -> PaymentResponse:
+        if self._store is not None:
+            self._store.put(payment)
+        return payment
+
+
+class AsyncPaymentsClient:
+    def __init__(self, http: AsyncHttpClient, *, lazy_models: bool = False) -> None:
+        self._http = http
+        self._payment, self._refund = _decoders(lazy_models)
+
+    async def create(
+        self, request: CreatePaymentRequest | dict[str, Any]
+    ) -> PaymentResponse:
+        raw = await self._http.request(
+            "POST", "/api/payments/create", to_payload(request)
+        )
+        return self._payment(raw or {})
+
+    async def get(self, payment_id: str) -> PaymentResponse:
+        raw = await self._http.request(
+            "GET", f"/api/payments/{quote(payment_id, safe='')}"
+        )
+        return self._payment(raw or {})
+
+    async def get_by_order(self, client_order_id: str) -> PaymentResponse:
+        raw = await self._http.request(
+            "GET", f"/api/payments/by-order/{quote(client_order_id, safe='')}"
+        )
+        return self._payment(raw or {})
+
+    async def update(
+        self, payment_id: str, request: UpdatePaymentRequest | dict[str, Any]
+    ) -> PaymentResponse:
+        raw = await self._http.request(
+            "PUT", f"/api/payments/{quote(payment_id, safe='')}", to_payload(request)
+        )
+        return self._payment(raw or {})
+
+    async def capture(self, payment_id: str) -> PaymentResponse:
+        raw = await self._http.request(
+            "POST", f"/api/payments/{quote(payment_id, safe='')}/capture"
+        )
+        return self._payment(raw or {})
+
+    async def refund(
+        self, payment_id: str, request: RefundPaymentRequest | dict[str, Any]
+    ) -> RefundResponse:
+        raw = await self._http.request(
+            "POST",
+            f"/api/payments/{quote(payment_id, safe='')}/refund",
+            to_payload(request),
+        )
+        return self._refund(raw or {})
+
+    async def resend_failed_callbacks(self) -> ResendCallbacksResponse:
+        raw = await self._http.request("POST", "/api/payments/resend-failed-callbacks")
+        return ResendCallbacksResponse.from_dict(raw or {})
+
+
+def _decoders(
+    lazy: bool,
+) -> tuple[
+    Callable[[dict[str, Any]], PaymentResponse],
+    Callable[[dict[str, Any]], RefundResponse],
+]:
+    if lazy:
+        return LazyPaymentResponse, LazyRefundResponse
+    return PaymentResponse.from_dict, RefundResponse.from_dict
+
+
+def _keyed_calls(
+    items: Mapping[str, Any] | Iterable[tuple[str, Any]],
+) -> Iterator[tuple[str, tuple[str, Any]]]:
+    pairs = items.items() if isinstance(items, Mapping) else items
+    for payment_id, request in pairs:
+        yield payment_id, (payment_id, to_payload(request))
+
 
-def _to_payload(value: Any) -> dict[str, Any]:
+def to_payload(value: Any) -> dict[str, Any]:
+    """Return the JSON body for a request model, dataclass or plain dict."""
     if isinstance(value, dict):
         return value
 
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from .errors import ApiError
+from .models import PaymentResponse, PaymentStatus
+
+# Statuses a payment does not leave without further action from the merchant.
+FINAL_STATUSES = frozenset(
+    {
+        PaymentStatus.COMPLETED,
+        PaymentStatus.FAILED,
+        PaymentStatus.EXPIRED,
+        PaymentStatus.CANCELLED,
+        PaymentStatus.REFUNDED,
+    }
+)
+# Where settled payments can still move; any other status may reach anything.
+SETTLED_TRANSITIONS: dict[str, frozenset[str]] = {
+    PaymentStatus.COMPLETED: frozenset(
+        {
+            PaymentStatus.REFUNDED,
+            PaymentStatus.PARTIALLY_REFUNDED,
+            PaymentStatus.DISPUTED,
+        }
+    ),
+    PaymentStatus.PARTIALLY_REFUNDED: frozenset(
+        {PaymentStatus.REFUNDED, PaymentStatus.DISPUTED}
+    ),
+    PaymentStatus.DISPUTED: frozenset(
+        {PaymentStatus.COMPLETED, PaymentStatus.REFUNDED}
+    ),
+    PaymentStatus.REFUNDED: frozenset(),
+    PaymentStatus.FAILED: frozenset(),
+    PaymentStatus.EXPIRED: frozenset(),
+    PaymentStatus.CANCELLED: frozenset(),
+}
+# Statuses that describe the request rather than the payment; polling continues.
+TRANSIENT_STATUSES = {0, 408, 429}
+WAIT_TIMEOUT_CODE = "WAIT_TIMEOUT"
+STATUS_UNREACHABLE_CODE = "STATUS_UNREACHABLE"
+# Time allowed after ``expires_at`` for the server to flip the status.
+EXPIRY_GRACE_SECONDS = 2.0
+
+
+@dataclass(slots=True)
+class StatusEvent:
+    payment_id: str
+    previous: str | None
+    payment: PaymentResponse | None = None
+    error: ApiError | None = None
+
+    @property
+    def status(self) -> str | None:
+        return self.payment.status if self.payment is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class PollSchedule:
+    """Polls young payments often and older ones progressively less.
+
+    The delay is ``age_factor`` times the payment's age, clamped to
+    ``[min_interval, max_interval]`` and never later than just after
+    ``expires_at``, when the status is expected to change.
+    """
+
+    min_interval: float = 1.0
+    max_interval: float = 60.0
+    age_factor: float = 0.1
+
+    def next_delay(
+        self, payment: PaymentResponse | None, *, now: float, first_seen: float
+    ) -> float:
+        created = _timestamp(payment.created_at) if payment is not None else None
+        age = max(0.0, now - (created if created is not None else first_seen))
+        delay = min(self.max_interval, max(self.min_interval, age * self.age_factor))
+
+        expires = _timestamp(payment.expires_at) if payment is not None else None
+        if expires is not None and now < expires + EXPIRY_GRACE_SECONDS:
+            delay = min(delay, expires + EXPIRY_GRACE_SECONDS - now)
+        return delay
+
+
+def wait_for_status(
+    get: Callable[[str], PaymentResponse],
+    payment_id: str,
+    targets: Iterable[str],
+    timeout: float,
+    *,
+    schedule: PollSchedule,
+    clock: Callable[[], float] = time.time,
+    sleep: Callable[[float], None] = time.sleep,
+) -> PaymentResponse:
+    wanted = set(targets)
+    started = clock()
+    deadline = started + timeout
+    payment: PaymentResponse | None = None
+
+    while True:
+        try:
+            payment = get(payment_id)
+        except ApiError as exc:
+            if not _is_transient(exc):
+                raise
+        else:
+            if payment.status in wanted:
+                return payment
+            if not can_reach(payment.status, wanted):
+                raise ApiError(
+                    status=0,
+                    message=(
+                        f"Payment {payment_id} is {payment.status} and can no "
+                        f"longer reach {sorted(wanted)}"
+                    ),
+                    code=STATUS_UNREACHABLE_CODE,
+                    raw=payment,
+                )
+
+        now = clock()
+        delay = schedule.next_delay(payment, now=now, first_seen=started)
+        if now + delay > deadline:
+            raise ApiError(
+                status=0,
+                message=f"Payment {payment_id} did not reach {sorted(wanted)}",
+                code=WAIT_TIMEOUT_CODE,
+                raw=payment,
+            )
+        sleep(delay)
+
+
+def can_reach(status: str | None, targets: Iterable[str]) -> bool:
+    """Return whether a payment in ``status`` may still move to one of ``targets``."""
+    if status not in SETTLED_TRANSITIONS:
+        return True
+    wanted = set(targets)
+    seen = {status}
+    frontier = [status]
+    while frontier:
+        for following in SETTLED_TRANSITIONS.get(frontier.pop(), ()):
+            if following in wanted:
+                return True
+            if following not in seen:
+                seen.add(following)
+                frontier.append(following)
+    return False
+
+
+def watch(
+    get: Callable[[str], PaymentResponse],
+    payment_ids: Iterable[str],
+    *,
+    until: Iterable[str],
+    schedule: PollSchedule,
+    max_workers: int,
+    timeout: float | None = None,
+    clock: Callable[[], float] = time.time,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[StatusEvent]:
+    stop = set(until)
+    started = clock()
+    deadline = started + timeout if timeout is not None else None
+    order = itertools.count()
+    due: list[tuple[float, int, str]] = [
+        (started, next(order), payment_id) for payment_id in dict.fromkeys(payment_ids)
+    ]
+    heapq.heapify(due)
+    last: dict[str, PaymentResponse | None] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: dict[Future, str] = {}
+        while due or in_flight:
+            now = clock()
+            if deadline is not None and now >= deadline:
+                break
+
+            while due and due[0][0] <= now and len(in_flight) < max_workers:
+                _, _, payment_id = heapq.heappop(due)
+                in_flight[executor.submit(get, payment_id)] = payment_id
+
+            # Wake for the next due poll unless every worker is busy anyway.
+            wake = due[0][0] if due and len(in_flight) < max_workers else None
+            if deadline is not None:
+                wake = min(wake, deadline) if wake is not None else deadline
+            pause = max(0.0, wake - now) if wake is not None else None
+
+            if not in_flight:
+                sleep(pause or 0.0)
+                continue
+
+            done, _ = wait(in_flight, timeout=pause, return_when=FIRST_COMPLETED)
+            for future in done:
+                payment_id = in_flight.pop(future)
+                previous = last.get(payment_id)
+                try:
+                    payment = future.result()
+                except ApiError as exc:
+                    if not _is_transient(exc):
+                        last.pop(payment_id, None)
+                        yield StatusEvent(payment_id, _status(previous), error=exc)
+                        continue
+                    payment = previous
+                else:
+                    if payment_id not in last or payment.status != _status(previous):
+                        yield StatusEvent(payment_id, _status(previous), payment)
+                    last[payment_id] = payment
+                    if payment.status in stop:
+                        del last[payment_id]
+                        continue
+
+                now = clock()
+                delay = schedule.next_delay(payment, now=now, first_seen=started)
+                heapq.heappush(due, (now + delay, next(order), payment_id))
+
+
+def _is_transient(error: ApiError) -> bool:
+    return error.status in TRANSIENT_STATUSES or error.status >= 500
+
+
+def _status(payment: PaymentResponse | None) -> str | None:
+    return payment.status if payment is not None else None
+
+
+def _timestamp(value: str | None) -> float | None:
+    if not value:
+        return None
+
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import io
+import select
+import ssl
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from http.client import (
+    HTTPConnection,
+    HTTPException,
+    HTTPSConnection,
+    RemoteDisconnected,
+)
+from typing import Any
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import (
+    HTTPSHandler,
+    ProxyHandler,
+    Request,
+    build_opener,
+    getproxies,
+    proxy_bypass,
+)
+from urllib.request import urlopen as _stdlib_urlopen
+from urllib.response import addinfourl
+
+from . import forksafe
+from .idempotency import IDEMPOTENCY_HEADER
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+REPLAYABLE_METHODS = {"GET", "HEAD"}
+STALE_ERRORS = (RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+PoolKey = tuple[str, str, int]
+
+
+class PooledRequest(Request):
+    def __init__(
+        self,
+        *args: Any,
+        pool: ConnectionPool,
+        connect_timeout: float | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.pool = pool
+        self.connect_timeout = connect_timeout
+
+
+def urlopen(request: Request, timeout: float) -> Any:
+    pool = getattr(request, "pool", None)
+    if pool is None:
+        return _stdlib_urlopen(request, timeout=timeout)
+    return pool.urlopen(request, timeout)
+
+
+class ConnectionPool:
+    """Thread-safe keep-alive pool of HTTP(S) connections, keyed by origin.
+
+    Responses are read fully before the connection is returned, so callers get
+    the same ``addinfourl`` / ``HTTPError`` / ``URLError`` surface as
+    ``urllib.request.urlopen``. Redirects are not followed; a 3xx surfaces as
+    ``HTTPError``. Origins that the environment routes through a proxy
+    (``HTTP(S)_PROXY`` without a matching ``NO_PROXY``) are sent unpooled
+    through a urllib opener for that proxy instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 10,
+        idle_timeout: float = 60.0,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self._maxsize = maxsize
+        self._idle_timeout = idle_timeout
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._lock = threading.Lock()
+        self._idle: dict[PoolKey, deque[tuple[HTTPConnection, float]]] = {}
+        self._closed = False
+        forksafe.register(self)
+
+    def urlopen(self, request: Request, timeout: float) -> addinfourl:
+        url = request.full_url
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            raise URLError(f"unsupported URL: {url}")
+        # Read on every request so that proxy settings changed at runtime apply.
+        proxies = getproxies()
+        if scheme in proxies and not proxy_bypass(request.host):
+            opener = build_opener(
+                ProxyHandler(proxies), HTTPSHandler(context=self._ssl_context)
+            )
+            return opener.open(request, timeout=timeout)
+
+        key = (scheme, parts.hostname.lower(), parts.port or DEFAULT_PORTS[scheme])
+        headers = dict(request.header_items())
+        connect_timeout = getattr(request, "connect_timeout", None) or timeout
+
+        method = request.get_method()
+        replayable = is_replayable(method, headers)
+
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout, connect_timeout)
+            sent = False
+            try:
+                if conn.sock is None:
+                    # Connect (and handshake) under the connect timeout, then
+                    # switch the socket to the read timeout for the exchange.
+                    _open(conn, timeout)
+                conn.request(
+                    method, request.selector, body=request.data, headers=headers
+                )
+                sent = True
+                response = conn.getresponse()
+            except STALE_ERRORS as exc:
+                conn.close()
+                # A reused socket that the server closed while idle surfaces here;
+                # reconnect once on a fresh socket, unless the server may already
+                # have acted on a request that is unsafe to send twice.
+                if reused and attempt == 0 and (replayable or not sent):
+                    continue
+                raise URLError(exc) from exc
+            except (OSError, HTTPException) as exc:
+                conn.close()
+                raise URLError(exc) from exc
+
+            try:
+                body = response.read()
+            except (OSError, HTTPException) as exc:
+                conn.close()
+                raise URLError(exc) from exc
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+
+            status, headers_in = response.status, response.headers
+            if 200 <= status < 300:
+                return addinfourl(io.BytesIO(body), headers_in, url, status)
+            raise HTTPError(url, status, response.reason, headers_in, io.BytesIO(body))
+
+        raise URLError("connection pool exhausted reconnect attempts")
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(bucket) for bucket in self._idle.values())
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            buckets = list(self._idle.values())
+            self._idle.clear()
+
+        for bucket in buckets:
+            for conn, _ in bucket:
+                conn.close()
+
+    def _after_fork(self) -> None:
+        # The parent still uses these sockets; closing them here only drops
+        # this process's descriptors, and TLS sends nothing on close.
+        self._lock = threading.Lock()
+        buckets, self._idle = list(self._idle.values()), {}
+        for bucket in buckets:
+            for conn, _ in bucket:
+                conn.close()
+
+    def _acquire(
+        self, key: PoolKey, timeout: float, connect_timeout: float
+    ) -> tuple[HTTPConnection, bool]:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                bucket = self._idle.get(key)
+                if not bucket:
+                    break
+                conn, last_used = bucket.pop()
+
+            if now - last_used > self._idle_timeout or _is_dropped(conn):
+                conn.close()
+                continue
+
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            conn.timeout = timeout
+            return conn, True
+
+        return self._connect(key, connect_timeout), False
+
+    def _release(self, key: PoolKey, conn: HTTPConnection) -> None:
+        with self._lock:
+            if not self._closed:
+                bucket = self._idle.setdefault(key, deque())
+                if len(bucket) < self._maxsize:
+                    bucket.append((conn, time.monotonic()))
+                    return
+
+        conn.close()
+
+    def _connect(self, key: PoolKey, timeout: float) -> HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl_context
+            )
+        return HTTPConnection(host, port, timeout=timeout)
+
+
+def is_replayable(method: str, header_names: Iterable[str]) -> bool:
+    """Return whether a request may be resent after an ambiguous failure."""
+    if method.upper() in REPLAYABLE_METHODS:
+        return True
+    key_header = IDEMPOTENCY_HEADER.lower()
+    return any(name.lower() == key_header for name in header_names)
+
+
+def _open(conn: HTTPConnection, timeout: float) -> None:
+    conn.connect()
+    conn.sock.settimeout(timeout)
+
+
+def _is_dropped(conn: HTTPConnection) -> bool:
+    sock = conn.sock
+    if sock is None:
+        return True
+
+    # An idle keep-alive socket should have nothing to read; readability means
+    # the server sent FIN (or garbage) and the connection cannot be reused.
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
@@ -1,33 +1,158 @@
 from __future__ import annotations
 
+import builtins
+from collections.abc import Callable, Iterable
+from typing import Any
 from urllib.parse import quote
 
+from .async_http import AsyncHttpClient
+from .cache import ResponseCache
+from .errors import ApiError
 from .http import HttpClient
 from .models import PaymentMethodsResponse, ProviderClientConfig, ProviderListResponse
 
+_OPERATIONS = ("list", "client_config", "stripe_payment_methods")
+
 
 class ProvidersClient:
-    def __init__(self, http: HttpClient) -> None:
+    def __init__(
+        self,
+        http: HttpClient,
+        cache: ResponseCache | None = None,
+        *,
+        tenant: str | None = None,
+    ) -> None:
         self._http = http
+        self._cache = cache
+        # Keys stay led by the operation so per-operation TTLs still apply.
+        self._tenant = tenant
+
+    @property
+    def cache(self) -> ResponseCache | None:
+        return self._cache
 
     def list(self) -> ProviderListResponse:
+        if self._cache is not None:
+            return self._cache.get_or_load(self._key("list"), self._fetch_list)
+        return self._fetch_list()
+
+    def get_client_config(self, provider_id: str) -> ProviderClientConfig:
+        if self._cache is not None:
+            return self._cache.get_or_load(
+                self._key("client_config", provider_id),
+                lambda: self._fetch_client_config(provider_id),
+            )
+        return self._fetch_client_config(provider_id)
+
+    def get_stripe_payment_methods(
+        self,
+        *,
+        merchant_country: str,
+        customer_country: str,
+        currency: str | None = None,
+    ) -> PaymentMethodsResponse:
+        if self._cache is not None:
+            return self._cache.get_or_load(
+                self._key(
+                    "stripe_payment_methods",
+                    merchant_country,
+                    customer_country,
+                    currency,
+                ),
+                lambda: self._fetch_stripe_payment_methods(
+                    merchant_country, customer_country, currency
+                ),
+            )
+        return self._fetch_stripe_payment_methods(
+            merchant_country, customer_country, currency
+        )
+
+    def warm_up(
+        self,
+        *,
+        providers: bool = True,
+        client_configs: Iterable[str] = (),
+        stripe_payment_methods: Iterable[tuple[str, str, str | None]] = (),
+    ) -> builtins.list[ApiError]:
+        if self._cache is None:
+            raise ValueError("warm_up requires a providers cache")
+
+        errors: builtins.list[ApiError] = []
+        if providers:
+            _collect_error(errors, self.list)
+        for provider_id in client_configs:
+            _collect_error(errors, self.get_client_config, provider_id)
+        for merchant_country, customer_country, currency in stripe_payment_methods:
+            _collect_error(
+                errors,
+                self.get_stripe_payment_methods,
+                merchant_country=merchant_country,
+                customer_country=customer_country,
+                currency=currency,
+            )
+        return errors
+
+    def invalidate(self) -> None:
+        if self._cache is None:
+            return
+        if self._tenant is None:
+            self._cache.invalidate()
+            return
+        for operation in _OPERATIONS:
+            self._cache.invalidate(operation, self._tenant)
+
+    def _key(self, operation: str, *parts: Any) -> tuple[Any, ...]:
+        if self._tenant is None:
+            return (operation, *parts)
+        return (operation, self._tenant, *parts)
+
+    def _fetch_list(self) -> ProviderListResponse:
         raw = self._http.request("GET", "/api/providers")
         return ProviderListResponse.from_dict(raw or {})
 
-    def get_client_config(self, provider_id: str) -> ProviderClientConfig:
+    def _fetch_client_config(self, provider_id: str) -> ProviderClientConfig:
         raw = self._http.request(
             "GET", f"/api/providers/{quote(provider_id, safe='')}/client-config"
         )
         return ProviderClientConfig.from_dict(raw or {})
 
-    def get_stripe_payment_methods(
+    def _fetch_stripe_payment_methods(
+        self, merchant_country: str, customer_country: str, currency: str | None
+    ) -> PaymentMethodsResponse:
+        raw = self._http.request(
+            "GET",
+            "/api/providers/stripe/payment-methods",
+            query={
+                "merchantCountry": merchant_country,
+                "customerCountry": customer_country,
+                "currency": currency,
+            },
+        )
+        return PaymentMethodsResponse.from_dict(raw or {})
+
+
+class AsyncProvidersClient:
+    def __init__(self, http: AsyncHttpClient) -> None:
+        self._http = http
+
+    async def list(self) -> ProviderListResponse:
+        raw = await self._http.request("GET", "/api/providers")
+        return ProviderListResponse.from_dict(raw or {})
+
+    async def get_client_config(self, provider_id: str) -> ProviderClientConfig:
+        raw = await self._http.request(
+            "GET", f"/api/providers/{quote(provider_id, safe='')}/client-config"
+        )
+        return ProviderClientConfig.from_dict(raw or {})
+
+    async def get_stripe_payment_methods(
         self,
         *,
         merchant_country: str,
         customer_country: str,
         currency: str | None = None,
     ) -> PaymentMethodsResponse:
-        raw = self._http.request(
+        raw = await self._http.request(
             "GET",
             "/api/providers/stripe/payment-methods",
             query={
@@ -37,3 +162,12 @@ class ProvidersClient:
             },
         )
         return PaymentMethodsResponse.from_dict(raw or {})
+
+
+def _collect_error(
+    errors: list[ApiError], func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> None:
+    try:
+        func(*args, **kwargs)
+    except ApiError as exc:
+        errors.append(exc)
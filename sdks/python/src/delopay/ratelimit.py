@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable, Mapping
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from . import forksafe
+
+THROTTLE_FACTOR = 0.5
+RECOVERY_FRACTION = 0.01
+# Reset headers above this are Unix timestamps rather than delays in seconds.
+EPOCH_THRESHOLD = 1_000_000_000
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate adapts to server throttling.
+
+    ``throttle`` cuts the rate multiplicatively and ``recover`` raises it
+    additively back towards the configured rate. ``pause`` blocks all
+    acquirers until the given delay has elapsed.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int | None = None,
+        *,
+        min_rate: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self._max_rate = rate
+        self._min_rate = min_rate if min_rate is not None else rate / 16
+        self._rate = rate
+        self._burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self._burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        forksafe.register(self)
+
+    @property
+    def rate(self) -> float:
+        with self._lock:
+            return self._rate
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Take a token, waiting as needed; return False if that exceeds ``timeout``."""
+        give_up = self._clock() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                else:
+                    wait = (1 - self._tokens) / self._rate
+            if give_up is not None and now + wait > give_up:
+                return False
+            self._sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def throttle(self) -> None:
+        with self._lock:
+            self._refill(self._clock())
+            self._rate = max(self._min_rate, self._rate * THROTTLE_FACTOR)
+
+    def recover(self) -> None:
+        with self._lock:
+            if self._rate < self._max_rate:
+                self._refill(self._clock())
+                step = self._max_rate * RECOVERY_FRACTION
+                self._rate = min(self._max_rate, self._rate + step)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(float(self._burst), self._tokens + elapsed * self._rate)
+        self._updated = now
+
+
+def _shared(index: int) -> Any:
+    return property(
+        lambda self: self._state[index],
+        lambda self, value: self._state.__setitem__(index, value),
+    )
+
+
+class SharedTokenBucket(TokenBucket):
+    """``TokenBucket`` whose state lives in shared memory.
+
+    Processes started with the bucket as an argument draw from one budget, so
+    a rate limit holds across all of them. ``time.monotonic`` is system-wide,
+    which keeps refills consistent between processes.
+    """
+
+    _tokens = _shared(0)
+    _updated = _shared(1)
+    _paused_until = _shared(2)
+    _rate = _shared(3)
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int | None = None,
+        *,
+        min_rate: float | None = None,
+        context: Any = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        context = context or multiprocessing.get_context()
+        self._state = context.RawArray("d", 4)
+        super().__init__(rate, burst, min_rate=min_rate, clock=clock, sleep=sleep)
+        self._lock = context.Lock()
+
+    def _after_fork(self) -> None:
+        # The lock and state are shared with the other processes on purpose.
+        pass
+
+
+class RateLimiter:
+    """Client-side limiter with an overall bucket and optional per-group buckets.
+
+    Every request takes a token from the overall bucket (built from ``rate`` and
+    ``burst`` unless ``bucket`` is given) and, when its endpoint group has its
+    own limit, from that group's bucket too. A 429 halves the most specific
+    bucket's rate and pauses it for ``Retry-After``; exhausted
+    ``RateLimit-Remaining`` headers pause until the advertised reset.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int | None = None,
+        *,
+        bucket: TokenBucket | None = None,
+        groups: Mapping[str, float | tuple[float, int]] | None = None,
+        classify: Callable[[str, str], str] | None = None,
+        max_wait: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if bucket is None:
+            if rate is None:
+                raise ValueError("rate or bucket is required")
+            bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self._default = bucket
+        self._groups: dict[str, TokenBucket] = {}
+        for name, limit in (groups or {}).items():
+            group_rate, group_burst = (
+                limit if isinstance(limit, tuple) else (limit, None)
+            )
+            self._groups[name] = TokenBucket(
+                group_rate, group_burst, clock=clock, sleep=sleep
+            )
+        self._classify = classify or endpoint_group
+        self._clock = clock
+        self.max_wait = max_wait
+
+    def classify(self, method: str, path: str) -> str:
+        return self._classify(method, path)
+
+    def rate(self, group: str | None = None) -> float:
+        """Return the currently permitted requests per second for ``group``."""
+        overall = self._default.rate
+        bucket = self._groups.get(group) if group is not None else None
+        return min(overall, bucket.rate) if bucket is not None else overall
+
+    def acquire(self, group: str, timeout: float | None = None) -> bool:
+        """Wait for a token for ``group``; return False if that exceeds ``timeout``.
+
+        Nothing is waited for when the wait is already known to be too long.
+        """
+        give_up = self._clock() + timeout if timeout is not None else None
+        if not self._default.acquire(timeout):
+            return False
+        bucket = self._groups.get(group)
+        if bucket is None:
+            return True
+        remaining = give_up - self._clock() if give_up is not None else None
+        return bucket.acquire(remaining)
+
+    def observe(self, group: str, status: int, headers: Any) -> float | None:
+        """Feed a response back into the limiter and return any imposed pause."""
+        bucket = self._groups.get(group, self._default)
+
+        if status == 429:
+            bucket.throttle()
+            delay = retry_after(headers)
+            if delay is None:
+                delay = 1.0 / bucket.rate
+            bucket.pause(min(delay, self.max_wait))
+            return delay
+
+        remaining = _header_float(
+            headers, "RateLimit-Remaining", "X-RateLimit-Remaining"
+        )
+        if remaining is not None and remaining <= 0:
+            delay = _reset_delay(headers)
+            if delay is not None:
+                bucket.pause(min(delay, self.max_wait))
+                return delay
+
+        if 200 <= status < 300:
+            bucket.recover()
+        return None
+
+
+def endpoint_group(method: str, path: str) -> str:
+    if path.startswith("/api/providers"):
+        return "providers"
+    if path == "/api/payments/create":
+        return "payments.create"
+    if method in {"GET", "HEAD"}:
+        return "payments.read"
+    return "payments.write"
+
+
+def retry_after(headers: Any) -> float | None:
+    value = headers.get("Retry-After") if headers else None
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _reset_delay(headers: Any) -> float | None:
+    reset = _header_float(headers, "RateLimit-Reset", "X-RateLimit-Reset")
+    if reset is None:
+        return None
+    if reset > EPOCH_THRESHOLD:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def _header_float(headers: Any, *names: str) -> float | None:
+    if not headers:
+        return None
+
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,269 @@
+"""Reconcile an order ledger against DeloPay.
+
+Usage::
+
+    DELOPAY_API_KEY=... python -m delopay.reconcile orders.csv \\
+        --output mismatches.jsonl --checkpoint reconcile.ckpt
+
+The ledger (CSV with a header row, or JSON Lines) needs a ``client_order_id``
+column and may carry ``status``, ``amount`` and ``amount_paid`` to compare.
+Each order whose payment differs, is missing or could not be fetched is
+written to the output as one JSON line.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from .bulk import DEFAULT_MAX_WORKERS, execute_calls
+from .client import DelopayClient
+from .errors import ApiError
+from .models import PaymentResponse
+from .payments import PaymentsClient
+
+MISMATCH = "mismatch"
+MISSING = "missing"
+ERROR = "error"
+
+DEFAULT_TOLERANCE = 0.005
+DEFAULT_CHECKPOINT_EVERY = 1000
+
+_COLUMN_ALIASES = {
+    "client_order_id": ("client_order_id", "clientOrderId"),
+    "status": ("status",),
+    "amount": ("amount",),
+    "amount_paid": ("amount_paid", "amountPaid"),
+}
+
+
+@dataclass(slots=True)
+class LedgerRecord:
+    client_order_id: str
+    status: str | None = None
+    amount: float | None = None
+    amount_paid: float | None = None
+
+
+@dataclass(slots=True)
+class ReconcileStats:
+    checked: int = 0
+    matched: int = 0
+    mismatched: int = 0
+    missing: int = 0
+    errors: int = 0
+
+
+def read_ledger(
+    path: str | os.PathLike[str], format: str | None = None
+) -> Iterator[LedgerRecord]:
+    """Yield ledger records one at a time from a CSV or JSON Lines file."""
+    kind = format or ("jsonl" if Path(path).suffix in {".jsonl", ".ndjson"} else "csv")
+    if kind not in {"csv", "jsonl"}:
+        raise ValueError("format must be 'csv' or 'jsonl'")
+
+    with open(path, encoding="utf-8", newline="") as handle:
+        rows: Iterable[dict[str, Any]]
+        if kind == "csv":
+            rows = csv.DictReader(handle)
+        else:
+            rows = (json.loads(line) for line in handle if line.strip())
+        for row in rows:
+            yield _ledger_record(row)
+
+
+def reconcile(
+    payments: PaymentsClient,
+    records: Iterable[LedgerRecord],
+    output: str | os.PathLike[str],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    checkpoint: str | os.PathLike[str] | None = None,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> ReconcileStats:
+    """Compare each record with its payment and write differences to ``output``.
+
+    Records are consumed lazily and at most ``2 * max_workers`` lookups are in
+    flight, so memory stays flat however long the ledger is. Results are
+    handled in input order; with ``checkpoint`` set, the number of records
+    handled and the output size are saved every ``checkpoint_every`` records
+    and on exit, and a rerun with the same ledger continues from there.
+    """
+    done, offset, stats = _load_checkpoint(checkpoint)
+    queued: deque[LedgerRecord] = deque()
+
+    def calls() -> Iterator[tuple[str, tuple[Any, ...]]]:
+        for index, record in enumerate(records):
+            if index < done:
+                continue
+            queued.append(record)
+            yield record.client_order_id, (record.client_order_id,)
+
+    if offset and not os.path.exists(output):
+        raise ValueError("checkpoint refers to an output file that does not exist")
+    with open(output, "r+b" if offset else "wb") as sink:
+        sink.seek(offset)
+        sink.truncate()
+        try:
+            for _, outcome in execute_calls(
+                payments.get_by_order, calls(), max_workers=max_workers, ordered=True
+            ):
+                entry = compare(queued.popleft(), outcome, tolerance, stats)
+                if entry is not None:
+                    sink.write(json.dumps(entry).encode("utf-8") + b"\n")
+                done += 1
+                if checkpoint is not None and done % checkpoint_every == 0:
+                    _save_checkpoint(checkpoint, done, sink, stats)
+        finally:
+            if checkpoint is not None:
+                _save_checkpoint(checkpoint, done, sink, stats)
+    return stats
+
+
+def compare(
+    record: LedgerRecord,
+    outcome: PaymentResponse | ApiError,
+    tolerance: float = DEFAULT_TOLERANCE,
+    stats: ReconcileStats | None = None,
+) -> dict[str, Any] | None:
+    """Return the output entry for one record, or None when it matches."""
+    stats = stats if stats is not None else ReconcileStats()
+    stats.checked += 1
+    entry: dict[str, Any] = {"clientOrderId": record.client_order_id}
+
+    if isinstance(outcome, ApiError):
+        if outcome.status == 404:
+            stats.missing += 1
+            entry["result"] = MISSING
+        else:
+            stats.errors += 1
+            entry.update(result=ERROR, status=outcome.status, message=outcome.message)
+        return entry
+
+    fields: dict[str, Any] = {}
+    if record.status is not None and outcome.status != record.status:
+        fields["status"] = {"expected": record.status, "actual": outcome.status}
+    for name in ("amount", "amount_paid"):
+        expected = getattr(record, name)
+        actual = getattr(outcome, name)
+        if expected is None:
+            continue
+        if actual is None or abs(float(actual) - expected) > tolerance:
+            fields[name] = {"expected": expected, "actual": actual}
+
+    if not fields:
+        stats.matched += 1
+        return None
+    stats.mismatched += 1
+    entry.update(result=MISMATCH, paymentId=outcome.payment_id, fields=fields)
+    return entry
+
+
+def _ledger_record(row: dict[str, Any]) -> LedgerRecord:
+    values = {}
+    for name, aliases in _COLUMN_ALIASES.items():
+        value = next((row[alias] for alias in aliases if alias in row), None)
+        values[name] = None if value in (None, "") else value
+
+    if values["client_order_id"] is None:
+        raise ValueError("ledger row has no client_order_id")
+    status = values["status"]
+    return LedgerRecord(
+        client_order_id=str(values["client_order_id"]),
+        status=str(status).upper() if status is not None else None,
+        amount=_number(values["amount"]),
+        amount_paid=_number(values["amount_paid"]),
+    )
+
+
+def _number(value: Any) -> float | None:
+    return float(value) if value is not None else None
+
+
+def _load_checkpoint(
+    path: str | os.PathLike[str] | None,
+) -> tuple[int, int, ReconcileStats]:
+    if path is None or not os.path.exists(path):
+        return 0, 0, ReconcileStats()
+    with open(path, encoding="utf-8") as handle:
+        state = json.load(handle)
+    return state["records"], state["offset"], ReconcileStats(**state["stats"])
+
+
+def _save_checkpoint(
+    path: str | os.PathLike[str], records: int, sink: Any, stats: ReconcileStats
+) -> None:
+    # The output is made durable first so the checkpoint never points past it.
+    sink.flush()
+    os.fsync(sink.fileno())
+    state = {"records": records, "offset": sink.tell(), "stats": asdict(stats)}
+    temporary = f"{os.fspath(path)}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(state, handle)
+    os.replace(temporary, path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m delopay.reconcile",
+        description="Reconcile an order ledger against DeloPay payments.",
+    )
+    parser.add_argument("ledger", help="CSV or JSON Lines file of orders")
+    parser.add_argument("-o", "--output", required=True, help="mismatch JSONL file")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--checkpoint", help="resume state file")
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--base-url",
+        default=os.environ.get(
+            "DELOPAY_BASE_URL", "https://sandbox-delopay.deloxity.com"
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("DELOPAY_API_KEY")
+    if not api_key:
+        parser.error("DELOPAY_API_KEY must be set")
+
+    with DelopayClient(
+        api_key=api_key,
+        base_url=args.base_url,
+        pool_maxsize=args.workers,
+        lazy_models=True,
+    ) as client:
+        try:
+            stats = reconcile(
+                client.payments,
+                read_ledger(args.ledger, args.format),
+                args.output,
+                max_workers=args.workers,
+                checkpoint=args.checkpoint,
+                checkpoint_every=args.checkpoint_every,
+                tolerance=args.tolerance,
+            )
+        except KeyboardInterrupt:
+            print(
+                "interrupted; rerun with the same --checkpoint to resume",
+                file=sys.stderr,
+            )
+            return 130
+
+    print(json.dumps(asdict(stats)))
+    return 0 if stats.mismatched == stats.missing == stats.errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+from . import forksafe
+
+
+class RetryBudget:
+    """Limits retries to a fraction of recent request traffic.
+
+    Every first attempt deposits ``ratio`` of a retry and every retry withdraws
+    one; deposits expire after ``ttl`` seconds. ``min_per_second`` retries are
+    always available so that low-traffic clients can still recover from
+    isolated failures. Share one budget between clients to cap them together.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        *,
+        min_per_second: float = 1.0,
+        ttl: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ratio < 0 or min_per_second < 0:
+            raise ValueError("ratio and min_per_second must not be negative")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self._ratio = ratio
+        self._reserve = min_per_second * ttl
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # One [second, requests, retries] slot per second of the window.
+        self._slots: deque[list[int]] = deque()
+        self._requests = 0
+        self._retries = 0
+        forksafe.register(self)
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._slot()[1] += 1
+            self._requests += 1
+
+    def try_spend(self) -> bool:
+        """Withdraw one retry, returning ``False`` if the budget is exhausted."""
+        with self._lock:
+            slot = self._slot()
+            if self._available() < 1:
+                return False
+            slot[2] += 1
+            self._retries += 1
+            return True
+
+    def available(self) -> float:
+        with self._lock:
+            self._expire(int(self._clock()))
+            return self._available()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _available(self) -> float:
+        return self._requests * self._ratio + self._reserve - self._retries
+
+    def _slot(self) -> list[int]:
+        second = int(self._clock())
+        self._expire(second)
+        if not self._slots or self._slots[-1][0] != second:
+            self._slots.append([second, 0, 0])
+        return self._slots[-1]
+
+    def _expire(self, second: int) -> None:
+        while self._slots and self._slots[0][0] <= second - self._ttl:
+            _, requests, retries = self._slots.popleft()
+            self._requests -= requests
+            self._retries -= retries
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import re
+
+STATIC_ROUTES = frozenset(
+    {
+        "/api/payments/create",
+        "/api/payments/resend-failed-callbacks",
+        "/api/providers",
+        "/api/providers/stripe/payment-methods",
+    }
+)
+
+ROUTE_PATTERNS = (
+    (
+        re.compile(r"^/api/payments/by-order/[^/]+$"),
+        "/api/payments/by-order/{clientOrderId}",
+    ),
+    (
+        re.compile(r"^/api/payments/[^/]+/capture$"),
+        "/api/payments/{paymentId}/capture",
+    ),
+    (re.compile(r"^/api/payments/[^/]+/refund$"), "/api/payments/{paymentId}/refund"),
+    (re.compile(r"^/api/payments/[^/]+$"), "/api/payments/{paymentId}"),
+    (
+        re.compile(r"^/api/providers/[^/]+/client-config$"),
+        "/api/providers/{providerId}/client-config",
+    ),
+)
+
+
+def route_template(path: str) -> str:
+    """Map a concrete request path to its OpenAPI path template."""
+    if path in STATIC_ROUTES:
+        return path
+
+    for pattern, template in ROUTE_PATTERNS:
+        if pattern.match(path):
+            return template
+    return path
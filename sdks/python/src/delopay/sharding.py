@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from .bulk import DEFAULT_MAX_WORKERS
+from .client import DelopayClient
+from .errors import ApiError
+from .models import PaymentResponse
+from .ratelimit import RateLimiter, SharedTokenBucket
+
+DEFAULT_CHUNK_SIZE = 64
+DEFAULT_SHUTDOWN_TIMEOUT = 5.0
+_POLL_INTERVAL = 0.1
+
+
+@dataclass(slots=True)
+class ShardStats:
+    processes: int = 0
+    submitted: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    per_shard: list[int] = field(default_factory=list)
+
+
+def get_payment(client: DelopayClient, payment_id: str) -> PaymentResponse:
+    return client.payments.get(payment_id)
+
+
+def get_payment_by_order(
+    client: DelopayClient, client_order_id: str
+) -> PaymentResponse:
+    return client.payments.get_by_order(client_order_id)
+
+
+class ShardedExecutor:
+    """Runs ``task(client, key)`` for a stream of keys across worker processes.
+
+    Each process builds its own ``DelopayClient`` from ``client_options`` and
+    works through chunks of keys on ``threads`` threads, so JSON and model
+    decoding use every core instead of sharing one interpreter. With ``rate``
+    set, all processes draw from one ``SharedTokenBucket``. ``task`` must be
+    picklable, i.e. a module-level function; ``get_payment`` and
+    ``get_payment_by_order`` cover the common reads.
+    """
+
+    def __init__(
+        self,
+        task: Callable[[DelopayClient, Any], Any],
+        *,
+        client_options: Mapping[str, Any],
+        processes: int | None = None,
+        threads: int = DEFAULT_MAX_WORKERS,
+        rate: float | None = None,
+        burst: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mp_context: Any = None,
+        shutdown_timeout: float = DEFAULT_SHUTDOWN_TIMEOUT,
+    ) -> None:
+        processes = processes if processes is not None else os.cpu_count() or 1
+        if processes < 1 or threads < 1 or chunk_size < 1:
+            raise ValueError("processes, threads and chunk_size must be at least 1")
+
+        self._task = task
+        self._client_options = dict(client_options)
+        self._processes = processes
+        self._threads = threads
+        self._rate = rate
+        self._burst = burst
+        self._chunk_size = chunk_size
+        # Spawned workers never inherit the parent's threads, locks or sockets.
+        self._context = mp_context or multiprocessing.get_context("spawn")
+        self._shutdown_timeout = shutdown_timeout
+        self._stats = ShardStats(processes=processes, per_shard=[0] * processes)
+
+    def stats(self) -> ShardStats:
+        return self._stats
+
+    def map(self, keys: Iterable[Any]) -> Iterator[tuple[Any, Any]]:
+        """Yield ``(key, result)`` pairs in completion order.
+
+        An ``ApiError`` is yielded in place of the result, as with the bulk
+        helpers; any other exception raised by ``task`` stops the run and is
+        re-raised here. Keys are read lazily and at most two chunks per
+        process are queued. Interrupting the loop, by Ctrl-C or by leaving it
+        early, stops the workers once their in-flight calls have finished.
+        """
+        self._stats = ShardStats(
+            processes=self._processes, per_shard=[0] * self._processes
+        )
+        context = self._context
+        stop = context.Event()
+        inputs = context.Queue(self._processes * 2)
+        results = context.Queue()
+        bucket = (
+            SharedTokenBucket(self._rate, self._burst, context=context)
+            if self._rate is not None
+            else None
+        )
+        workers = [
+            context.Process(
+                target=_work,
+                args=(
+                    shard,
+                    self._task,
+                    self._client_options,
+                    bucket,
+                    self._threads,
+                    self._chunk_size,
+                    inputs,
+                    results,
+                    stop,
+                ),
+                name=f"delopay-shard-{shard}",
+                daemon=True,
+            )
+            for shard in range(self._processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        feed_errors: list[BaseException] = []
+        feeder = threading.Thread(
+            target=self._feed,
+            args=(keys, inputs, stop, feed_errors),
+            name="delopay-shard-feeder",
+            daemon=True,
+        )
+        feeder.start()
+
+        try:
+            yield from self._collect(workers, results)
+            feeder.join()
+            if feed_errors:
+                raise feed_errors[0]
+        finally:
+            stop.set()
+            _shutdown(workers, (inputs, results), self._shutdown_timeout)
+
+    def _feed(
+        self,
+        keys: Iterable[Any],
+        inputs: Any,
+        stop: Any,
+        errors: list[BaseException],
+    ) -> None:
+        def put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    inputs.put(item, timeout=_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        chunk: list[Any] = []
+        try:
+            for key in keys:
+                chunk.append(key)
+                self._stats.submitted += 1
+                if len(chunk) == self._chunk_size:
+                    if not put(chunk):
+                        return
+                    chunk = []
+        except BaseException as exc:
+            errors.append(exc)
+        if chunk and not put(chunk):
+            return
+        for _ in range(self._processes):
+            if not put(None):
+                return
+
+    def _collect(self, workers: list[Any], results: Any) -> Iterator[tuple[Any, Any]]:
+        stats = self._stats
+        running = set(range(len(workers)))
+        while running:
+            try:
+                kind, shard, payload = pickle.loads(results.get(timeout=_POLL_INTERVAL))
+            except queue.Empty:
+                for shard in running:
+                    exitcode = workers[shard].exitcode
+                    if exitcode not in (None, 0):
+                        raise RuntimeError(
+                            f"shard {shard} exited with code {exitcode}"
+                        ) from None
+                continue
+
+            if kind == "error":
+                raise payload
+            if kind == "done":
+                running.discard(shard)
+                continue
+            for key, outcome in payload:
+                stats.per_shard[shard] += 1
+                if isinstance(outcome, ApiError):
+                    stats.failed += 1
+                else:
+                    stats.succeeded += 1
+                yield key, outcome
+
+
+def _work(
+    shard: int,
+    task: Callable[[DelopayClient, Any], Any],
+    client_options: dict[str, Any],
+    bucket: SharedTokenBucket | None,
+    threads: int,
+    chunk_size: int,
+    inputs: Any,
+    results: Any,
+    stop: Any,
+) -> None:
+    # Ctrl-C reaches the whole process group; the parent coordinates shutdown.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    buffer: list[tuple[Any, Any]] = []
+
+    def flush() -> None:
+        if buffer:
+            results.put(_dumps("results", shard, buffer))
+            buffer.clear()
+
+    options = {"pool_maxsize": threads, **client_options}
+    if bucket is not None:
+        options["rate_limiter"] = RateLimiter(bucket=bucket)
+    window = threads * 2
+    pending: dict[Future[Any], Any] = {}
+    try:
+        with DelopayClient(**options) as client:
+            executor = ThreadPoolExecutor(
+                max_workers=threads, thread_name_prefix="delopay-shard"
+            )
+            try:
+                more = True
+                while more and not stop.is_set():
+                    idle = False
+                    if len(pending) >= window:
+                        idle = not _harvest(pending, buffer, _POLL_INTERVAL)
+                    else:
+                        try:
+                            chunk = inputs.get(timeout=_POLL_INTERVAL)
+                        except queue.Empty:
+                            chunk, idle = (), True
+                        if chunk is None:
+                            more = False
+                        else:
+                            for key in chunk:
+                                pending[executor.submit(task, client, key)] = key
+                        _harvest(pending, buffer, 0)
+                    # Hand over full chunks, and whatever has finished while
+                    # waiting, so results never sit here until more input comes.
+                    if len(buffer) >= chunk_size or idle:
+                        flush()
+
+                while pending:
+                    _harvest(pending, buffer, None)
+                    if len(buffer) >= chunk_size:
+                        flush()
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+        flush()
+        results.put(_dumps("done", shard, None))
+    except BaseException as exc:
+        results.put(_dumps("error", shard, exc))
+    if stop.is_set():
+        # The parent has stopped reading; do not block exit on a full pipe.
+        results.cancel_join_thread()
+
+
+def _harvest(
+    pending: dict[Future[Any], Any],
+    buffer: list[tuple[Any, Any]],
+    timeout: float | None,
+) -> bool:
+    """Move finished calls from ``pending`` to ``buffer``; return whether any did."""
+    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+    for future in done:
+        key = pending.pop(future)
+        try:
+            buffer.append((key, future.result()))
+        except ApiError as exc:
+            buffer.append((key, exc))
+    return bool(done)
+
+
+def _dumps(kind: str, shard: int, payload: Any) -> bytes:
+    try:
+        return pickle.dumps((kind, shard, payload))
+    except Exception:
+        if kind == "error":
+            payload = RuntimeError(repr(payload))
+        else:
+            payload = [
+                (key, outcome if _picklable(outcome) else RuntimeError(repr(outcome)))
+                for key, outcome in payload
+            ]
+        return pickle.dumps((kind, shard, payload))
+
+
+def _picklable(value: Any) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def _shutdown(workers: list[Any], queues: Iterable[Any], timeout: float) -> None:
+    for channel in queues:
+        channel.cancel_join_thread()
+    deadline = time.monotonic() + timeout
+    for worker in workers:
+        worker.join(max(0.0, deadline - time.monotonic()))
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+    for channel in queues:
+        channel.close()
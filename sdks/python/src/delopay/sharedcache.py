@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import enum
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections.abc import Callable, Hashable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass, replace
+from typing import Any, TypeVar
+
+from . import forksafe, models
+from .cache import CacheKey, CacheStats
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - exercised on Windows
+    fcntl = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+DEFAULT_SLOTS = 4096
+DEFAULT_SLOT_SIZE = 4096
+# Slots examined for a key before the least useful one is overwritten.
+PROBE_LIMIT = 8
+READ_ATTEMPTS = 4
+
+_MAGIC = b"DPSC"
+_VERSION = 1
+# magic, version, slot count, slot size, generation
+_HEADER = struct.Struct("<4sIIIQ")
+_HEADER_SIZE = 64
+# sequence, key hash, generation, expiry, checksum, key length, value length
+_SLOT = struct.Struct("<QQQdIII")
+_SEQUENCE = struct.Struct("<Q")
+_GENERATION_OFFSET = 16
+_EMPTY = _SLOT.pack(0, 0, 0, 0.0, 0, 0, 0)
+
+_DATACLASS_TAG = "d"
+_ENUM_TAG = "e"
+
+
+class SharedCache:
+    """Response cache in a memory-mapped file shared by every process on a host.
+
+    Entries live in ``slots`` fixed-size slots of ``slot_size`` bytes, found by
+    hashing the key. Model dataclasses are stored as compact ``marshal``
+    tuples rather than pickles. Reads take no lock: each slot carries a
+    sequence number and checksum, and a read that overlaps a write is
+    retried. Writes hold an exclusive ``fcntl`` lock on the file. Expiry
+    uses wall-clock time so all processes agree on it. Values too large for
+    a slot are returned but not stored.
+
+    Open the cache in a pre-fork master and the workers inherit the mapping,
+    or open the same ``path`` in each worker. ``/dev/shm`` keeps the file in
+    memory on Linux. The file is trusted input: only processes that may
+    write it should be able to open it.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        ttl: float = 300.0,
+        ttls: Mapping[str, float] | None = None,
+        slots: int = DEFAULT_SLOTS,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if fcntl is None:
+            raise ValueError("SharedCache requires fcntl, which is POSIX only")
+        if slots < 1 or slot_size <= _SLOT.size:
+            raise ValueError(f"slots must be positive and slot_size > {_SLOT.size}")
+
+        self._ttl = ttl
+        self._ttls = dict(ttls or {})
+        self._slots = slots
+        self._slot_size = slot_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._writer = threading.Lock()
+        self._stats = CacheStats()
+        size = _HEADER_SIZE + slots * slot_size
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size != size or os.pread(fd, 4, 0) != _MAGIC:
+                    # A new file, or one laid out differently: start empty.
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)
+                    os.pwrite(
+                        fd, _HEADER.pack(_MAGIC, _VERSION, slots, slot_size, 0), 0
+                    )
+                self._map = mmap.mmap(fd, size)
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        forksafe.register(self)
+
+    def get_or_load(self, key: CacheKey, loader: Callable[[], T]) -> T:
+        found, value = self._read(key)
+        if found:
+            return value  # type: ignore[no-any-return]
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def get(self, key: CacheKey, default: Any = None) -> Any:
+        found, value = self._read(key)
+        return value if found else default
+
+    def set(self, key: CacheKey, value: Any, ttl: float | None = None) -> bool:
+        """Store ``value`` and return whether it fitted in a slot."""
+        key_bytes = _encode_key(key)
+        value_bytes = marshal.dumps(_encode(value))
+        if _SLOT.size + len(key_bytes) + len(value_bytes) > self._slot_size:
+            return False
+
+        key_hash = _hash(key_bytes)
+        expires = self._clock() + (ttl if ttl is not None else self._ttl_for(key))
+        checksum = zlib.crc32(value_bytes, zlib.crc32(key_bytes))
+        with self._write_lock():
+            generation = self._generation()
+            index = self._choose_slot(key_hash, key_bytes, generation)
+            self._write_slot(
+                index,
+                _SLOT.pack(
+                    0,
+                    key_hash,
+                    generation,
+                    expires,
+                    checksum,
+                    len(key_bytes),
+                    len(value_bytes),
+                )
+                + key_bytes
+                + value_bytes,
+            )
+        return True
+
+    def delete(self, key: CacheKey) -> None:
+        key_bytes = _encode_key(key)
+        key_hash = _hash(key_bytes)
+        with self._write_lock():
+            for index in self._probe(key_hash):
+                slot = self._snapshot(index)
+                if slot is not None and slot[0] == key_hash and slot[1] == key_bytes:
+                    self._write_slot(index, _EMPTY)
+
+    def invalidate(self, *prefix: Hashable) -> None:
+        """Drop entries whose key starts with ``prefix``, in every process."""
+        with self._write_lock():
+            if not prefix:
+                generation = self._generation() + 1
+                _SEQUENCE.pack_into(self._map, _GENERATION_OFFSET, generation)
+                return
+            for index in range(self._slots):
+                slot = self._snapshot(index)
+                if slot is None or slot[0] == 0:
+                    continue
+                key = json.loads(slot[1])
+                if tuple(key[: len(prefix)]) == prefix:
+                    self._write_slot(index, _EMPTY)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    def _after_fork(self) -> None:
+        # The mapping is meant to be shared and fcntl locks are not inherited,
+        # so only the thread locks need replacing.
+        self._lock = threading.Lock()
+        self._writer = threading.Lock()
+
+    def _ttl_for(self, key: CacheKey) -> float:
+        return self._ttls.get(str(key[0]), self._ttl) if key else self._ttl
+
+    def _read(self, key: CacheKey) -> tuple[bool, Any]:
+        key_bytes = _encode_key(key)
+        key_hash = _hash(key_bytes)
+        generation = self._generation()
+        now = self._clock()
+        for index in self._probe(key_hash):
+            slot = self._snapshot(index)
+            if slot is None:
+                continue
+            slot_hash, slot_key, value_bytes, slot_generation, expires = slot
+            if slot_hash != key_hash or slot_key != key_bytes:
+                continue
+            if slot_generation != generation or expires <= now:
+                break
+            with self._lock:
+                self._stats.hits += 1
+            return True, _decode(marshal.loads(value_bytes))
+        with self._lock:
+            self._stats.misses += 1
+        return False, None
+
+    def _snapshot(self, index: int) -> tuple[int, bytes, bytes, int, float] | None:
+        # Seqlock read: retry while a writer holds the slot or moved past us.
+        offset = _HEADER_SIZE + index * self._slot_size
+        for _ in range(READ_ATTEMPTS):
+            header = _SLOT.unpack_from(self._map, offset)
+            sequence, key_hash, generation, expires, checksum, key_size, size = header
+            if sequence % 2:
+                continue
+            if key_hash == 0:
+                return 0, b"", b"", generation, expires
+            start = offset + _SLOT.size
+            if key_size + size > self._slot_size - _SLOT.size:
+                continue
+            data = self._map[start : start + key_size + size]
+            if _SEQUENCE.unpack_from(self._map, offset)[0] != sequence:
+                continue
+            key_bytes, value_bytes = data[:key_size], data[key_size:]
+            if zlib.crc32(value_bytes, zlib.crc32(key_bytes)) != checksum:
+                continue
+            return key_hash, key_bytes, value_bytes, generation, expires
+        return None
+
+    def _choose_slot(self, key_hash: int, key_bytes: bytes, generation: int) -> int:
+        now = self._clock()
+        snapshots = [(index, self._snapshot(index)) for index in self._probe(key_hash)]
+        for index, slot in snapshots:
+            if slot is not None and slot[0] == key_hash and slot[1] == key_bytes:
+                return index
+
+        victim, victim_expires = snapshots[0][0], float("inf")
+        for index, slot in snapshots:
+            if slot is None:
+                continue
+            slot_hash, _, _, slot_generation, expires = slot
+            if slot_hash == 0 or slot_generation != generation or expires <= now:
+                return index
+            if expires < victim_expires:
+                victim, victim_expires = index, expires
+        with self._lock:
+            self._stats.evictions += 1
+        return victim
+
+    def _write_slot(self, index: int, payload: bytes) -> None:
+        offset = _HEADER_SIZE + index * self._slot_size
+        sequence = _SEQUENCE.unpack_from(self._map, offset)[0]
+        _SEQUENCE.pack_into(self._map, offset, sequence + 1)
+        self._map[offset + 8 : offset + len(payload)] = payload[8:]
+        _SEQUENCE.pack_into(self._map, offset, sequence + 2)
+
+    def _probe(self, key_hash: int) -> list[int]:
+        start = key_hash % self._slots
+        count = min(PROBE_LIMIT, self._slots)
+        return [(start + step) % self._slots for step in range(count)]
+
+    def _generation(self) -> int:
+        return int(_SEQUENCE.unpack_from(self._map, _GENERATION_OFFSET)[0])
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        # fcntl locks only exclude other processes, so threads share a lock too.
+        with self._writer:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+
+def _hash(key_bytes: bytes) -> int:
+    # Zero marks an empty slot, so real hashes are never zero.
+    digest = hashlib.blake2b(key_bytes, digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+def _encode_key(key: CacheKey) -> bytes:
+    # marshal output depends on string interning, so keys use canonical JSON.
+    return json.dumps(key, separators=(",", ":"), default=str).encode()
+
+
+_TYPES: dict[str, type] = {
+    name: value
+    for name, value in vars(models).items()
+    if isinstance(value, type)
+    and (is_dataclass(value) or issubclass(value, enum.Enum))
+    and not name.startswith("Lazy")
+}
+_NAMES = {value: name for name, value in _TYPES.items()}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return (_ENUM_TAG, _type_name(value), value.value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return (
+            _DATACLASS_TAG,
+            _type_name(value),
+            [_encode(getattr(value, field.name)) for field in fields(value)],
+        )
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Tuples are reserved for tagged values, so sequences decode as lists.
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, tuple):
+        tag, name, data = value
+        kind = _TYPES[name]
+        if tag == _ENUM_TAG:
+            return kind(data)
+        return kind(*(_decode(item) for item in data))
+    if isinstance(value, dict):
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def _type_name(value: Any) -> str:
+    for kind in type(value).__mro__:
+        name = _NAMES.get(kind)
+        if name is not None:
+            return name
+    raise TypeError(f"cannot store {type(value).__name__} in a SharedCache")
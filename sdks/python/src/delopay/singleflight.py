@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import copy
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from typing import TypeVar
+
+from . import forksafe
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class SingleFlightStats:
+    leaders: int = 0
+    coalesced: int = 0
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in flight
+    wait for and share its outcome. Followers receive a deep copy of the result
+    so that mutating a response cannot leak into another caller.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, Future] = {}
+        self._stats = SingleFlightStats()
+        forksafe.register(self)
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = Future()
+                self._stats.leaders += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not leader:
+            return copy.deepcopy(flight.result())
+
+        try:
+            result = func()
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def _after_fork(self) -> None:
+        # Flights in progress belong to threads that only exist in the parent.
+        self._lock = threading.Lock()
+        self._flights = {}
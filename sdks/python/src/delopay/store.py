@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+
+from . import forksafe
+from .models import PaymentResponse
+from .polling import FINAL_STATUSES
+from .sharedcache import SharedCache
+
+DEFAULT_TTL = 5.0
+DEFAULT_FINAL_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+@dataclass(slots=True)
+class StoreStats:
+    hits: int = 0
+    misses: int = 0
+    updates: int = 0
+    evictions: int = 0
+    shared_hits: int = 0
+
+
+@dataclass(slots=True)
+class _Entry:
+    payment: PaymentResponse
+    expires: float
+
+
+class PaymentStore:
+    """Bounded read-through store of payments keyed by payment and order ID.
+
+    A payment read by either ID answers later reads by both. Payments in a
+    final status are kept for ``final_ttl`` seconds and all others for
+    ``ttl``; at most ``max_entries`` payments are held, least recently used
+    first out. ``PaymentsClient`` also stores the payments returned by
+    ``create``, ``update`` and ``capture`` and drops a payment when it is
+    refunded.
+
+    With ``shared``, payments are also written to a ``SharedCache`` and local
+    misses are answered from it, so processes on one host share reads. Other
+    processes see a change once their local copy expires. Shared entries are
+    keyed by the tenant the store is bound to, so stores of different API
+    keys never read each other's payments.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = DEFAULT_TTL,
+        final_ttl: float = DEFAULT_FINAL_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+        shared: SharedCache | None = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self._ttl = ttl
+        self._final_ttl = final_ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._shared = shared
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._orders: dict[str, str] = {}
+        self._generation = 0
+        self._scope = ""
+        self._stats = StoreStats()
+        forksafe.register(self)
+
+    def bind(self, scope: str) -> None:
+        """Tie the store to one tenant; ``PaymentsClient`` calls this."""
+        with self._lock:
+            if self._scope and self._scope != scope:
+                raise ValueError("a PaymentStore serves one API key only")
+            self._scope = scope
+
+    def get(self, payment_id: str) -> PaymentResponse | None:
+        with self._lock:
+            payment = self._lookup(payment_id)
+        if payment is None and self._shared is not None:
+            return self._shared_lookup(payment_id)
+        return payment
+
+    def get_by_order(self, client_order_id: str) -> PaymentResponse | None:
+        with self._lock:
+            payment_id = self._orders.get(client_order_id)
+            if payment_id is None:
+                self._stats.misses += 1
+                payment = None
+            else:
+                payment = self._lookup(payment_id)
+        if payment is None and self._shared is not None:
+            payment_id = self._shared.get(("order", self._scope, client_order_id))
+            if isinstance(payment_id, str):
+                return self._shared_lookup(payment_id)
+        return payment
+
+    def get_or_load(
+        self, payment_id: str, loader: Callable[[], PaymentResponse]
+    ) -> PaymentResponse:
+        return self._get_or_load(self.get(payment_id), loader)
+
+    def get_by_order_or_load(
+        self, client_order_id: str, loader: Callable[[], PaymentResponse]
+    ) -> PaymentResponse:
+        return self._get_or_load(self.get_by_order(client_order_id), loader)
+
+    def put(self, payment: PaymentResponse) -> None:
+        """Store a payment known to be current, e.g. from a mutation."""
+        with self._lock:
+            # Reads started earlier may return older data; keep this instead.
+            self._generation += 1
+            self._stats.updates += 1
+            self._store(payment)
+        self._share(payment)
+
+    def invalidate(
+        self, payment_id: str | None = None, *, client_order_id: str | None = None
+    ) -> None:
+        """Drop one payment by either ID, or everything when called bare."""
+        with self._lock:
+            self._generation += 1
+            if payment_id is None and client_order_id is None:
+                self._entries.clear()
+                self._orders.clear()
+            else:
+                if payment_id is None and client_order_id is not None:
+                    payment_id = self._orders.pop(client_order_id, None)
+                if payment_id is not None:
+                    entry = self._entries.get(payment_id)
+                    if entry is not None and client_order_id is None:
+                        client_order_id = entry.payment.client_order_id
+                    self._remove(payment_id)
+        if self._shared is None:
+            return
+        if payment_id is None and client_order_id is None:
+            self._shared.invalidate("payment", self._scope)
+            self._shared.invalidate("order", self._scope)
+            return
+        if client_order_id:
+            self._shared.delete(("order", self._scope, client_order_id))
+        if payment_id is not None:
+            self._shared.delete(("payment", self._scope, payment_id))
+
+    def stats(self) -> StoreStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _get_or_load(
+        self, cached: PaymentResponse | None, loader: Callable[[], PaymentResponse]
+    ) -> PaymentResponse:
+        if cached is not None:
+            return cached
+        with self._lock:
+            generation = self._generation
+        payment = loader()
+        with self._lock:
+            current = generation == self._generation
+            if current:
+                self._store(payment)
+        if current:
+            self._share(payment)
+        return payment
+
+    def _shared_lookup(self, payment_id: str) -> PaymentResponse | None:
+        assert self._shared is not None
+        payment = self._shared.get(("payment", self._scope, payment_id))
+        if not isinstance(payment, PaymentResponse):
+            return None
+        with self._lock:
+            self._stats.shared_hits += 1
+            if payment_id not in self._entries:
+                self._store(payment)
+        return payment
+
+    def _share(self, payment: PaymentResponse) -> None:
+        if self._shared is None or not payment.payment_id:
+            return
+        ttl = self._ttl_for(payment)
+        self._shared.set(("payment", self._scope, payment.payment_id), payment, ttl)
+        if payment.client_order_id:
+            self._shared.set(
+                ("order", self._scope, payment.client_order_id),
+                payment.payment_id,
+                ttl,
+            )
+
+    def _ttl_for(self, payment: PaymentResponse) -> float:
+        return self._final_ttl if payment.status in FINAL_STATUSES else self._ttl
+
+    def _lookup(self, payment_id: str) -> PaymentResponse | None:
+        entry = self._entries.get(payment_id)
+        if entry is None or self._clock() >= entry.expires:
+            if entry is not None:
+                self._remove(payment_id)
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(payment_id)
+        self._stats.hits += 1
+        return entry.payment
+
+    def _store(self, payment: PaymentResponse) -> None:
+        payment_id = payment.payment_id
+        if not payment_id:
+            return
+        self._remove(payment_id)
+        self._entries[payment_id] = _Entry(
+            payment, self._clock() + self._ttl_for(payment)
+        )
+        if payment.client_order_id:
+            self._orders[payment.client_order_id] = payment_id
+        while len(self._entries) > self._max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._forget_order(evicted.payment)
+            self._stats.evictions += 1
+
+    def _remove(self, payment_id: str) -> None:
+        entry = self._entries.pop(payment_id, None)
+        if entry is not None:
+            self._forget_order(entry.payment)
+
+    def _forget_order(self, payment: PaymentResponse) -> None:
+        client_order_id = payment.client_order_id
+        if client_order_id and self._orders.get(client_order_id) == payment.payment_id:
+            del self._orders[client_order_id]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from . import forksafe
+from .cache import ResponseCache
+from .circuit import CircuitBreaker
+from .codec import JsonCodec, default_codec
+from .hedge import HedgePolicy
+from .http import HttpClient
+from .metrics import RequestMetrics, RequestStats
+from .payments import PaymentsClient
+from .pool import ConnectionPool
+from .providers import ProvidersClient
+from .ratelimit import RateLimiter
+from .retry import RetryBudget
+from .singleflight import SingleFlight
+from .store import PaymentStore
+
+
+class TenantClient:
+    """``payments`` and ``providers`` for one API key of a ``DelopayClientFactory``."""
+
+    def __init__(
+        self,
+        http: HttpClient,
+        tenant_id: str,
+        *,
+        providers_cache: ResponseCache | None = None,
+        lazy_models: bool = False,
+        payment_store: PaymentStore | None = None,
+    ) -> None:
+        self._http = http
+        self.tenant_id = tenant_id
+        self.payments = PaymentsClient(
+            http, lazy_models=lazy_models, store=payment_store, tenant=tenant_id
+        )
+        self.providers = ProvidersClient(http, providers_cache, tenant=tenant_id)
+
+    @property
+    def rate_limiter(self) -> RateLimiter | None:
+        return self._http.rate_limiter
+
+    def stats(self) -> RequestStats:
+        assert self._http.metrics is not None
+        return self._http.metrics.stats()
+
+
+class DelopayClientFactory:
+    """Serves many API keys from one connection pool and set of policies.
+
+    ``tenant(api_key)`` returns the ``TenantClient`` for a key, creating it
+    the first time: an ``HttpClient`` sharing the pool, request coalescing,
+    circuit breaker, retry budget, hedging and codec, with its own rate
+    limiter (``tenant_rate`` and ``tenant_burst``, unless one is passed) and
+    request metrics. Provider data in ``providers_cache`` is keyed by tenant.
+    A ``PaymentStore`` is never shared, since payments are only visible to
+    the key that owns them. ``tenant_id`` names the tenant in cache keys and
+    ``stats()``; it defaults to a digest of the API key.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str = "https://sandbox-delopay.deloxity.com",
+        timeout_ms: int = 30_000,
+        max_retries: int = 2,
+        pool_maxsize: int = 10,
+        pool_idle_timeout_ms: int = 60_000,
+        providers_cache: ResponseCache | None = None,
+        coalesce_requests: bool = False,
+        tenant_rate: float | None = None,
+        tenant_burst: int | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        connect_timeout_ms: int | None = None,
+        deadline_ms: int | None = None,
+        retry_budget: RetryBudget | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        json_codec: JsonCodec | None = None,
+        lazy_models: bool = False,
+    ) -> None:
+        self._pool = (
+            ConnectionPool(
+                maxsize=pool_maxsize, idle_timeout=pool_idle_timeout_ms / 1000
+            )
+            if pool_maxsize > 0
+            else None
+        )
+        self._transport: dict[str, Any] = {
+            "base_url": base_url,
+            "timeout_ms": timeout_ms,
+            "max_retries": max_retries,
+            "pool": self._pool,
+            "single_flight": SingleFlight() if coalesce_requests else None,
+            "circuit_breaker": circuit_breaker,
+            "connect_timeout_ms": connect_timeout_ms,
+            "deadline_ms": deadline_ms,
+            "retry_budget": retry_budget,
+            "hedge_policy": hedge_policy,
+            "json_codec": json_codec or default_codec(),
+        }
+        self._providers_cache = providers_cache
+        self._lazy_models = lazy_models
+        self._tenant_rate = tenant_rate
+        self._tenant_burst = tenant_burst
+        self._lock = threading.Lock()
+        self._tenants: dict[str, TenantClient] = {}
+        forksafe.register(self)
+
+    def __enter__(self) -> DelopayClientFactory:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def tenant(
+        self,
+        api_key: str,
+        *,
+        tenant_id: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        payment_store: PaymentStore | None = None,
+    ) -> TenantClient:
+        """Return the client for ``api_key``; options apply on first use only."""
+        with self._lock:
+            client = self._tenants.get(api_key)
+            if client is not None:
+                if tenant_id is not None and tenant_id != client.tenant_id:
+                    raise ValueError(
+                        f"API key is already registered as {client.tenant_id!r}"
+                    )
+                return client
+
+            if rate_limiter is None and self._tenant_rate is not None:
+                rate_limiter = RateLimiter(self._tenant_rate, self._tenant_burst)
+            http = HttpClient(
+                api_key=api_key,
+                rate_limiter=rate_limiter,
+                metrics=RequestMetrics(),
+                **self._transport,
+            )
+            client = TenantClient(
+                http,
+                tenant_id or http.key_digest,
+                providers_cache=self._providers_cache,
+                lazy_models=self._lazy_models,
+                payment_store=payment_store,
+            )
+            self._tenants[api_key] = client
+            return client
+
+    def discard(self, api_key: str) -> None:
+        """Forget a tenant, e.g. after its API key was rotated."""
+        with self._lock:
+            client = self._tenants.pop(api_key, None)
+        if client is not None:
+            client.providers.invalidate()
+
+    def stats(self) -> dict[str, RequestStats]:
+        with self._lock:
+            clients = list(self._tenants.values())
+        return {client.tenant_id: client.stats() for client in clients}
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
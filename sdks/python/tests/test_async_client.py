@@ -0,0 +1,240 @@
+"""Tests for AsyncDelopayClient and its asyncio transport."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from delopay import ApiError, AsyncDelopayClient, CreatePaymentRequest
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        self.server.requests.append(("GET", self.path, None))
+        if self.path.endswith("/flaky") and self.server.failures > 0:
+            self.server.failures -= 1
+            self._send(503, {"message": "Unavailable"})
+            return
+        if self.path.endswith("/missing"):
+            self._send(404, {"message": "Not found", "code": "E_NOT_FOUND"})
+            return
+        if self.path.startswith("/api/providers"):
+            self._send_chunked({"providers": [{"id": "STRIPE", "enabled": True}]})
+            return
+        payment_id = self.path.rsplit("/", 1)[-1]
+        self._send(200, {"paymentId": payment_id, "status": "PENDING"})
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.requests.append(("POST", self.path, body))
+        if self.server.drop_posts:
+            self.close_connection = True
+            return
+        if self.server.failures > 0:
+            self.server.failures -= 1
+            self._send(503, {"message": "Unavailable"})
+            return
+        self._send(
+            200, {"paymentId": "pay_new", "clientOrderId": body["clientOrderId"]}
+        )
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-request-id", "req_async")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunked(self, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(body), 7):
+            chunk = body[start : start + 7]
+            self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+    httpd.connections = set()
+    httpd.requests = []
+    httpd.failures = 0
+    httpd.drop_posts = False
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_client(httpd, **kwargs) -> AsyncDelopayClient:
+    host, port = httpd.server_address
+    return AsyncDelopayClient(api_key="key", base_url=f"http://{host}:{port}", **kwargs)
+
+
+class TestAsyncPayments:
+    """Test awaitable payment calls."""
+
+    def test_get_reuses_connection(self, server):
+        """Test that sequential awaits share one keep-alive connection."""
+
+        async def scenario():
+            async with make_client(server) as client:
+                first = await client.payments.get("pay_1")
+                second = await client.payments.get_by_order("order 1")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first.payment_id == "pay_1"
+        assert first.status == "PENDING"
+        assert second.payment_id == "order%201"
+        assert server.requests[1][1] == "/api/payments/by-order/order%201"
+        assert len(server.connections) == 1
+
+    def test_create_sends_json_body(self, server):
+        """Test that create posts the camelCase payload."""
+
+        async def scenario():
+            async with make_client(server) as client:
+                return await client.payments.create(
+                    CreatePaymentRequest(
+                        client_order_id="order_1",
+                        provider="STRIPE",
+                        amount=10,
+                        currency="EUR",
+                        success_url="https://ok",
+                        cancel_url="https://cancel",
+                    )
+                )
+
+        result = asyncio.run(scenario())
+
+        method, path, body = server.requests[0]
+        assert (method, path) == ("POST", "/api/payments/create")
+        assert body["clientOrderId"] == "order_1"
+        assert "autoCapture" not in body
+        assert result.client_order_id == "order_1"
+
+    def test_concurrent_gets(self, server):
+        """Test many in-flight calls on one event loop."""
+
+        async def scenario():
+            async with make_client(server) as client:
+                return await asyncio.gather(
+                    *(client.payments.get(f"pay_{index}") for index in range(20))
+                )
+
+        results = asyncio.run(scenario())
+
+        assert [item.payment_id for item in results] == [
+            f"pay_{index}" for index in range(20)
+        ]
+
+
+class TestAsyncErrors:
+    """Test ApiError and retry semantics."""
+
+    def test_api_error_mapping(self, server):
+        """Test that 4xx responses raise ApiError with code and request id."""
+
+        async def scenario():
+            async with make_client(server) as client:
+                await client.payments.get("missing")
+
+        with pytest.raises(ApiError) as exc:
+            asyncio.run(scenario())
+
+        assert exc.value.status == 404
+        assert exc.value.code == "E_NOT_FOUND"
+        assert exc.value.request_id == "req_async"
+
+    def test_get_retries_server_errors(self, server):
+        """Test that GET retries 5xx responses."""
+        server.failures = 2
+
+        async def scenario():
+            async with make_client(server, max_retries=2) as client:
+                return await client.payments.get("flaky")
+
+        assert asyncio.run(scenario()).payment_id == "flaky"
+        assert len(server.requests) == 3
+
+    def test_post_is_not_retried(self, server):
+        """Test that POST surfaces the first 5xx."""
+        server.failures = 1
+
+        async def scenario():
+            async with make_client(server, max_retries=2) as client:
+                await client.payments.capture("pay_1")
+
+        with pytest.raises(ApiError) as exc:
+            asyncio.run(scenario())
+
+        assert exc.value.status == 503
+        assert len(server.requests) == 1
+
+    def test_unanswered_post_on_reused_connection_is_not_resent(self, server):
+        """Test that a POST the server may have applied is sent only once."""
+        server.drop_posts = True
+
+        async def scenario():
+            async with make_client(server, max_retries=2) as client:
+                await client.payments.get("pay_1")
+                await client.payments.capture("pay_1")
+
+        with pytest.raises(ApiError) as exc:
+            asyncio.run(scenario())
+
+        assert exc.value.status == 0
+        assert [method for method, _, _ in server.requests] == ["GET", "POST"]
+
+    def test_network_error(self):
+        """Test that connection failures map to status 0."""
+
+        async def scenario():
+            client = AsyncDelopayClient(
+                api_key="key", base_url="http://127.0.0.1:9", max_retries=0
+            )
+            async with client:
+                await client.payments.get("pay_1")
+
+        with pytest.raises(ApiError) as exc:
+            asyncio.run(scenario())
+
+        assert exc.value.status == 0
+
+
+class TestAsyncProviders:
+    """Test awaitable provider calls."""
+
+    def test_list_decodes_chunked_response(self, server):
+        """Test chunked transfer decoding in the asyncio transport."""
+
+        async def scenario():
+            async with make_client(server) as client:
+                return await client.providers.list()
+
+        result = asyncio.run(scenario())
+
+        assert [provider.id for provider in result.providers] == ["STRIPE"]
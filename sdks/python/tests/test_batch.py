@@ -0,0 +1,132 @@
+"""Tests for the columnar PaymentBatch."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from delopay import ApiError, PaymentBatch, PaymentResponse, PaymentStatus
+
+
+def payment(index: int, **overrides) -> dict:
+    return {
+        "paymentId": f"pay_{index}",
+        "clientOrderId": f"order_{index}",
+        "provider": "STRIPE",
+        "status": "COMPLETED",
+        "amount": 10.0 + index,
+        "currency": "EUR",
+        "metadata": {"cart": f"c_{index}"},
+        **overrides,
+    }
+
+
+@pytest.fixture
+def batch() -> PaymentBatch:
+    return PaymentBatch(
+        [
+            payment(0),
+            payment(1, status="FAILED"),
+            payment(2, currency="USD"),
+            PaymentResponse.from_dict(payment(3, amount=None, metadata={})),
+        ]
+    )
+
+
+class TestRows:
+    """Test row views."""
+
+    def test_rows_read_like_payment_response(self, batch):
+        """Test that every column reads back as the model would."""
+        for index, row in enumerate(batch):
+            expected = PaymentResponse.from_dict(
+                payment(index, amount=None, metadata={})
+                if index == 3
+                else payment(index)
+            )
+            if index == 1:
+                expected.status = PaymentStatus.FAILED
+            if index == 2:
+                expected.currency = "USD"
+            assert row.materialize() == expected
+
+    def test_column_types(self, batch):
+        """Test enum decoding, missing numbers and lazy metadata."""
+        assert batch[0].status is PaymentStatus.COMPLETED
+        assert batch[-1].amount is None
+        assert batch[-1].metadata == {}
+        assert batch[0].metadata == {"cart": "c_0"}
+        assert batch.column("payment_id") == ["pay_0", "pay_1", "pay_2", "pay_3"]
+
+    def test_unknown_attributes_and_indexes(self, batch):
+        """Test the error paths."""
+        with pytest.raises(AttributeError):
+            assert batch[0].missing
+        with pytest.raises(IndexError):
+            batch[4]
+        with pytest.raises(ValueError):
+            batch.column("missing")
+
+
+class TestQueries:
+    """Test filtering, grouping and summing."""
+
+    def test_filter_by_category_and_predicate(self, batch):
+        """Test equality filters and predicates."""
+        assert [row.payment_id for row in batch.filter(status="FAILED")] == ["pay_1"]
+        assert len(batch.filter(status="EXPIRED")) == 0
+        assert len(batch.filter(currency="EUR", status="COMPLETED")) == 2
+        assert [
+            row.payment_id for row in batch.filter(lambda row: row.amount == 12.0)
+        ] == ["pay_2"]
+        assert len(batch.filter(client_order_id="order_3")) == 1
+
+    def test_group_by_and_sum(self, batch):
+        """Test per-group totals, skipping missing amounts."""
+        totals = {
+            currency: group.sum("amount")
+            for currency, group in batch.group_by("currency").items()
+        }
+
+        assert totals == {"EUR": 21.0, "USD": 12.0}
+        assert batch.sum() == 33.0
+        with pytest.raises(ValueError):
+            batch.sum("currency")
+        with pytest.raises(ValueError):
+            batch.group_by("metadata")
+
+    def test_filtered_batches_accept_appends(self, batch):
+        """Test that a derived batch is independent but shares value tables."""
+        failed = batch.filter(status="FAILED")
+
+        failed.append(payment(9, status="REFUNDED"))
+
+        assert len(failed) == 2
+        assert len(batch) == 4
+        assert failed[-1].status is PaymentStatus.REFUNDED
+
+
+class TestStreaming:
+    """Test appending bulk read results."""
+
+    def test_extend_results(self):
+        """Test that successes are appended and failures returned."""
+        error = ApiError(status=404, message="Not found")
+        results = [
+            ("pay_1", PaymentResponse.from_dict(payment(1))),
+            ("pay_2", error),
+        ]
+        batch = PaymentBatch()
+
+        failed = batch.extend_results(results)
+
+        assert len(batch) == 1
+        assert failed == {"pay_2": error}
+
+    def test_metadata_is_stored_encoded(self):
+        """Test that metadata is kept as JSON bytes until read."""
+        batch = PaymentBatch([payment(1)])
+
+        assert json.loads(batch._metadata[0]) == {"cart": "c_1"}
+        assert batch[0].metadata is not batch[0].metadata
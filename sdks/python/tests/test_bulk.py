@@ -0,0 +1,329 @@
+"""Tests for bulk payment operations."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+from urllib.error import HTTPError
+
+from delopay import (
+    ApiError,
+    DelopayClient,
+    RefundPaymentRequest,
+    UpdatePaymentRequest,
+)
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict | None = None) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        if self._payload is None:
+            return b""
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def make_fake_urlopen(calls: list, delays: dict | None = None):
+    lock = threading.Lock()
+
+    def fake_urlopen(request, timeout=0):
+        key = request.full_url.rsplit("/", 1)[-1]
+        with lock:
+            calls.append((request.method, request.full_url))
+        time.sleep((delays or {}).get(key, 0))
+        if key.startswith("missing"):
+            raise HTTPError(
+                url=request.full_url,
+                code=404,
+                msg="Not Found",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Payment not found"}'),
+            )
+        return FakeResponse(
+            200, {"paymentId": key, "clientOrderId": f"order_for_{key}"}
+        )
+
+    return fake_urlopen
+
+
+class TestGetMany:
+    """Test concurrent bulk reads."""
+
+    def test_ordered_results_follow_input(self, monkeypatch):
+        """Test that ordered mode yields in input order despite latency."""
+        calls: list = []
+        delays = {"pay_0": 0.05, "pay_1": 0.02}
+        monkeypatch.setattr("delopay.http.urlopen", make_fake_urlopen(calls, delays))
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        ids = [f"pay_{index}" for index in range(10)]
+        results = list(client.payments.get_many(ids, max_workers=4, ordered=True))
+
+        assert [key for key, _ in results] == ids
+        assert all(result.payment_id == key for key, result in results)
+
+    def test_unordered_results_as_completed(self, monkeypatch):
+        """Test that unordered mode yields fast results before slow ones."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_fake_urlopen(calls, {"pay_slow": 0.1})
+        )
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        results = list(client.payments.get_many(["pay_slow", "pay_fast"]))
+
+        assert [key for key, _ in results] == ["pay_fast", "pay_slow"]
+
+    def test_duplicate_ids_fetched_once(self, monkeypatch):
+        """Test that repeated IDs are de-duplicated."""
+        calls: list = []
+        monkeypatch.setattr("delopay.http.urlopen", make_fake_urlopen(calls))
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        results = dict(client.payments.get_many(["pay_1", "pay_2", "pay_1"]))
+
+        assert set(results) == {"pay_1", "pay_2"}
+        assert len(calls) == 2
+
+    def test_errors_do_not_abort_batch(self, monkeypatch):
+        """Test that per-item ApiErrors are yielded alongside successes."""
+        calls: list = []
+        monkeypatch.setattr("delopay.http.urlopen", make_fake_urlopen(calls))
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        results = dict(
+            client.payments.get_many(["pay_1", "missing_1", "pay_2"], ordered=True)
+        )
+
+        assert isinstance(results["missing_1"], ApiError)
+        assert results["missing_1"].status == 404
+        assert results["pay_2"].payment_id == "pay_2"
+
+    def test_input_consumed_lazily(self, monkeypatch):
+        """Test that in-flight work is bounded for long inputs."""
+        calls: list = []
+        monkeypatch.setattr("delopay.http.urlopen", make_fake_urlopen(calls))
+        consumed = []
+
+        def ids():
+            for index in range(1000):
+                consumed.append(index)
+                yield f"pay_{index}"
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        results = client.payments.get_many(ids(), max_workers=2, ordered=True)
+        next(results)
+        results.close()
+
+        assert len(consumed) <= 5
+
+
+class TestGetByOrderMany:
+    """Test bulk lookups by client order ID."""
+
+    def test_get_by_order_many(self, monkeypatch):
+        """Test that order IDs hit the by-order endpoint."""
+        calls: list = []
+        monkeypatch.setattr("delopay.http.urlopen", make_fake_urlopen(calls))
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        results = dict(client.payments.get_by_order_many(["order_1", "order_2"]))
+
+        assert set(results) == {"order_1", "order_2"}
+        assert sorted(url for _, url in calls) == [
+            "https://api.test.com/api/payments/by-order/order_1",
+            "https://api.test.com/api/payments/by-order/order_2",
+        ]
+
+
+def make_mutation_urlopen(
+    calls: list, failing: set | None = None, *, status: int = 422
+):
+    lock = threading.Lock()
+
+    def fake_urlopen(request, timeout=0):
+        payment_id = request.full_url.split("/api/payments/", 1)[1].split("/")[0]
+        body = json.loads(request.data) if request.data else None
+        with lock:
+            calls.append((request.method, request.full_url, body))
+        if payment_id in (failing or set()):
+            raise HTTPError(
+                url=request.full_url,
+                code=status,
+                msg="Rejected",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Invalid state"}'),
+            )
+        if request.full_url.endswith("/refund"):
+            return FakeResponse(
+                200, {"refundId": f"ref_{payment_id}", "paymentId": payment_id}
+            )
+        return FakeResponse(200, {"paymentId": payment_id, "status": "COMPLETED"})
+
+    return fake_urlopen
+
+
+class TestMutations:
+    """Test bulk capture, refund and update."""
+
+    def test_capture_many_reports_partial_failures(self, monkeypatch):
+        """Test that successes and failures are both reported."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_mutation_urlopen(calls, {"pay_2"})
+        )
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        report = client.payments.capture_many(["pay_1", "pay_2", "pay_3", "pay_1"])
+
+        assert set(report.succeeded) == {"pay_1", "pay_3"}
+        assert report.failed["pay_2"].status == 422
+        assert report.skipped == ["pay_1"]
+        assert report.error_rate == 1 / 3
+        assert len(calls) == 3
+
+    def test_failed_mutations_are_not_retried(self, monkeypatch):
+        """Test that a failing POST is sent exactly once."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_mutation_urlopen(calls, {"pay_1"})
+        )
+
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", max_retries=3
+        )
+        report = client.payments.capture_many(["pay_1"])
+
+        assert list(report.failed) == ["pay_1"]
+        assert len(calls) == 1
+
+    def test_ambiguous_failures_are_unresolved(self, monkeypatch, tmp_path):
+        """Test that outcomes that may have been applied are never resent."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen",
+            make_mutation_urlopen(calls, {"pay_1", "pay_2"}, status=503),
+        )
+        checkpoint = tmp_path / "capture.jsonl"
+
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", max_retries=3
+        )
+        report = client.payments.capture_many(
+            ["pay_1", "pay_2", "pay_3"], checkpoint=checkpoint, max_workers=1
+        )
+        rerun = client.payments.capture_many(
+            ["pay_1", "pay_2", "pay_3"], checkpoint=checkpoint
+        )
+
+        assert report.unresolved == ["pay_1", "pay_2"]
+        assert report.failed == {}
+        assert list(report.succeeded) == ["pay_3"]
+        assert rerun.unresolved == ["pay_1", "pay_2"]
+        assert rerun.skipped == ["pay_3"]
+        assert len(calls) == 3
+
+    def test_distinct_mutations_for_one_payment(self, monkeypatch, tmp_path):
+        """Test that a second, different refund is rejected, not skipped."""
+        calls: list = []
+        monkeypatch.setattr("delopay.http.urlopen", make_mutation_urlopen(calls))
+        checkpoint = tmp_path / "refund.jsonl"
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        report = client.payments.refund_many(
+            [
+                ("pay_1", {"amount": 5.0}),
+                ("pay_1", {"amount": 5.0}),
+                ("pay_1", {"amount": 7.0}),
+            ],
+            checkpoint=checkpoint,
+        )
+        later = client.payments.refund_many(
+            [("pay_1", {"amount": 7.0})], checkpoint=checkpoint
+        )
+
+        assert list(report.succeeded) == ["pay_1"]
+        assert report.skipped == ["pay_1"]
+        assert report.rejected == ["pay_1"]
+        assert list(later.succeeded) == ["pay_1"]
+        assert [body for _, _, body in calls] == [{"amount": 5.0}, {"amount": 7.0}]
+
+    def test_refund_and_update_many(self, monkeypatch):
+        """Test that per-payment request bodies are sent."""
+        calls: list = []
+        monkeypatch.setattr("delopay.http.urlopen", make_mutation_urlopen(calls))
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        refunds = client.payments.refund_many(
+            {"pay_1": RefundPaymentRequest(amount=5.0, reason="damaged")}
+        )
+        updates = client.payments.update_many(
+            [("pay_2", UpdatePaymentRequest(description="Adjusted"))]
+        )
+
+        assert refunds.succeeded["pay_1"].refund_id == "ref_pay_1"
+        assert updates.succeeded["pay_2"].status == "COMPLETED"
+        assert calls[0][2] == {"amount": 5.0, "reason": "damaged"}
+        assert calls[1][:2] == ("PUT", "https://api.test.com/api/payments/pay_2")
+        assert calls[1][2] == {"description": "Adjusted"}
+
+    def test_stops_when_error_rate_exceeded(self, monkeypatch):
+        """Test that new calls stop once the error-rate threshold trips."""
+        calls: list = []
+        failing = {f"pay_{index}" for index in range(100)}
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_mutation_urlopen(calls, failing)
+        )
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        report = client.payments.capture_many(
+            (f"pay_{index}" for index in range(100)),
+            max_workers=1,
+            max_error_rate=0.5,
+            min_samples=5,
+        )
+
+        assert report.stopped is True
+        assert report.attempted < 10
+        assert len(calls) == report.attempted
+
+    def test_checkpoint_resumes_and_flags_unresolved(self, monkeypatch, tmp_path):
+        """Test that a rerun skips finished work and never resends in-flight calls."""
+        calls: list = []
+        monkeypatch.setattr("delopay.http.urlopen", make_mutation_urlopen(calls))
+        checkpoint = tmp_path / "capture.jsonl"
+        checkpoint.write_text(
+            '{"key": "pay_1", "state": "started"}\n'
+            '{"key": "pay_1", "state": "succeeded"}\n'
+            '{"key": "pay_2", "state": "started"}\n'
+            '{"key": "pay_3", "sta',
+            encoding="utf-8",
+        )
+
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+        report = client.payments.capture_many(
+            ["pay_1", "pay_2", "pay_3"], checkpoint=checkpoint
+        )
+
+        assert report.skipped == ["pay_1"]
+        assert report.unresolved == ["pay_2"]
+        assert list(report.succeeded) == ["pay_3"]
+        assert [url for _, url, _ in calls] == [
+            "https://api.test.com/api/payments/pay_3/capture"
+        ]
+        assert checkpoint.read_text(encoding="utf-8").splitlines()[-1] == (
+            '{"key": "pay_3", "state": "succeeded"}'
+        )
@@ -0,0 +1,310 @@
+"""Tests for response caching."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+from urllib.error import HTTPError
+
+import pytest
+
+from delopay import ApiError, DelopayClient, TTLCache
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict | None = None) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        if self._payload is None:
+            return b""
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    calls: list = []
+    lock = threading.Lock()
+
+    def fake_urlopen(request, timeout=0):
+        with lock:
+            calls.append(request.full_url)
+            version = len(calls)
+        if request.full_url.endswith("/client-config"):
+            provider = request.full_url.split("/")[-2].upper()
+            return FakeResponse(200, {"provider": provider, "clientId": f"v{version}"})
+        return FakeResponse(200, {"providers": [{"id": f"STRIPE_v{version}"}]})
+
+    monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+    return calls
+
+
+class TestTTLCache:
+    """Test the cache primitive."""
+
+    def test_fresh_entries_are_hits(self):
+        """Test that entries are served until their TTL expires."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, clock=clock)
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return len(loads)
+
+        assert cache.get_or_load(("op",), loader) == 1
+        clock.now += 9
+        assert cache.get_or_load(("op",), loader) == 1
+        clock.now += 2
+        assert cache.get_or_load(("op",), loader) == 2
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (1, 2)
+
+    def test_per_operation_ttls(self):
+        """Test that the first key element selects the TTL."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=100, ttls={"short": 1}, clock=clock)
+
+        cache.get_or_load(("short",), lambda: "a")
+        cache.get_or_load(("long",), lambda: "a")
+        clock.now += 5
+
+        assert cache.get_or_load(("short",), lambda: "b") == "b"
+        assert cache.get_or_load(("long",), lambda: "b") == "a"
+
+    def test_bounded_size_evicts_least_recently_used(self):
+        """Test LRU eviction once max_entries is exceeded."""
+        cache = TTLCache(max_entries=2)
+
+        cache.get_or_load(("op", 1), lambda: 1)
+        cache.get_or_load(("op", 2), lambda: 2)
+        cache.get_or_load(("op", 1), lambda: -1)
+        cache.get_or_load(("op", 3), lambda: 3)
+
+        assert len(cache) == 2
+        assert cache.get_or_load(("op", 1), lambda: -1) == 1
+        assert cache.get_or_load(("op", 2), lambda: 22) == 22
+        assert cache.stats().evictions == 2
+
+    def test_invalidate_by_prefix(self):
+        """Test targeted and full invalidation."""
+        cache = TTLCache()
+        cache.get_or_load(("config", "STRIPE"), lambda: 1)
+        cache.get_or_load(("config", "PAYPAL"), lambda: 1)
+        cache.get_or_load(("list",), lambda: 1)
+
+        cache.invalidate("config", "STRIPE")
+        assert len(cache) == 2
+        cache.invalidate()
+        assert len(cache) == 0
+
+
+class TestProvidersCache:
+    """Test opt-in caching on ProvidersClient."""
+
+    def test_cache_is_opt_in(self, provider_calls):
+        """Test that the default client always hits the network."""
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+
+        client.providers.list()
+        client.providers.list()
+
+        assert client.providers.cache is None
+        assert len(provider_calls) == 2
+
+    def test_list_and_config_are_cached(self, provider_calls):
+        """Test that repeated lookups are served from cache."""
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            providers_cache=TTLCache(ttl=60),
+        )
+
+        first = client.providers.list()
+        second = client.providers.list()
+        stripe = client.providers.get_client_config("stripe")
+        paypal = client.providers.get_client_config("paypal")
+        client.providers.get_client_config("stripe")
+
+        assert first is second
+        assert (stripe.provider, paypal.provider) == ("STRIPE", "PAYPAL")
+        assert len(provider_calls) == 3
+        assert client.providers.cache.stats().hits == 2
+
+    def test_stale_while_revalidate(self, provider_calls):
+        """Test that stale entries are served while a refresh runs."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, stale_ttl=30, clock=clock)
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", providers_cache=cache
+        )
+
+        assert client.providers.list().providers[0].id == "STRIPE_v1"
+        clock.now += 15
+        assert client.providers.list().providers[0].id == "STRIPE_v1"
+        wait_for(lambda: cache.stats().refreshes == 1)
+        assert client.providers.list().providers[0].id == "STRIPE_v2"
+
+        clock.now += 100
+        assert client.providers.list().providers[0].id == "STRIPE_v3"
+        assert cache.stats().stale_hits == 1
+
+    def test_invalidate_forces_reload(self, provider_calls):
+        """Test that invalidate() drops cached provider data."""
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            providers_cache=TTLCache(ttl=60),
+        )
+
+        client.providers.list()
+        client.providers.invalidate()
+        client.providers.list()
+
+        assert len(provider_calls) == 2
+
+
+@pytest.fixture
+def stripe_calls(monkeypatch):
+    calls: list = []
+
+    def fake_urlopen(request, timeout=0):
+        calls.append(request.full_url)
+        if "merchantCountry=XX" in request.full_url:
+            raise HTTPError(
+                url=request.full_url,
+                code=400,
+                msg="Bad Request",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Invalid country","code":"E_COUNTRY"}'),
+            )
+        if "merchantCountry=RL" in request.full_url:
+            raise HTTPError(
+                url=request.full_url,
+                code=429,
+                msg="Too Many Requests",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Slow down"}'),
+            )
+        return FakeResponse(
+            200, {"success": True, "paymentMethods": [{"type": "card"}]}
+        )
+
+    monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+    return calls
+
+
+class TestStripePaymentMethodsCache:
+    """Test caching of Stripe payment-method lookups."""
+
+    def test_keyed_by_country_pair_and_currency(self, stripe_calls):
+        """Test that each combination is fetched once."""
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            providers_cache=TTLCache(ttl=60),
+        )
+
+        for _ in range(3):
+            client.providers.get_stripe_payment_methods(
+                merchant_country="DE", customer_country="DE", currency="EUR"
+            )
+            client.providers.get_stripe_payment_methods(
+                merchant_country="DE", customer_country="FR", currency="EUR"
+            )
+
+        assert len(stripe_calls) == 2
+
+    def test_negative_caching_of_client_errors(self, stripe_calls):
+        """Test that 4xx responses are cached and re-raised."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=60, negative_ttl=5, clock=clock)
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", providers_cache=cache
+        )
+
+        for _ in range(2):
+            with pytest.raises(ApiError) as exc:
+                client.providers.get_stripe_payment_methods(
+                    merchant_country="XX", customer_country="DE"
+                )
+            assert exc.value.code == "E_COUNTRY"
+        clock.now += 6
+        with pytest.raises(ApiError):
+            client.providers.get_stripe_payment_methods(
+                merchant_country="XX", customer_country="DE"
+            )
+
+        assert len(stripe_calls) == 2
+        assert cache.stats().negative_hits == 1
+
+    def test_rate_limit_errors_are_not_cached(self, stripe_calls):
+        """Test that 429 responses are never negatively cached."""
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            providers_cache=TTLCache(negative_ttl=60),
+        )
+
+        for _ in range(2):
+            with pytest.raises(ApiError):
+                client.providers.get_stripe_payment_methods(
+                    merchant_country="RL", customer_country="DE"
+                )
+
+        assert len(stripe_calls) == 2
+
+    def test_warm_up_preloads_combinations(self, stripe_calls):
+        """Test that warm_up fills the cache and collects errors."""
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            providers_cache=TTLCache(ttl=60, negative_ttl=60),
+        )
+
+        errors = client.providers.warm_up(
+            providers=False,
+            stripe_payment_methods=[("DE", "DE", "EUR"), ("XX", "DE", None)],
+        )
+        client.providers.get_stripe_payment_methods(
+            merchant_country="DE", customer_country="DE", currency="EUR"
+        )
+
+        assert [error.code for error in errors] == ["E_COUNTRY"]
+        assert len(stripe_calls) == 2
+
+    def test_warm_up_requires_cache(self):
+        """Test that warm_up is rejected without a cache."""
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+
+        with pytest.raises(ValueError):
+            client.providers.warm_up()
@@ -0,0 +1,249 @@
+"""Tests for the asyncio callback receiver."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from delopay import CallbackReceiver, PaymentResponse, RefundResponse
+from delopay.async_http import AsyncConnectionPool
+from delopay.callbacks import decode_callback, replay
+
+
+def payment_body(payment_id: str, status: str = "COMPLETED") -> bytes:
+    return json.dumps({"paymentId": payment_id, "status": status}).encode("utf-8")
+
+
+class Collector:
+    def __init__(self) -> None:
+        self.batches: list[list] = []
+
+    async def __call__(self, events: list) -> None:
+        self.batches.append(events)
+
+    @property
+    def events(self) -> list:
+        return [event for batch in self.batches for event in batch]
+
+
+class TestDecode:
+    """Test decoding of callback bodies."""
+
+    def test_payment_and_refund_bodies(self):
+        """Test that refunds are told apart by their refundId."""
+        payment = decode_callback(payment_body("pay_1"))
+        refund = decode_callback(
+            b'{"refundId":"ref_1","paymentId":"pay_1","status":"COMPLETED"}'
+        )
+
+        assert isinstance(payment, PaymentResponse)
+        assert payment.payment_id == "pay_1"
+        assert isinstance(refund, RefundResponse)
+        assert refund.refund_id == "ref_1"
+
+    @pytest.mark.parametrize("body", [b"not json", b"[1, 2]", b"\xff"])
+    def test_invalid_bodies(self, body):
+        """Test that malformed bodies raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_callback(body)
+
+
+class TestReceiver:
+    """Test batching, deduplication and backpressure."""
+
+    def test_concurrent_callbacks_are_batched(self):
+        """Test that a burst is delivered in a few large batches."""
+        collector = Collector()
+
+        async def scenario():
+            receiver = CallbackReceiver(collector, batch_size=100)
+            statuses = await asyncio.gather(
+                *(receiver.submit(payment_body(f"pay_{i}")) for i in range(250))
+            )
+            await receiver.stop()
+            return statuses, receiver.stats()
+
+        statuses, stats = asyncio.run(scenario())
+
+        assert set(statuses) == {200}
+        assert len(collector.events) == 250
+        assert max(len(batch) for batch in collector.batches) == 100
+        assert stats.batches == len(collector.batches) == 3
+        assert stats.delivered == 250
+
+    def test_duplicates_are_dropped(self):
+        """Test deduplication by payment ID and status."""
+        collector = Collector()
+
+        async def scenario():
+            receiver = CallbackReceiver(collector, batch_interval=0)
+            concurrent = await asyncio.gather(
+                receiver.submit(payment_body("pay_1", "PENDING")),
+                receiver.submit(payment_body("pay_1", "PENDING")),
+            )
+            later = [
+                await receiver.submit(payment_body("pay_1", "PENDING")),
+                await receiver.submit(payment_body("pay_1", "COMPLETED")),
+            ]
+            await receiver.stop()
+            return concurrent + later, receiver.stats()
+
+        statuses, stats = asyncio.run(scenario())
+
+        assert statuses == [200, 200, 200, 200]
+        assert [event.status for event in collector.events] == [
+            "PENDING",
+            "COMPLETED",
+        ]
+        assert stats.duplicates == 2
+
+    def test_dedup_window_is_bounded(self):
+        """Test that old keys are forgotten once the window is full."""
+        collector = Collector()
+
+        async def scenario():
+            receiver = CallbackReceiver(collector, batch_interval=0, dedup_window=2)
+            for payment_id in ["pay_1", "pay_2", "pay_3", "pay_1"]:
+                await receiver.submit(payment_body(payment_id))
+            await receiver.stop()
+
+        asyncio.run(scenario())
+
+        assert len(collector.events) == 4
+
+    def test_handler_errors_are_not_acknowledged(self):
+        """Test that a failed batch answers 500 and accepts the retry."""
+        attempts = []
+
+        async def flaky(events):
+            attempts.append(events)
+            if len(attempts) == 1:
+                raise RuntimeError("database down")
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            loop.set_exception_handler(lambda loop, context: None)
+            receiver = CallbackReceiver(flaky, batch_interval=0)
+            first = await receiver.submit(payment_body("pay_1"))
+            second = await receiver.submit(payment_body("pay_1"))
+            await receiver.stop()
+            return first, second, receiver.stats()
+
+        first, second, stats = asyncio.run(scenario())
+
+        assert (first, second) == (500, 200)
+        assert stats.handler_errors == 1
+        assert len(attempts) == 2
+
+    def test_full_queue_rejects_with_503(self):
+        """Test backpressure when the handler cannot keep up."""
+        release = None
+
+        async def slow(events):
+            await release.wait()
+
+        async def scenario():
+            nonlocal release
+            release = asyncio.Event()
+            receiver = CallbackReceiver(
+                slow,
+                batch_size=1,
+                batch_interval=0,
+                queue_size=1,
+                enqueue_timeout=0.01,
+            )
+            in_handler = asyncio.create_task(receiver.submit(payment_body("pay_1")))
+            await asyncio.sleep(0.01)
+            queued = asyncio.create_task(receiver.submit(payment_body("pay_2")))
+            await asyncio.sleep(0)
+            rejected = await receiver.submit(payment_body("pay_3"))
+            release.set()
+            statuses = [await in_handler, await queued, rejected]
+            await receiver.stop()
+            return statuses, receiver.stats()
+
+        statuses, stats = asyncio.run(scenario())
+
+        assert statuses == [200, 200, 503]
+        assert stats.rejected == 1
+
+    def test_invalid_body_is_rejected(self):
+        """Test that undecodable bodies answer 400."""
+
+        async def scenario():
+            receiver = CallbackReceiver(Collector())
+            status = await receiver.submit(b"{")
+            await receiver.stop()
+            return status, receiver.stats()
+
+        status, stats = asyncio.run(scenario())
+
+        assert status == 400
+        assert stats.invalid == 1
+
+
+class TestHttpEndpoint:
+    """Test the receiver over HTTP with the replay harness."""
+
+    def test_replay_burst(self):
+        """Test that a resend storm is absorbed and deduplicated."""
+        collector = Collector()
+        bodies = [payment_body(f"pay_{i % 1000}") for i in range(2000)]
+
+        async def scenario():
+            receiver = CallbackReceiver(collector, path="/cb", batch_interval=0.01)
+            async with receiver:
+                url = f"http://127.0.0.1:{receiver.port}/cb"
+                statuses = await replay(url, bodies, concurrency=128)
+            return statuses, receiver.stats()
+
+        statuses, stats = asyncio.run(scenario())
+
+        assert statuses == {200: 2000}
+        assert len(collector.events) == 1000
+        assert stats.duplicates == 1000
+        assert stats.batches < 100
+
+    def test_routing_and_limits(self):
+        """Test unknown paths, wrong methods and oversized bodies."""
+
+        async def scenario():
+            receiver = CallbackReceiver(Collector(), path="/cb", max_body_bytes=64)
+            pool = AsyncConnectionPool()
+            async with receiver:
+                base = f"http://127.0.0.1:{receiver.port}"
+                results = [
+                    await pool.send("POST", f"{base}/other", {}, b"{}", 5),
+                    await pool.send("GET", f"{base}/cb", {}, None, 5),
+                    await pool.send("POST", f"{base}/cb", {}, b"x" * 65, 5),
+                    await pool.send("POST", f"{base}/cb", {}, payment_body("p"), 5),
+                ]
+                await pool.aclose()
+            return [response.status for response in results]
+
+        assert asyncio.run(scenario()) == [404, 405, 413, 200]
+
+    def test_oversized_chunked_body_is_rejected_early(self):
+        """Test that a chunked body is refused once it passes the limit."""
+
+        async def scenario():
+            receiver = CallbackReceiver(Collector(), path="/cb", max_body_bytes=64)
+            async with receiver:
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", receiver.port
+                )
+                writer.write(
+                    b"POST /cb HTTP/1.1\r\nHost: x\r\n"
+                    b"Transfer-Encoding: chunked\r\n\r\n"
+                )
+                # Never send the terminating chunk: the answer must not wait for it.
+                for _ in range(4):
+                    writer.write(b"20\r\n" + b"x" * 32 + b"\r\n")
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readline(), 5)
+                writer.close()
+            return status_line
+
+        assert asyncio.run(scenario()).startswith(b"HTTP/1.1 413")
@@ -0,0 +1,297 @@
+"""Tests for the per-route circuit breaker."""
+
+from __future__ import annotations
+
+import io
+import json
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+from delopay import ApiError, CircuitBreaker, CircuitState, DelopayClient
+from delopay.routes import route_template
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict | None = None) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        if self._payload is None:
+            return b""
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def server_error(request):
+    return HTTPError(
+        url=request.full_url,
+        code=503,
+        msg="Service Unavailable",
+        hdrs={},
+        fp=io.BytesIO(b'{"message":"Provider down"}'),
+    )
+
+
+class TestRouteTemplate:
+    """Test mapping of concrete paths to OpenAPI templates."""
+
+    @pytest.mark.parametrize(
+        ("path", "template"),
+        [
+            ("/api/payments/create", "/api/payments/create"),
+            ("/api/payments/pay_1", "/api/payments/{paymentId}"),
+            ("/api/payments/pay_1/capture", "/api/payments/{paymentId}/capture"),
+            ("/api/payments/pay_1/refund", "/api/payments/{paymentId}/refund"),
+            ("/api/payments/by-order/o%2F1", "/api/payments/by-order/{clientOrderId}"),
+            (
+                "/api/providers/stripe/payment-methods",
+                "/api/providers/stripe/payment-methods",
+            ),
+            (
+                "/api/providers/paypal/client-config",
+                "/api/providers/{providerId}/client-config",
+            ),
+        ],
+    )
+    def test_route_template(self, path, template):
+        """Test that IDs are replaced with their path parameter names."""
+        assert route_template(path) == template
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions in the HTTP layer."""
+
+    def make_client(self, breaker: CircuitBreaker) -> DelopayClient:
+        return DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            max_retries=0,
+            circuit_breaker=breaker,
+        )
+
+    def test_opens_after_failure_rate_and_fails_fast(self, monkeypatch):
+        """Test that an open route rejects calls without touching the network."""
+        calls = []
+        transitions = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(request.full_url)
+            raise server_error(request)
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        breaker = CircuitBreaker(
+            minimum_calls=4,
+            window_size=4,
+            on_state_change=lambda *change: transitions.append(change),
+        )
+        client = self.make_client(breaker)
+
+        for _ in range(4):
+            with pytest.raises(ApiError):
+                client.payments.capture("pay_1")
+        with pytest.raises(ApiError) as exc:
+            client.payments.capture("pay_2")
+
+        route = "POST /api/payments/{paymentId}/capture"
+        assert exc.value.code == "CIRCUIT_OPEN"
+        assert len(calls) == 4
+        assert breaker.state(route) is CircuitState.OPEN
+        assert transitions == [(route, CircuitState.CLOSED, CircuitState.OPEN)]
+
+    def test_routes_are_isolated(self, monkeypatch):
+        """Test that one failing route does not open another."""
+
+        def fake_urlopen(request, timeout=0):
+            if request.full_url.endswith("/capture"):
+                raise server_error(request)
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = self.make_client(CircuitBreaker(minimum_calls=2, window_size=2))
+
+        for _ in range(2):
+            with pytest.raises(ApiError):
+                client.payments.capture("pay_1")
+
+        assert client.payments.get("pay_1").payment_id == "pay_1"
+
+    def test_client_errors_do_not_count_as_failures(self, monkeypatch):
+        """Test that 4xx responses keep the circuit closed."""
+
+        def fake_urlopen(request, timeout=0):
+            raise HTTPError(
+                url=request.full_url,
+                code=404,
+                msg="Not Found",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Payment not found"}'),
+            )
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        breaker = CircuitBreaker(minimum_calls=2, window_size=2)
+        client = self.make_client(breaker)
+
+        for _ in range(5):
+            with pytest.raises(ApiError) as exc:
+                client.payments.get("pay_1")
+            assert exc.value.status == 404
+
+        assert breaker.state("GET /api/payments/{paymentId}") is CircuitState.CLOSED
+
+    def test_half_open_probes_close_the_circuit(self, monkeypatch):
+        """Test recovery through half-open after the open period."""
+        clock = FakeClock()
+        healthy = {"value": False}
+
+        def fake_urlopen(request, timeout=0):
+            if not healthy["value"]:
+                raise URLError("connection refused")
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        breaker = CircuitBreaker(
+            minimum_calls=2,
+            window_size=2,
+            open_seconds=10,
+            half_open_calls=2,
+            clock=clock,
+        )
+        client = self.make_client(breaker)
+        route = "GET /api/payments/{paymentId}"
+
+        for _ in range(2):
+            with pytest.raises(ApiError):
+                client.payments.get("pay_1")
+        assert breaker.state(route) is CircuitState.OPEN
+
+        clock.now += 11
+        healthy["value"] = True
+        client.payments.get("pay_1")
+        assert breaker.state(route) is CircuitState.HALF_OPEN
+        client.payments.get("pay_1")
+        assert breaker.state(route) is CircuitState.CLOSED
+
+    def test_failed_probe_reopens(self, monkeypatch):
+        """Test that a failing half-open probe opens the circuit again."""
+        clock = FakeClock()
+
+        def fake_urlopen(request, timeout=0):
+            raise URLError("connection refused")
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        breaker = CircuitBreaker(
+            minimum_calls=1, window_size=1, open_seconds=10, clock=clock
+        )
+        client = self.make_client(breaker)
+
+        with pytest.raises(ApiError):
+            client.payments.get("pay_1")
+        clock.now += 11
+        with pytest.raises(ApiError) as exc:
+            client.payments.get("pay_1")
+
+        assert exc.value.code != "CIRCUIT_OPEN"
+        assert breaker.state("GET /api/payments/{paymentId}") is CircuitState.OPEN
+
+    def test_probe_ending_in_other_exception_is_settled(self, monkeypatch):
+        """Test that a probe failing outside HTTPError/URLError frees its slot."""
+        clock = FakeClock()
+        responses = [None, b"<html>bad gateway</html>", b'{"paymentId":"pay_1"}']
+
+        class RawResponse(FakeResponse):
+            def __init__(self, raw: bytes) -> None:
+                super().__init__(200)
+                self._raw = raw
+
+            def read(self) -> bytes:
+                return self._raw
+
+        def fake_urlopen(request, timeout=0):
+            raw = responses.pop(0)
+            if raw is None:
+                raise server_error(request)
+            return RawResponse(raw)
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        breaker = CircuitBreaker(
+            minimum_calls=1,
+            window_size=1,
+            open_seconds=10,
+            half_open_calls=1,
+            clock=clock,
+        )
+        client = self.make_client(breaker)
+        route = "GET /api/payments/{paymentId}"
+
+        with pytest.raises(ApiError):
+            client.payments.get("pay_1")
+        clock.now += 11
+        with pytest.raises(ValueError):
+            client.payments.get("pay_1")
+        assert breaker.state(route) is CircuitState.OPEN
+
+        clock.now += 11
+        assert client.payments.get("pay_1").payment_id == "pay_1"
+        assert breaker.state(route) is CircuitState.CLOSED
+
+    def test_stale_probes_are_reset_after_half_open_timeout(self):
+        """Test that probes which never report back stop blocking the route."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            minimum_calls=1,
+            window_size=1,
+            open_seconds=10,
+            half_open_calls=1,
+            half_open_timeout=5,
+            clock=clock,
+        )
+        route = "GET /api/payments/{paymentId}"
+        breaker.record(route, failed=True, duration=0)
+
+        clock.now += 11
+        breaker.before_call(route)
+        with pytest.raises(ApiError) as exc:
+            breaker.before_call(route)
+        assert exc.value.code == "CIRCUIT_OPEN"
+
+        clock.now += 5
+        breaker.before_call(route)
+        breaker.record(route, failed=False, duration=0)
+        assert breaker.state(route) is CircuitState.CLOSED
+
+    def test_slow_calls_open_the_circuit(self, monkeypatch):
+        """Test the latency threshold."""
+        clock = FakeClock()
+
+        def fake_urlopen(request, timeout=0):
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        monkeypatch.setattr("delopay.http.time.monotonic", lambda: clock.now)
+        breaker = CircuitBreaker(
+            slow_call_seconds=0, minimum_calls=2, window_size=2, clock=clock
+        )
+        client = self.make_client(breaker)
+
+        client.payments.get("pay_1")
+        client.payments.get("pay_1")
+
+        assert breaker.state("GET /api/payments/{paymentId}") is CircuitState.OPEN
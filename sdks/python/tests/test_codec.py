@@ -0,0 +1,148 @@
+"""Tests for the pluggable JSON codec."""
+
+from __future__ import annotations
+
+import io
+import json
+from urllib.error import HTTPError
+
+import pytest
+
+from delopay import ApiError, DelopayClient, OrjsonCodec, StdlibCodec
+from delopay.codec import default_codec
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, body: bytes) -> None:
+        self.status = status
+        self._body = body
+        self.headers = {}
+
+    def read(self) -> bytes:
+        return self._body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class RecordingCodec(StdlibCodec):
+    def __init__(self) -> None:
+        self.dumped: list = []
+        self.loaded: list = []
+
+    def dumps(self, value):
+        self.dumped.append(value)
+        return super().dumps(value)
+
+    def loads(self, data):
+        self.loaded.append(data)
+        return super().loads(data)
+
+
+class TestCodecs:
+    """Test the bundled codecs."""
+
+    @pytest.mark.parametrize("codec_type", [StdlibCodec, OrjsonCodec])
+    def test_round_trip_bytes(self, codec_type):
+        """Test that codecs encode to and decode from bytes."""
+        if codec_type is OrjsonCodec:
+            pytest.importorskip("orjson")
+        codec = codec_type()
+        value = {"paymentId": "pay_1", "amount": 10.5, "metadata": {"k": "ü"}}
+
+        encoded = codec.dumps(value)
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == value
+        assert codec.loads(encoded) == value
+
+    def test_default_prefers_orjson(self):
+        """Test that orjson is used when it is installed."""
+        pytest.importorskip("orjson")
+
+        assert isinstance(default_codec(), OrjsonCodec)
+
+    def test_default_falls_back_to_stdlib(self, monkeypatch):
+        """Test behaviour without orjson."""
+        monkeypatch.setattr("delopay.codec.orjson", None)
+
+        assert isinstance(default_codec(), StdlibCodec)
+        with pytest.raises(ValueError):
+            OrjsonCodec()
+
+
+class TestClientCodec:
+    """Test that the HTTP client routes all JSON through its codec."""
+
+    def test_request_and_response_use_codec(self, monkeypatch):
+        """Test the success path."""
+        captured = {}
+
+        def fake_urlopen(request, timeout=0):
+            captured["data"] = request.data
+            return FakeResponse(200, b'{"paymentId":"pay_new"}')
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        codec = RecordingCodec()
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", json_codec=codec
+        )
+
+        response = client.payments.create({"clientOrderId": "order_1", "amount": 5})
+
+        assert response.payment_id == "pay_new"
+        assert codec.dumped == [{"clientOrderId": "order_1", "amount": 5}]
+        assert captured["data"] == b'{"clientOrderId":"order_1","amount":5}'
+        assert codec.loaded == [b'{"paymentId":"pay_new"}']
+
+    def test_error_bodies_use_codec(self, monkeypatch):
+        """Test that error bodies are parsed by the same codec."""
+
+        def fake_urlopen(request, timeout=0):
+            raise HTTPError(
+                url=request.full_url,
+                code=422,
+                msg="Unprocessable",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Amount too low","code":"E_AMOUNT"}'),
+            )
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        codec = RecordingCodec()
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", json_codec=codec
+        )
+
+        with pytest.raises(ApiError) as exc:
+            client.payments.capture("pay_1")
+
+        assert exc.value.code == "E_AMOUNT"
+        assert codec.loaded == [b'{"message":"Amount too low","code":"E_AMOUNT"}']
+
+    def test_non_json_error_body_is_kept_as_text(self, monkeypatch):
+        """Test that undecodable error bodies surface as text."""
+
+        def fake_urlopen(request, timeout=0):
+            raise HTTPError(
+                url=request.full_url,
+                code=502,
+                msg="Bad Gateway",
+                hdrs={},
+                fp=io.BytesIO(b"<html>upstream down</html>"),
+            )
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", max_retries=0
+        )
+
+        with pytest.raises(ApiError) as exc:
+            client.payments.get("pay_1")
+
+        assert exc.value.raw == "<html>upstream down</html>"
+        assert exc.value.message == "Bad Gateway"
@@ -0,0 +1,149 @@
+"""Tests for resetting inherited state in forked processes."""
+
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+from http.client import HTTPConnection
+
+import pytest
+
+from delopay import (
+    DelopayClient,
+    HedgePolicy,
+    IdempotencyJournal,
+    PaymentOutbox,
+    RateLimiter,
+    TTLCache,
+)
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+
+
+def in_child(func):
+    """Run ``func`` in a forked child and return its result or exception."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            outcome = ("ok", func())
+        except BaseException as exc:
+            outcome = ("error", repr(exc))
+        with os.fdopen(write_fd, "wb") as pipe:
+            pickle.dump(outcome, pipe)
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as pipe:
+        status, value = pickle.load(pipe)
+    os.waitpid(pid, 0)
+    if status == "error":
+        raise AssertionError(f"child failed: {value}")
+    return value
+
+
+def run_with_timeout(func, timeout: float = 2.0):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result[0] if result else "timed out"
+
+
+@pytest.fixture
+def client():
+    client = DelopayClient(
+        api_key="key",
+        base_url="https://api.test.com",
+        coalesce_requests=True,
+        rate_limiter=RateLimiter(rate=100),
+        hedge_policy=HedgePolicy(delay=1.0),
+        providers_cache=TTLCache(ttl=60),
+    )
+    yield client
+    client.close()
+
+
+class TestAfterFork:
+    """Test that a child never shares sockets, locks or threads."""
+
+    def test_idle_connections_stay_with_the_parent(self, client):
+        """Test that the child drops pooled sockets and the parent keeps them."""
+        pool = client._http._pool
+        pool._release(("https", "api.test.com", 443), HTTPConnection("api.test.com"))
+
+        assert in_child(pool.idle_count) == 0
+        assert pool.idle_count() == 1
+
+    def test_locks_held_at_fork_are_replaced(self, client):
+        """Test that locks held by another parent thread do not deadlock."""
+        bucket = client.rate_limiter._default
+        cache_lock = client.providers.cache._lock
+
+        with bucket._lock, cache_lock:
+
+            def use_locks():
+                client.rate_limiter.acquire("payments")
+                return client.providers.cache.get_or_load(("list",), lambda: "ok")
+
+            assert in_child(lambda: run_with_timeout(use_locks)) == "ok"
+
+    def test_in_flight_work_is_forgotten(self, client):
+        """Test single-flight calls and hedge threads from the parent."""
+        flights = client.single_flight
+        started, release = threading.Event(), threading.Event()
+        leader = threading.Thread(
+            target=flights.do,
+            args=("key", lambda: started.set() or release.wait(5)),
+        )
+        leader.start()
+        started.wait(5)
+        client.hedge_policy.run(lambda: None)
+        slots = client.hedge_policy._hedge_slots
+
+        def check():
+            joined = run_with_timeout(lambda: flights.do("key", lambda: "child"))
+            return joined, client.hedge_policy._hedge_slots is not slots
+
+        try:
+            assert in_child(check) == ("child", True)
+        finally:
+            release.set()
+            leader.join()
+
+    def test_journal_reopens_its_file(self, tmp_path):
+        """Test that a child writes the journal through its own connection."""
+        journal = IdempotencyJournal(tmp_path / "journal.sqlite3")
+
+        def record():
+            key = journal.begin("POST", "/api/payments", {"amount": 1}).key
+            journal.succeed(key, {"paymentId": "pay_1"})
+            return key
+
+        key = in_child(record)
+        assert journal.get(key).state == "succeeded"
+        journal.close()
+
+    def test_outbox_is_closed_in_the_child(self, client, tmp_path):
+        """Test that an inherited outbox refuses work instead of queuing it."""
+
+        def submit():
+            try:
+                outbox.submit({"clientOrderId": "order_1"})
+            except ValueError as exc:
+                return str(exc), outbox.join()
+
+        with PaymentOutbox(client.payments, tmp_path / "outbox.sqlite3") as outbox:
+            assert in_child(submit) == ("outbox is closed", False)
+            assert outbox.pending() == 0
+
+    def test_manual_hook_is_a_no_op_in_the_parent(self, client):
+        """Test that after_fork keeps state in the process that built it."""
+        pool = client._http._pool
+        pool._release(("https", "api.test.com", 443), HTTPConnection("api.test.com"))
+
+        client.after_fork()
+
+        assert pool.idle_count() == 1
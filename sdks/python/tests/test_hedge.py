@@ -0,0 +1,252 @@
+"""Tests for hedged idempotent requests."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+from urllib.error import HTTPError
+
+import pytest
+
+from delopay import ApiError, DelopayClient, HedgePolicy, RateLimiter, RetryBudget
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict | None = None) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        if self._payload is None:
+            return b""
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def make_slow_first_urlopen(calls: list, release: threading.Event, status=200):
+    lock = threading.Lock()
+
+    def fake_urlopen(request, timeout=0):
+        with lock:
+            calls.append(request.full_url)
+            number = len(calls)
+        if number == 1:
+            release.wait(timeout=2)
+            return FakeResponse(200, {"paymentId": "slow"})
+        if status >= 400:
+            raise HTTPError(
+                url=request.full_url,
+                code=status,
+                msg="Service Unavailable",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Provider down"}'),
+            )
+        return FakeResponse(200, {"paymentId": "hedge"})
+
+    return fake_urlopen
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def make_client(policy: HedgePolicy, **kwargs) -> DelopayClient:
+    return DelopayClient(
+        api_key="test_key",
+        base_url="https://api.test.com",
+        max_retries=0,
+        hedge_policy=policy,
+        **kwargs,
+    )
+
+
+class TestHedging:
+    """Test racing of slow GETs."""
+
+    def test_slow_get_is_hedged(self, monkeypatch, release):
+        """Test that the faster hedge response is returned."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_slow_first_urlopen(calls, release)
+        )
+        policy = HedgePolicy(0.01, budget=RetryBudget(1))
+
+        result = make_client(policy).payments.get("pay_1")
+
+        assert result.payment_id == "hedge"
+        assert len(calls) == 2
+        assert policy.stats().hedged == 1
+        assert policy.stats().hedge_wins == 1
+
+    def test_failed_hedge_waits_for_primary(self, monkeypatch, release):
+        """Test that an error from one attempt does not beat a success."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_slow_first_urlopen(calls, release, 503)
+        )
+        policy = HedgePolicy(0.01, budget=RetryBudget(1))
+        threading.Timer(0.05, release.set).start()
+
+        result = make_client(policy).payments.get("pay_1")
+
+        assert result.payment_id == "slow"
+        assert policy.stats().hedge_wins == 0
+
+    def test_fast_get_is_not_hedged(self, monkeypatch):
+        """Test that responses within the delay send a single request."""
+        calls: list = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(request.full_url)
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        policy = HedgePolicy(1.0, budget=RetryBudget(1))
+
+        make_client(policy).payments.get("pay_1")
+
+        assert len(calls) == 1
+        assert policy.stats().hedged == 0
+
+    def test_budget_limits_hedges(self, monkeypatch, release):
+        """Test that no hedge is sent once the budget is spent."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_slow_first_urlopen(calls, release)
+        )
+        policy = HedgePolicy(0.01, budget=RetryBudget(0, min_per_second=0))
+        threading.Timer(0.05, release.set).start()
+
+        result = make_client(policy).payments.get("pay_1")
+
+        assert result.payment_id == "slow"
+        assert len(calls) == 1
+
+    def test_mutations_are_never_hedged(self, monkeypatch, release):
+        """Test that POSTs bypass the hedge policy."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_slow_first_urlopen(calls, release)
+        )
+        policy = HedgePolicy(0.0, budget=RetryBudget(1))
+        release.set()
+
+        make_client(policy).payments.capture("pay_1")
+
+        assert len(calls) == 1
+        assert policy.stats().requests == 0
+
+    def test_hedge_is_dropped_without_a_token(self, monkeypatch, release):
+        """Test that a hedge is not sent when the rate limiter has no token."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_slow_first_urlopen(calls, release)
+        )
+        policy = HedgePolicy(0.01, budget=RetryBudget(1))
+        limiter = RateLimiter(rate=0.01, burst=1)
+        threading.Timer(0.05, release.set).start()
+
+        result = make_client(policy, rate_limiter=limiter).payments.get("pay_1")
+
+        assert result.payment_id == "slow"
+        assert len(calls) == 1
+
+    def test_slow_hedges_beyond_max_workers_are_skipped(self, monkeypatch, release):
+        """Test that a full hedge pool makes a slow request wait, not queue."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_slow_first_urlopen(calls, release)
+        )
+        policy = HedgePolicy(0.01, budget=RetryBudget(1), max_workers=0)
+        threading.Timer(0.05, release.set).start()
+
+        result = make_client(policy).payments.get("pay_1")
+
+        assert result.payment_id == "slow"
+        assert len(calls) == 1
+        assert policy.stats().hedged == 0
+
+    def test_sampling_runs_on_the_callers_thread(self, monkeypatch):
+        """Test that requests are not handed to a pool while sampling."""
+        threads: list = []
+
+        def fake_urlopen(request, timeout=0):
+            threads.append(threading.current_thread())
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        policy = HedgePolicy(max_workers=1)
+
+        make_client(policy).payments.get("pay_1")
+
+        assert threads == [threading.current_thread()]
+        assert policy.stats().requests == 1
+
+    def test_errors_propagate(self, monkeypatch):
+        """Test that a failing un-hedged attempt surfaces as ApiError."""
+
+        def fake_urlopen(request, timeout=0):
+            raise HTTPError(
+                url=request.full_url,
+                code=404,
+                msg="Not Found",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Payment not found"}'),
+            )
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+
+        with pytest.raises(ApiError) as exc:
+            make_client(HedgePolicy(1.0)).payments.get("pay_1")
+
+        assert exc.value.status == 404
+
+
+class TestHedgeDelay:
+    """Test derivation of the hedge delay."""
+
+    def test_delay_follows_observed_percentile(self):
+        """Test that the delay is the configured latency percentile."""
+        policy = HedgePolicy(min_samples=5, window_size=10)
+        assert policy.delay() is None
+
+        for latency in range(1, 11):
+            policy.observe(latency / 100)
+
+        assert policy.delay() == pytest.approx(0.10)
+        assert HedgePolicy(percentile=0.5, min_samples=1).delay() is None
+
+    def test_delay_has_a_floor(self):
+        """Test that tiny observed latencies do not trigger instant hedges."""
+        policy = HedgePolicy(min_delay=0.05, min_samples=1)
+        policy.observe(0.001)
+
+        assert policy.delay() == 0.05
+
+    def test_latency_is_measured_from_the_start_of_the_attempt(self):
+        """Test that time spent before an attempt starts is not sampled."""
+        ticks = iter([10.0, 10.5])
+        policy = HedgePolicy(min_samples=1, clock=lambda: next(ticks))
+
+        policy.run(lambda: "ok")
+
+        assert policy.delay() == pytest.approx(0.5)
+
+    def test_invalid_configuration(self):
+        """Test that nonsensical settings are rejected."""
+        with pytest.raises(ValueError):
+            HedgePolicy(percentile=0)
+        with pytest.raises(ValueError):
+            HedgePolicy(window_size=5, min_samples=10)
@@ -0,0 +1,194 @@
+"""Tests for idempotency keys and the local journal."""
+
+from __future__ import annotations
+
+import io
+import json
+import pickle
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+from delopay import ApiError, DelopayClient, IdempotencyJournal
+
+ORDER = {
+    "clientOrderId": "order_1",
+    "provider": "STRIPE",
+    "amount": 10.0,
+    "currency": "EUR",
+    "successUrl": "https://ok",
+    "cancelUrl": "https://cancel",
+}
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeApi:
+    """Fails the first ``failures`` calls, then answers with a payment."""
+
+    def __init__(self, failures: int = 0, error: Exception | None = None) -> None:
+        self.failures = failures
+        self.error = error
+        self.keys: list[str | None] = []
+
+    def __call__(self, request, timeout=0):
+        self.keys.append(request.get_header("Idempotency-key"))
+        if self.failures > 0:
+            self.failures -= 1
+            raise self.error or URLError("connection reset")
+        return FakeResponse(200, {"paymentId": f"pay_{len(self.keys)}"})
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "idempotency.sqlite3"
+
+
+def make_client(journal=None, max_retries=2) -> DelopayClient:
+    return DelopayClient(
+        api_key="key",
+        base_url="https://api.test.com",
+        max_retries=max_retries,
+        idempotency_journal=journal,
+    )
+
+
+def bad_request() -> HTTPError:
+    return HTTPError(
+        url="https://api.test.com/api/payments/pay_1/capture",
+        code=400,
+        msg="Bad Request",
+        hdrs={},
+        fp=io.BytesIO(b'{"message":"Invalid amount"}'),
+    )
+
+
+class TestJournaledRequests:
+    """Test keys, retries and recorded outcomes."""
+
+    def test_posts_are_retried_with_one_key(self, monkeypatch, path):
+        """Test that a network error is retried under the same key."""
+        api = FakeApi(failures=1)
+        monkeypatch.setattr("delopay.http.urlopen", api)
+        journal = IdempotencyJournal(path)
+
+        payment = make_client(journal).payments.create(ORDER)
+
+        assert payment.payment_id == "pay_2"
+        assert api.keys[0] is not None
+        assert api.keys[0] == api.keys[1]
+        assert journal.get(api.keys[0]).state == "succeeded"
+        assert journal.pending() == []
+
+    def test_ambiguous_failures_reuse_the_key_after_restart(self, monkeypatch, path):
+        """Test that a pending key is picked up by a new process."""
+        api = FakeApi(failures=1)
+        monkeypatch.setattr("delopay.http.urlopen", api)
+
+        with pytest.raises(ApiError):
+            make_client(IdempotencyJournal(path), max_retries=0).payments.create(ORDER)
+        [pending] = IdempotencyJournal(path).pending()
+        make_client(IdempotencyJournal(path)).payments.create(ORDER)
+        make_client(IdempotencyJournal(path)).payments.create(ORDER)
+
+        assert api.keys[0] == pending.key == api.keys[1]
+        assert api.keys[2] != pending.key
+        assert IdempotencyJournal(path).pending() == []
+
+    def test_client_errors_finish_the_key(self, monkeypatch, path):
+        """Test that a 4xx is final and the next attempt gets a new key."""
+        api = FakeApi(failures=1, error=bad_request())
+        monkeypatch.setattr("delopay.http.urlopen", api)
+        client = make_client(IdempotencyJournal(path))
+
+        with pytest.raises(ApiError):
+            client.payments.capture("pay_1")
+        client.payments.capture("pay_1")
+
+        failed = client.idempotency_journal.get(api.keys[0])
+        assert (failed.state, failed.status) == ("failed", 400)
+        assert api.keys[1] != api.keys[0]
+
+    def test_explicit_key_replays_outcome(self, monkeypatch, path):
+        """Test that a finished key is answered from the journal."""
+        api = FakeApi()
+        monkeypatch.setattr("delopay.http.urlopen", api)
+        client = make_client(IdempotencyJournal(path))
+
+        first = client.payments.refund("pay_1", {"amount": 5}, idempotency_key="r1")
+        second = client.payments.refund("pay_1", {"amount": 5}, idempotency_key="r1")
+
+        assert api.keys == ["r1"]
+        assert second == first
+        with pytest.raises(ValueError):
+            client.payments.refund("pay_1", {"amount": 6}, idempotency_key="r1")
+
+    def test_explicit_key_without_journal(self, monkeypatch):
+        """Test that a caller-supplied key alone makes a POST retryable."""
+        api = FakeApi(failures=1)
+        monkeypatch.setattr("delopay.http.urlopen", api)
+
+        make_client().payments.create(ORDER, idempotency_key="order_1")
+
+        assert api.keys == ["order_1", "order_1"]
+
+    def test_gets_carry_no_key(self, monkeypatch, path):
+        """Test that reads bypass the journal."""
+        api = FakeApi()
+        monkeypatch.setattr("delopay.http.urlopen", api)
+        journal = IdempotencyJournal(path)
+
+        make_client(journal).payments.get("pay_1")
+
+        assert api.keys == [None]
+        assert journal.pending() == []
+
+
+class TestJournal:
+    """Test the journal itself."""
+
+    def test_pickle_reopens_the_file(self, tmp_path):
+        """Test that a journal sent to another process shares its records."""
+        journal = IdempotencyJournal(tmp_path / "journal.sqlite3", max_age=60)
+        record = journal.begin("POST", "/api/payments/create", ORDER)
+
+        restored = pickle.loads(pickle.dumps(journal))
+
+        assert restored.pending() == [record]
+        assert restored._max_age == 60
+
+    def test_prune_keeps_pending_records(self, path):
+        """Test that only finished records are pruned."""
+        journal = IdempotencyJournal(path)
+        done = journal.begin("POST", "/a")
+        journal.begin("POST", "/b")
+        journal.succeed(done.key, {"ok": True})
+
+        assert journal.prune(max_age=-1) == 1
+        assert [record.path for record in journal.pending()] == ["/b"]
+
+    def test_in_memory_journal_needs_opt_in(self):
+        """Test that a journal lost on exit is only built when asked for."""
+        with pytest.raises(ValueError):
+            IdempotencyJournal(":memory:")
+
+        journal = IdempotencyJournal(":memory:", durable=False)
+        journal.begin("POST", "/api/payments/create", ORDER)
+
+        assert len(journal.pending()) == 1
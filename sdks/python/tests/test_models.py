@@ -0,0 +1,180 @@
+"""Tests for the generated models."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from delopay import (
+    CreatePaymentRequest,
+    LazyPaymentResponse,
+    PaymentMethodsResponse,
+    PaymentProviderType,
+    PaymentResponse,
+    PaymentStatus,
+    RefundPaymentRequest,
+    UpdatePaymentRequest,
+)
+from delopay.polling import FINAL_STATUSES
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "generate_models.py"
+
+
+def load_generator():
+    spec = importlib.util.spec_from_file_location("generate_models", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestSpecParity:
+    """Test that the committed models match the OpenAPI spec."""
+
+    def test_models_are_up_to_date(self):
+        """Test that regenerating from the spec changes nothing."""
+        generator = load_generator()
+
+        assert generator.main(["--check"]) == 0
+
+    def test_enums_match_spec(self):
+        """Test that enum members are exactly the spec values."""
+        generator = load_generator()
+        schemas = json.loads(generator.SPEC.read_text())["components"]["schemas"]
+
+        assert [m.value for m in PaymentStatus] == schemas["PaymentStatus"]["enum"]
+        assert [m.value for m in PaymentProviderType] == (
+            schemas["PaymentProviderType"]["enum"]
+        )
+
+
+class TestEncoders:
+    """Test request payload encoding."""
+
+    def test_unset_fields_are_omitted(self):
+        """Test camelCase keys and omission of None values."""
+        request = CreatePaymentRequest(
+            client_order_id="order_1",
+            provider=PaymentProviderType.STRIPE,
+            amount=10.0,
+            currency="EUR",
+            success_url="https://shop.test/ok",
+            cancel_url="https://shop.test/cancel",
+            auto_capture=False,
+        )
+
+        payload = request.to_payload()
+
+        assert payload == {
+            "clientOrderId": "order_1",
+            "provider": "STRIPE",
+            "amount": 10.0,
+            "currency": "EUR",
+            "successUrl": "https://shop.test/ok",
+            "cancelUrl": "https://shop.test/cancel",
+            "autoCapture": False,
+        }
+        assert json.dumps(payload["provider"]) == '"STRIPE"'
+
+    def test_optional_only_requests(self):
+        """Test requests without required fields."""
+        assert RefundPaymentRequest().to_payload() == {}
+        assert RefundPaymentRequest(amount=5.0).to_payload() == {"amount": 5.0}
+        assert UpdatePaymentRequest(
+            amount_paid=3.0, status="COMPLETED"
+        ).to_payload() == {"amountPaid": 3.0, "status": "COMPLETED"}
+
+
+class TestDecoders:
+    """Test response decoding."""
+
+    def test_enums_are_mapped_to_members(self):
+        """Test that known enum values decode to members."""
+        payment = PaymentResponse.from_dict(
+            {"paymentId": "pay_1", "provider": "PAYPAL", "status": "COMPLETED"}
+        )
+
+        assert payment.provider is PaymentProviderType.PAYPAL
+        assert payment.status is PaymentStatus.COMPLETED
+        assert payment.status == "COMPLETED"
+        assert payment.status in FINAL_STATUSES
+        assert payment.metadata == {}
+
+    def test_unknown_enum_values_are_kept(self):
+        """Test forward compatibility with statuses added server-side."""
+        payment = PaymentResponse.from_dict({"status": "ON_HOLD", "provider": None})
+
+        assert payment.status == "ON_HOLD"
+        assert not isinstance(payment.status, PaymentStatus)
+        assert payment.provider is None
+
+    def test_nested_models_and_defaults(self):
+        """Test nested arrays and response defaults."""
+        response = PaymentMethodsResponse.from_dict(
+            {"currency": "EUR", "paymentMethods": [{"type": "card", "name": "Card"}]}
+        )
+        empty = PaymentMethodsResponse.from_dict({})
+
+        assert response.payment_methods[0].type == "card"
+        assert response.success is False
+        assert empty.payment_methods == []
+
+
+class TestLazyModels:
+    """Test the read-through lazy response models."""
+
+    RAW = {
+        "paymentId": "pay_1",
+        "provider": "STRIPE",
+        "status": "PENDING",
+        "amount": 12.5,
+        "metadata": {"cart": "c_1"},
+    }
+
+    def test_same_attributes_as_eager(self):
+        """Test that every field reads the same as the eager model."""
+        lazy = LazyPaymentResponse(dict(self.RAW))
+        eager = PaymentResponse.from_dict(self.RAW)
+
+        assert isinstance(lazy, PaymentResponse)
+        assert lazy.status is PaymentStatus.PENDING
+        assert lazy.materialize() == eager
+        for name in PaymentResponse.__dataclass_fields__:
+            assert getattr(lazy, name) == getattr(eager, name)
+
+    def test_wraps_undecoded_bytes(self):
+        """Test that bytes are only parsed on first access."""
+        lazy = LazyPaymentResponse(json.dumps(self.RAW).encode("utf-8"))
+
+        assert lazy._data
+        assert lazy.amount == 12.5
+        assert not hasattr(lazy, "_data")
+
+    def test_invalid_bytes_raise_on_access(self):
+        """Test that a non-object body fails when a field is read."""
+        lazy = LazyPaymentResponse(b"[1, 2]")
+
+        with pytest.raises(ValueError):
+            assert lazy.status
+
+    def test_writes_and_defaults(self):
+        """Test that assignments and in-place edits persist."""
+        lazy = LazyPaymentResponse({})
+
+        lazy.metadata["note"] = "x"
+        lazy.status = PaymentStatus.COMPLETED
+
+        assert lazy.metadata == {"note": "x"}
+        assert lazy.status is PaymentStatus.COMPLETED
+        assert lazy.materialize().metadata == {"note": "x"}
+
+    def test_pickle_round_trip(self):
+        """Test that lazy models can be sent between processes."""
+        lazy = LazyPaymentResponse(json.dumps(self.RAW).encode("utf-8"))
+
+        restored = pickle.loads(pickle.dumps(lazy))
+
+        assert restored.materialize() == lazy.materialize()
@@ -0,0 +1,220 @@
+"""Tests for the durable payment outbox."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+from delopay import ApiError, DelopayClient, PaymentOutbox, PaymentResponse
+
+
+def order(client_order_id: str, amount: float = 10.0) -> dict:
+    return {
+        "clientOrderId": client_order_id,
+        "provider": "STRIPE",
+        "amount": amount,
+        "currency": "EUR",
+        "successUrl": "https://ok",
+        "cancelUrl": "https://cancel",
+    }
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeApi:
+    """Answers creates, failing with queued errors first."""
+
+    def __init__(self, *errors: int) -> None:
+        self.errors = list(errors)
+        self.calls: list[tuple[str, str, str | None]] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, request, timeout=0):
+        with self.lock:
+            self.calls.append(
+                (
+                    request.get_method(),
+                    request.full_url,
+                    request.get_header("Idempotency-key"),
+                )
+            )
+            error = self.errors.pop(0) if self.errors else None
+        if error == 0:
+            raise URLError("connection reset")
+        if error is not None:
+            raise HTTPError(
+                url=request.full_url,
+                code=error,
+                msg="Error",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Rejected","code":"E_REJECTED"}'),
+            )
+        if request.get_method() == "GET":
+            client_order_id = request.full_url.rsplit("/", 1)[1]
+        else:
+            client_order_id = json.loads(request.data)["clientOrderId"]
+        return FakeResponse(
+            200,
+            {
+                "paymentId": f"pay_{client_order_id}",
+                "clientOrderId": client_order_id,
+                "status": "PENDING",
+                "metadata": {"source": "outbox"},
+            },
+        )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr("delopay.outbox.BACKOFF_BASE_SECONDS", 0.0)
+    return DelopayClient(api_key="key", base_url="https://api.test.com", max_retries=0)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "outbox.sqlite3"
+
+
+class TestDelivery:
+    """Test sending, retries and recorded outcomes."""
+
+    def test_submit_returns_before_sending(self, client, monkeypatch, path):
+        """Test acknowledgement, delivery and the result callback."""
+        api = FakeApi()
+        monkeypatch.setattr("delopay.http.urlopen", api)
+        results = []
+
+        with PaymentOutbox(
+            client.payments, path, on_result=lambda *result: results.append(result)
+        ) as outbox:
+            assert outbox.submit(order("order_1")) == "order_1"
+            assert outbox.join(timeout=5)
+            entry = outbox.get("order_1")
+
+        assert entry.state == "succeeded"
+        assert entry.payment == PaymentResponse.from_dict(
+            {
+                "paymentId": "pay_order_1",
+                "clientOrderId": "order_1",
+                "status": "PENDING",
+                "metadata": {"source": "outbox"},
+            }
+        )
+        assert results == [("order_1", entry.payment)]
+        assert api.calls[0][2] == "outbox-order_1"
+
+    def test_transient_errors_are_retried(self, client, monkeypatch, path):
+        """Test backoff retries for network errors, 5xx and 429."""
+        monkeypatch.setattr("delopay.http.urlopen", FakeApi(0, 503, 429))
+
+        with PaymentOutbox(client.payments, path, workers=2) as outbox:
+            outbox.submit(order("order_1"))
+            assert outbox.join(timeout=5)
+            entry = outbox.get("order_1")
+            stats = outbox.stats()
+
+        assert (entry.state, entry.attempts) == ("succeeded", 4)
+        assert (stats.retries, stats.succeeded) == (3, 1)
+
+    def test_rejections_and_exhausted_attempts_fail(self, client, monkeypatch, path):
+        """Test that a 4xx fails at once and retries stop at max_attempts."""
+        monkeypatch.setattr("delopay.http.urlopen", FakeApi(400, 0, 0))
+        results = {}
+
+        with PaymentOutbox(
+            client.payments,
+            path,
+            workers=1,
+            max_attempts=2,
+            on_result=results.__setitem__,
+        ) as outbox:
+            outbox.submit_many([order("order_1"), order("order_2")])
+            assert outbox.join(timeout=5)
+            rejected = outbox.get("order_1")
+            exhausted = outbox.get("order_2")
+
+        assert rejected.error.status == 400
+        assert rejected.error.code == "E_REJECTED"
+        assert (exhausted.state, exhausted.attempts) == ("failed", 2)
+        assert isinstance(results["order_2"], ApiError)
+
+    def test_conflict_is_resolved_by_lookup(self, client, monkeypatch, path):
+        """Test that a 409 is settled with get_by_order."""
+        api = FakeApi(409)
+        monkeypatch.setattr("delopay.http.urlopen", api)
+
+        with PaymentOutbox(client.payments, path) as outbox:
+            outbox.submit(order("order_1"))
+            assert outbox.join(timeout=5)
+            entry = outbox.get("order_1")
+
+        assert entry.payment.payment_id == "pay_order_1"
+        assert api.calls[1][:2] == (
+            "GET",
+            "https://api.test.com/api/payments/by-order/order_1",
+        )
+
+
+class TestDurability:
+    """Test persistence across restarts and resubmission."""
+
+    def test_pending_orders_survive_restart(self, client, monkeypatch, path):
+        """Test that orders queued while the API is down are sent on reopen."""
+        monkeypatch.setattr("delopay.outbox.BACKOFF_BASE_SECONDS", 60.0)
+        monkeypatch.setattr("delopay.http.urlopen", FakeApi(0, 0))
+
+        with PaymentOutbox(client.payments, path) as outbox:
+            outbox.submit_many([order("order_1"), order("order_2")])
+            assert not outbox.join(timeout=0.2)
+        assert not outbox.join()
+        monkeypatch.setattr("delopay.outbox.BACKOFF_BASE_SECONDS", 0.0)
+        with PaymentOutbox(client.payments, path, clock=lambda: 1e12) as outbox:
+            assert outbox.join(timeout=5)
+            assert outbox.get("order_2").state == "succeeded"
+        assert outbox.join()
+
+    def test_resubmission(self, client, monkeypatch, path):
+        """Test that identical resubmits are ignored and conflicting ones fail."""
+        monkeypatch.setattr("delopay.http.urlopen", FakeApi())
+
+        with PaymentOutbox(client.payments, path) as outbox:
+            outbox.submit(order("order_1"))
+            outbox.submit(order("order_1"))
+            with pytest.raises(ValueError):
+                outbox.submit_many([order("order_2"), order("order_1", 99.0)])
+            assert outbox.join(timeout=5)
+
+            assert outbox.get("order_2") is None
+            assert outbox.stats().submitted == 1
+            with pytest.raises(ValueError):
+                outbox.submit({"amount": 1.0})
+
+    def test_in_memory_outbox_needs_opt_in(self, client, monkeypatch):
+        """Test that a queue lost on exit is only built when asked for."""
+        monkeypatch.setattr("delopay.http.urlopen", FakeApi())
+
+        with pytest.raises(ValueError):
+            PaymentOutbox(client.payments, ":memory:")
+        with PaymentOutbox(client.payments, ":memory:", durable=False) as outbox:
+            outbox.submit(order("order_1"))
+            assert outbox.join(timeout=5)
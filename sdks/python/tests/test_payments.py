@@ -12,6 +12,8 @@ from delopay import (
     ApiError,
     CreatePaymentRequest,
     DelopayClient,
+    LazyPaymentResponse,
+    LazyRefundResponse,
     RefundPaymentRequest,
     UpdatePaymentRequest,
 )
@@ -506,3 +508,34 @@ class TestPaymentsResendCallbacks:
         result = client.payments.resend_failed_callbacks()
 
         assert result.resent == 0
+
+
+class TestLazyModels:
+    """Test the opt-in lazy response models."""
+
+    def test_lazy_payment_and_refund(self, monkeypatch):
+        """Test that responses wrap the parsed body when lazy_models is set."""
+        responses = iter(
+            [
+                create_payment_response("pay_1", status="COMPLETED"),
+                {"refundId": "ref_1", "paymentId": "pay_1", "amount": 5.0},
+            ]
+        )
+
+        def fake_urlopen(request, timeout=0):
+            return FakeResponse(200, next(responses))
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", lazy_models=True
+        )
+
+        payment = client.payments.get("pay_1")
+        refund = client.payments.refund("pay_1", RefundPaymentRequest(amount=5.0))
+
+        assert isinstance(payment, LazyPaymentResponse)
+        assert payment.status == "COMPLETED"
+        assert payment.metadata == {"orderId": "internal_123"}
+        assert payment.materialize().payment_id == "pay_1"
+        assert isinstance(refund, LazyRefundResponse)
+        assert refund.amount == 5.0
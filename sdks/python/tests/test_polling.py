@@ -0,0 +1,280 @@
+"""Tests for payment status polling."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+from datetime import datetime, timezone
+from urllib.error import HTTPError
+
+import pytest
+
+from delopay import ApiError, DelopayClient, PaymentResponse, PollSchedule
+
+FAST = PollSchedule(min_interval=0, max_interval=0)
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict | None = None) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        if self._payload is None:
+            return b""
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def make_status_urlopen(sequences: dict[str, list], calls: list):
+    """Serve each payment's statuses in turn, repeating the last one."""
+    lock = threading.Lock()
+
+    def fake_urlopen(request, timeout=0):
+        payment_id = request.full_url.rsplit("/", 1)[-1]
+        with lock:
+            calls.append(payment_id)
+            steps = sequences[payment_id]
+            step = steps.pop(0) if len(steps) > 1 else steps[0]
+        if isinstance(step, int):
+            raise HTTPError(
+                url=request.full_url,
+                code=step,
+                msg="Error",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Payment lookup failed"}'),
+            )
+        return FakeResponse(200, {"paymentId": payment_id, "status": step})
+
+    return fake_urlopen
+
+
+def make_client() -> DelopayClient:
+    return DelopayClient(
+        api_key="test_key", base_url="https://api.test.com", max_retries=0
+    )
+
+
+def iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class TestWaitForStatus:
+    """Test waiting for a single payment."""
+
+    def test_returns_when_target_reached(self, monkeypatch):
+        """Test that polling stops at the requested status."""
+        calls: list = []
+        sequences = {"pay_1": ["PENDING", "PROCESSING", "NEEDS_CAPTURING"]}
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen(sequences, calls)
+        )
+
+        payment = make_client().payments.wait_for_status(
+            "pay_1", "NEEDS_CAPTURING", timeout=5, schedule=FAST
+        )
+
+        assert payment.status == "NEEDS_CAPTURING"
+        assert len(calls) == 3
+
+    def test_raises_when_target_is_unreachable(self, monkeypatch):
+        """Test that a payment that can no longer reach the target ends the wait."""
+        calls: list = []
+        sequences = {"pay_1": ["PENDING", "FAILED"]}
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen(sequences, calls)
+        )
+
+        with pytest.raises(ApiError) as exc:
+            make_client().payments.wait_for_status(
+                "pay_1", ["COMPLETED"], timeout=5, schedule=FAST
+            )
+
+        assert exc.value.code == "STATUS_UNREACHABLE"
+        assert exc.value.raw.status == "FAILED"
+        assert len(calls) == 2
+
+    def test_waits_past_completed_for_a_refund(self, monkeypatch):
+        """Test that COMPLETED does not end a wait for REFUNDED."""
+        calls: list = []
+        sequences = {"pay_1": ["COMPLETED", "PARTIALLY_REFUNDED", "REFUNDED"]}
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen(sequences, calls)
+        )
+
+        payment = make_client().payments.wait_for_status(
+            "pay_1", "REFUNDED", timeout=5, schedule=FAST
+        )
+
+        assert payment.status == "REFUNDED"
+        assert len(calls) == 3
+
+    def test_transient_errors_keep_polling(self, monkeypatch):
+        """Test that 5xx and 429 responses do not abort the wait."""
+        calls: list = []
+        sequences = {"pay_1": [503, 429, "COMPLETED"]}
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen(sequences, calls)
+        )
+
+        payment = make_client().payments.wait_for_status(
+            "pay_1", "COMPLETED", timeout=5, schedule=FAST
+        )
+
+        assert payment.status == "COMPLETED"
+        assert len(calls) == 3
+
+    def test_client_errors_are_raised(self, monkeypatch):
+        """Test that a 404 ends the wait immediately."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen({"pay_1": [404]}, calls)
+        )
+
+        with pytest.raises(ApiError) as exc:
+            make_client().payments.wait_for_status(
+                "pay_1", "COMPLETED", timeout=5, schedule=FAST
+            )
+
+        assert exc.value.status == 404
+
+    def test_timeout(self, monkeypatch):
+        """Test that waiting gives up once the next poll would be too late."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen({"pay_1": ["PENDING"]}, calls)
+        )
+        schedule = PollSchedule(min_interval=0.01, max_interval=0.01)
+
+        with pytest.raises(ApiError) as exc:
+            make_client().payments.wait_for_status(
+                "pay_1", "COMPLETED", timeout=0.05, schedule=schedule
+            )
+
+        assert exc.value.code == "WAIT_TIMEOUT"
+        assert exc.value.raw.status == "PENDING"
+        assert 1 < len(calls) <= 6
+
+
+class TestPollSchedule:
+    """Test age-based poll intervals."""
+
+    def test_delay_grows_with_age(self):
+        """Test that older payments are polled less often."""
+        schedule = PollSchedule(min_interval=1, max_interval=60, age_factor=0.1)
+        now = 1_000_000.0
+
+        def delay(age: float) -> float:
+            payment = PaymentResponse(created_at=iso(now - age))
+            return schedule.next_delay(payment, now=now, first_seen=now)
+
+        assert delay(0) == 1
+        assert delay(100) == pytest.approx(10)
+        assert delay(10_000) == 60
+
+    def test_delay_falls_back_to_first_seen(self):
+        """Test payments without a creation time."""
+        schedule = PollSchedule(min_interval=1, max_interval=60, age_factor=0.1)
+
+        assert schedule.next_delay(None, now=300, first_seen=0) == pytest.approx(30)
+
+    def test_delay_respects_expiry(self):
+        """Test that the next poll is not scheduled long after expires_at."""
+        schedule = PollSchedule(min_interval=1, max_interval=60, age_factor=0.1)
+        now = 1_000_000.0
+        payment = PaymentResponse(created_at=iso(now - 3600), expires_at=iso(now + 5))
+        delay = schedule.next_delay(payment, now=now, first_seen=now)
+
+        assert delay == pytest.approx(7)
+
+
+class TestWatch:
+    """Test multiplexed polling of many payments."""
+
+    def test_yields_transitions_until_final(self, monkeypatch):
+        """Test that each status change is reported once per payment."""
+        calls: list = []
+        sequences = {
+            "pay_1": ["PENDING", "PENDING", "COMPLETED"],
+            "pay_2": ["PENDING", "FAILED"],
+            "pay_3": ["CANCELLED"],
+        }
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen(sequences, calls)
+        )
+
+        events = list(
+            make_client().payments.watch(
+                ["pay_1", "pay_2", "pay_3"], schedule=FAST, max_workers=2
+            )
+        )
+        transitions = {
+            (event.payment_id, event.previous, event.status) for event in events
+        }
+
+        assert transitions == {
+            ("pay_1", None, "PENDING"),
+            ("pay_1", "PENDING", "COMPLETED"),
+            ("pay_2", None, "PENDING"),
+            ("pay_2", "PENDING", "FAILED"),
+            ("pay_3", None, "CANCELLED"),
+        }
+        assert len(events) == 5
+        assert calls.count("pay_1") == 3
+        assert calls.count("pay_3") == 1
+
+    def test_custom_until(self, monkeypatch):
+        """Test stopping at a caller-chosen status."""
+        calls: list = []
+        sequences = {"pay_1": ["PENDING", "NEEDS_CAPTURING", "COMPLETED"]}
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen(sequences, calls)
+        )
+
+        events = list(
+            make_client().payments.watch(
+                ["pay_1"], until={"NEEDS_CAPTURING"}, schedule=FAST
+            )
+        )
+
+        assert [event.status for event in events] == ["PENDING", "NEEDS_CAPTURING"]
+
+    def test_errors(self, monkeypatch):
+        """Test that transient errors are retried and client errors reported."""
+        calls: list = []
+        sequences = {"pay_1": [503, "COMPLETED"], "missing": [404]}
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen(sequences, calls)
+        )
+
+        events = list(make_client().payments.watch(["pay_1", "missing"], schedule=FAST))
+        by_id = {event.payment_id: event for event in events}
+
+        assert by_id["pay_1"].status == "COMPLETED"
+        assert by_id["missing"].error.status == 404
+        assert by_id["missing"].payment is None
+        assert len(events) == 2
+
+    def test_timeout_stops_watching(self, monkeypatch):
+        """Test that the watch ends after the timeout."""
+        calls: list = []
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_status_urlopen({"pay_1": ["PENDING"]}, calls)
+        )
+        schedule = PollSchedule(min_interval=0.01, max_interval=0.01)
+
+        events = list(
+            make_client().payments.watch(["pay_1"], schedule=schedule, timeout=0.05)
+        )
+
+        assert [event.status for event in events] == ["PENDING"]
+        assert len(calls) > 1
@@ -0,0 +1,193 @@
+"""Tests for the keep-alive connection pool."""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from delopay import ApiError, DelopayClient
+from delopay.pool import ConnectionPool
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        self.server.paths.append(self.path)
+        if self.path.endswith("/missing"):
+            self._send(404, {"message": "Not found", "code": "E_NOT_FOUND"})
+            return
+        self._send(200, {"paymentId": self.path.rsplit("/", 1)[-1]})
+
+    def do_POST(self):
+        # Take the request, then drop the connection without answering.
+        self.server.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.posts.append(self.headers.get("Idempotency-Key"))
+        self.close_connection = True
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    httpd.connections = set()
+    httpd.posts = []
+    httpd.paths = []
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def base_url(httpd) -> str:
+    host, port = httpd.server_address
+    return f"http://{host}:{port}"
+
+
+@pytest.fixture
+def proxy_env(monkeypatch):
+    """Clear proxy settings and return a setter for new ones."""
+    for name in ("http_proxy", "https_proxy", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.upper(), raising=False)
+    return monkeypatch.setenv
+
+
+class TestConnectionPool:
+    """Test connection reuse and lifecycle."""
+
+    def test_sequential_requests_reuse_one_connection(self, server):
+        """Test that keep-alive requests share a single TCP connection."""
+        with DelopayClient(api_key="key", base_url=base_url(server)) as client:
+            for index in range(5):
+                assert client.payments.get(f"pay_{index}").payment_id == f"pay_{index}"
+
+        assert len(server.connections) == 1
+
+    def test_error_responses_keep_connection(self, server):
+        """Test that 4xx responses map to ApiError and leave the socket pooled."""
+        client = DelopayClient(api_key="key", base_url=base_url(server))
+
+        with pytest.raises(ApiError) as exc:
+            client.payments.get("missing")
+        client.payments.get("pay_1")
+
+        assert exc.value.status == 404
+        assert exc.value.code == "E_NOT_FOUND"
+        assert len(server.connections) == 1
+        client.close()
+
+    def test_reconnects_after_server_closes_idle_socket(self, server):
+        """Test that a connection dropped while idle is replaced transparently."""
+        pool = ConnectionPool()
+        client = DelopayClient(api_key="key", base_url=base_url(server))
+        client._http._pool = pool
+
+        client.payments.get("pay_1")
+        for conn, _ in next(iter(pool._idle.values())):
+            conn.sock.close()
+        client.payments.get("pay_2")
+
+        assert len(server.connections) == 2
+        assert pool.idle_count() == 1
+
+    def test_unanswered_mutation_on_reused_socket_is_not_resent(self, server):
+        """Test that a POST the server may have applied is not sent twice."""
+        client = DelopayClient(api_key="key", base_url=base_url(server))
+
+        client.payments.get("pay_1")
+        with pytest.raises(ApiError) as exc:
+            client.payments.capture("pay_1")
+
+        assert exc.value.status == 0
+        assert server.posts == [None]
+        client.close()
+
+    def test_keyed_mutation_on_reused_socket_is_resent(self, server):
+        """Test that a POST with an Idempotency-Key reconnects once."""
+        pool = ConnectionPool()
+        client = DelopayClient(api_key="key", base_url=base_url(server), max_retries=0)
+        client._http._pool = pool
+
+        client.payments.get("pay_1")
+        with pytest.raises(ApiError):
+            client._http.request(
+                "POST", "/api/payments/pay_1/capture", idempotency_key="k1"
+            )
+
+        assert server.posts == ["k1", "k1"]
+        client.close()
+
+    def test_idle_timeout_evicts_connections(self, server):
+        """Test that connections idle past the timeout are not reused."""
+        client = DelopayClient(
+            api_key="key", base_url=base_url(server), pool_idle_timeout_ms=0
+        )
+
+        client.payments.get("pay_1")
+        client.payments.get("pay_2")
+
+        assert len(server.connections) == 2
+
+    def test_close_drops_idle_connections(self, server):
+        """Test that closing the client releases pooled sockets."""
+        client = DelopayClient(api_key="key", base_url=base_url(server))
+        client.payments.get("pay_1")
+        pool = client._http._pool
+
+        assert pool.idle_count() == 1
+        client.close()
+        assert pool.idle_count() == 0
+
+    def test_pool_can_be_disabled(self, server):
+        """Test that pool_maxsize=0 falls back to one connection per request."""
+        client = DelopayClient(api_key="key", base_url=base_url(server), pool_maxsize=0)
+
+        client.payments.get("pay_1")
+        client.payments.get("pay_2")
+
+        assert client._http._pool is None
+        assert len(server.connections) == 2
+
+
+class TestProxies:
+    """Test that proxy settings from the environment are honoured."""
+
+    def test_proxied_origin_goes_through_the_proxy(self, server, proxy_env):
+        """Test that HTTP_PROXY routes requests via the proxy, unpooled."""
+        proxy_env("HTTP_PROXY", base_url(server))
+
+        with DelopayClient(api_key="key", base_url="http://api.test.invalid") as client:
+            assert client.payments.get("pay_1").payment_id == "pay_1"
+            assert client._http._pool.idle_count() == 0
+
+        assert server.paths == ["http://api.test.invalid/api/payments/pay_1"]
+
+    def test_no_proxy_keeps_the_pool(self, server, proxy_env):
+        """Test that an origin listed in NO_PROXY is still pooled."""
+        proxy_env("HTTP_PROXY", "http://127.0.0.1:9")
+        proxy_env("NO_PROXY", "127.0.0.1")
+
+        with DelopayClient(api_key="key", base_url=base_url(server)) as client:
+            client.payments.get("pay_1")
+            client.payments.get("pay_2")
+
+        assert len(server.connections) == 1
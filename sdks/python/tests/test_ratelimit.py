@@ -0,0 +1,255 @@
+"""Tests for the client-side rate limiter."""
+
+from __future__ import annotations
+
+import io
+import json
+from urllib.error import HTTPError
+
+import pytest
+
+from delopay import (
+    ApiError,
+    DelopayClient,
+    RateLimiter,
+    SharedTokenBucket,
+    TokenBucket,
+)
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(
+        self, status: int, payload: dict | None = None, headers: dict | None = None
+    ) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = headers or {}
+
+    def read(self) -> bytes:
+        if self._payload is None:
+            return b""
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def throttled(request, retry_after: str | None = "2"):
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return HTTPError(
+        url=request.full_url,
+        code=429,
+        msg="Too Many Requests",
+        hdrs=headers,
+        fp=io.BytesIO(b'{"message":"Rate limited","code":"E_RATE_LIMIT"}'),
+    )
+
+
+class TestTokenBucket:
+    """Test the token bucket primitive."""
+
+    def test_burst_then_steady_rate(self):
+        """Test that a full bucket allows a burst and then paces acquirers."""
+        fake = FakeTime()
+        bucket = TokenBucket(10, burst=2, clock=fake.clock, sleep=fake.sleep)
+
+        for _ in range(4):
+            bucket.acquire()
+
+        assert fake.now == pytest.approx(0.2)
+
+    def test_throttle_and_recover(self):
+        """Test multiplicative decrease and additive recovery."""
+        bucket = TokenBucket(100)
+
+        bucket.throttle()
+        assert bucket.rate == 50
+        for _ in range(10):
+            bucket.recover()
+        assert bucket.rate == pytest.approx(60)
+
+    def test_pause_blocks_until_elapsed(self):
+        """Test that pause delays the next acquire."""
+        fake = FakeTime()
+        bucket = TokenBucket(100, clock=fake.clock, sleep=fake.sleep)
+
+        bucket.pause(3)
+        bucket.acquire()
+
+        assert fake.now >= 3
+
+    def test_shared_bucket_state(self):
+        """Test that the shared bucket paces like TokenBucket and backs a limiter."""
+        fake = FakeTime()
+        bucket = SharedTokenBucket(10, burst=2, clock=fake.clock, sleep=fake.sleep)
+        limiter = RateLimiter(bucket=bucket)
+
+        for _ in range(4):
+            bucket.acquire()
+        bucket.throttle()
+
+        assert fake.now == pytest.approx(0.2)
+        assert limiter.rate("payments.read") == 5
+        with pytest.raises(ValueError):
+            RateLimiter()
+
+
+class TestRateLimitedClient:
+    """Test 429 handling in HttpClient."""
+
+    def test_429_is_retried_after_retry_after(self, monkeypatch):
+        """Test that a throttled GET waits for Retry-After and succeeds."""
+        fake = FakeTime()
+        calls = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(fake.now)
+            if len(calls) == 1:
+                raise throttled(request)
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        limiter = RateLimiter(100, clock=fake.clock, sleep=fake.sleep)
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", rate_limiter=limiter
+        )
+
+        assert client.payments.get("pay_1").payment_id == "pay_1"
+        assert calls[1] - calls[0] >= 2
+        assert limiter.rate("payments.read") == 51
+
+    def test_429_does_not_resend_unkeyed_posts(self, monkeypatch):
+        """Test that a throttled mutation without a key surfaces the 429."""
+        fake = FakeTime()
+        calls = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(request.method)
+            raise throttled(request, retry_after="0")
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        limiter = RateLimiter(10, clock=fake.clock, sleep=fake.sleep)
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", rate_limiter=limiter
+        )
+
+        with pytest.raises(ApiError) as exc:
+            client.payments.capture("pay_1")
+
+        assert exc.value.status == 429
+        assert calls == ["POST"]
+        assert limiter.rate("payments.write") == 5
+
+    def test_429_resends_keyed_posts(self, monkeypatch):
+        """Test that a mutation with an Idempotency-Key is resent after a 429."""
+        fake = FakeTime()
+        calls = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append((request.method, request.get_header("Idempotency-key")))
+            if len(calls) == 1:
+                raise throttled(request, retry_after=None)
+            return FakeResponse(200, {"paymentId": "pay_1", "status": "COMPLETED"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            rate_limiter=RateLimiter(10, clock=fake.clock, sleep=fake.sleep),
+        )
+
+        result = client.payments.capture("pay_1", idempotency_key="cap_1")
+
+        assert result.status == "COMPLETED"
+        assert calls == [("POST", "cap_1"), ("POST", "cap_1")]
+
+    def test_long_retry_after_is_not_waited(self, monkeypatch):
+        """Test that a Retry-After beyond max_wait surfaces the 429."""
+        fake = FakeTime()
+
+        def fake_urlopen(request, timeout=0):
+            raise throttled(request, retry_after="600")
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            rate_limiter=RateLimiter(
+                10, max_wait=30, clock=fake.clock, sleep=fake.sleep
+            ),
+        )
+
+        with pytest.raises(ApiError) as exc:
+            client.payments.get("pay_1")
+
+        assert exc.value.status == 429
+        assert exc.value.code == "E_RATE_LIMIT"
+
+    def test_429_without_limiter_is_not_retried(self, monkeypatch):
+        """Test that the default client keeps surfacing 429 immediately."""
+        calls = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(1)
+            raise throttled(request)
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+
+        with pytest.raises(ApiError):
+            client.payments.get("pay_1")
+
+        assert len(calls) == 1
+
+    def test_exhausted_remaining_header_pauses(self, monkeypatch):
+        """Test that RateLimit-Remaining: 0 delays the next request until reset."""
+        fake = FakeTime()
+        calls = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(fake.now)
+            return FakeResponse(
+                200,
+                {"providers": []},
+                {"RateLimit-Remaining": "0", "RateLimit-Reset": "5"},
+            )
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            rate_limiter=RateLimiter(100, clock=fake.clock, sleep=fake.sleep),
+        )
+
+        client.providers.list()
+        client.providers.list()
+
+        assert calls[1] - calls[0] >= 5
+
+    def test_endpoint_groups_have_their_own_limits(self):
+        """Test per-group buckets and classification."""
+        limiter = RateLimiter(100, groups={"payments.create": (5, 1)})
+
+        assert limiter.classify("POST", "/api/payments/create") == "payments.create"
+        assert limiter.classify("GET", "/api/payments/pay_1") == "payments.read"
+        assert limiter.classify("GET", "/api/providers") == "providers"
+        assert limiter.rate("payments.create") == 5
+        assert limiter.rate("payments.read") == 100
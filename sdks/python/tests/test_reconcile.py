@@ -0,0 +1,205 @@
+"""Tests for the streaming reconciliation pipeline."""
+
+from __future__ import annotations
+
+import io
+import json
+from urllib.error import HTTPError
+
+import pytest
+
+from delopay import DelopayClient
+from delopay.reconcile import LedgerRecord, main, read_ledger, reconcile
+
+PAYMENTS = {
+    "order_1": {"status": "COMPLETED", "amount": 10.0, "amountPaid": 10.0},
+    "order_2": {"status": "PENDING", "amount": 20.0, "amountPaid": 0.0},
+    "order_3": {"status": "COMPLETED", "amount": 30.0, "amountPaid": 29.0},
+}
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+@pytest.fixture
+def client(monkeypatch):
+    requested = []
+
+    def fake_urlopen(request, timeout=0):
+        order_id = request.full_url.rsplit("/", 1)[1]
+        requested.append(order_id)
+        if order_id not in PAYMENTS:
+            raise HTTPError(
+                url=request.full_url,
+                code=404,
+                msg="Not Found",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Payment not found"}'),
+            )
+        payment = {"paymentId": f"pay_{order_id}", "clientOrderId": order_id}
+        return FakeResponse(200, {**payment, **PAYMENTS[order_id]})
+
+    monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+    client = DelopayClient(
+        api_key="test_key", base_url="https://api.test.com", lazy_models=True
+    )
+    client.requested = requested
+    return client
+
+
+def ledger() -> list[LedgerRecord]:
+    return [
+        LedgerRecord("order_1", "COMPLETED", 10.0, 10.0),
+        LedgerRecord("order_2", "COMPLETED", 20.0, None),
+        LedgerRecord("order_3", None, 30.0, 30.0),
+        LedgerRecord("order_4", "COMPLETED", 5.0, None),
+    ]
+
+
+def read_output(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestReadLedger:
+    """Test lazy ledger parsing."""
+
+    def test_csv_and_jsonl(self, tmp_path):
+        """Test both formats, column aliases and empty cells."""
+        csv_path = tmp_path / "orders.csv"
+        csv_path.write_text(
+            "client_order_id,status,amount,amount_paid\norder_1,completed,10,\n"
+        )
+        jsonl_path = tmp_path / "orders.jsonl"
+        jsonl_path.write_text(
+            '{"clientOrderId": "order_2", "amountPaid": 3}\n\n'
+            '{"clientOrderId": "order_3", "status": "FAILED"}\n'
+        )
+
+        assert list(read_ledger(csv_path)) == [
+            LedgerRecord("order_1", "COMPLETED", 10.0, None)
+        ]
+        assert list(read_ledger(jsonl_path)) == [
+            LedgerRecord("order_2", None, None, 3.0),
+            LedgerRecord("order_3", "FAILED", None, None),
+        ]
+
+    def test_missing_order_id(self, tmp_path):
+        """Test that rows without an order ID are rejected."""
+        path = tmp_path / "orders.csv"
+        path.write_text("status\nCOMPLETED\n")
+
+        with pytest.raises(ValueError):
+            list(read_ledger(path))
+
+
+class TestReconcile:
+    """Test comparison, output and resumption."""
+
+    def test_writes_mismatches_in_input_order(self, client, tmp_path):
+        """Test that only differing, missing or failed orders are written."""
+        output = tmp_path / "mismatches.jsonl"
+
+        stats = reconcile(client.payments, ledger(), output, max_workers=4)
+
+        assert read_output(output) == [
+            {
+                "clientOrderId": "order_2",
+                "result": "mismatch",
+                "paymentId": "pay_order_2",
+                "fields": {"status": {"expected": "COMPLETED", "actual": "PENDING"}},
+            },
+            {
+                "clientOrderId": "order_3",
+                "result": "mismatch",
+                "paymentId": "pay_order_3",
+                "fields": {"amount_paid": {"expected": 30.0, "actual": 29.0}},
+            },
+            {"clientOrderId": "order_4", "result": "missing"},
+        ]
+        assert (stats.checked, stats.matched, stats.mismatched) == (4, 1, 2)
+        assert stats.missing == 1
+
+    def test_resumes_from_checkpoint(self, client, tmp_path):
+        """Test that an interrupted run continues without duplicates."""
+        output = tmp_path / "mismatches.jsonl"
+        checkpoint = tmp_path / "run.ckpt"
+
+        def interrupted():
+            yield from ledger()[:3]
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            reconcile(
+                client.payments,
+                interrupted(),
+                output,
+                max_workers=1,
+                checkpoint=checkpoint,
+                checkpoint_every=1,
+            )
+        first_run = list(client.requested)
+        stats = reconcile(
+            client.payments, ledger(), output, max_workers=1, checkpoint=checkpoint
+        )
+
+        resumed = client.requested[len(first_run) :]
+        assert "order_1" not in resumed
+        assert "order_4" in resumed
+        assert [entry["clientOrderId"] for entry in read_output(output)] == [
+            "order_2",
+            "order_3",
+            "order_4",
+        ]
+        assert stats.checked == 4
+
+
+class TestCli:
+    """Test the command-line entry point."""
+
+    def test_main(self, client, tmp_path, monkeypatch, capsys):
+        """Test the exit status and summary."""
+        monkeypatch.setenv("DELOPAY_API_KEY", "test_key")
+        ledger_path = tmp_path / "orders.csv"
+        ledger_path.write_text("client_order_id,status\norder_1,COMPLETED\n")
+        output = tmp_path / "out.jsonl"
+
+        status = main([str(ledger_path), "--output", str(output)])
+
+        assert status == 0
+        assert json.loads(capsys.readouterr().out)["matched"] == 1
+        assert output.read_text() == ""
+
+    def test_interrupt_message_goes_to_stderr(
+        self, client, tmp_path, monkeypatch, capsys
+    ):
+        """Test that Ctrl-C keeps stdout free for the report."""
+
+        def interrupted(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        monkeypatch.setenv("DELOPAY_API_KEY", "test_key")
+        monkeypatch.setattr("delopay.reconcile.reconcile", interrupted)
+        ledger_path = tmp_path / "orders.csv"
+        ledger_path.write_text("client_order_id,status\norder_1,COMPLETED\n")
+
+        status = main([str(ledger_path), "--output", str(tmp_path / "out.jsonl")])
+
+        captured = capsys.readouterr()
+        assert status == 130
+        assert captured.out == ""
+        assert "--checkpoint" in captured.err
@@ -0,0 +1,258 @@
+"""Tests for call deadlines, backoff jitter and the retry budget."""
+
+from __future__ import annotations
+
+import io
+import json
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+from delopay import ApiError, DelopayClient, RateLimiter, RetryBudget
+from delopay.http import BACKOFF_CAP_SECONDS, backoff_delay
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict | None = None) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        if self._payload is None:
+            return b""
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def server_error(request):
+    return HTTPError(
+        url=request.full_url,
+        code=503,
+        msg="Service Unavailable",
+        hdrs={},
+        fp=io.BytesIO(b'{"message":"Provider down"}'),
+    )
+
+
+class TestRetryBudget:
+    """Test the retry budget accounting."""
+
+    def test_retries_are_limited_to_ratio_of_requests(self):
+        """Test that each request deposits a fraction of a retry."""
+        budget = RetryBudget(0.5, min_per_second=0, clock=FakeClock())
+
+        for _ in range(4):
+            budget.record_request()
+
+        assert budget.try_spend()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+
+    def test_reserve_allows_retries_without_traffic(self):
+        """Test the minimum retries per second."""
+        budget = RetryBudget(0, min_per_second=0.2, ttl=10, clock=FakeClock())
+
+        assert budget.try_spend()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+
+    def test_deposits_and_withdrawals_expire(self):
+        """Test that the budget only reflects the last ttl seconds."""
+        clock = FakeClock()
+        budget = RetryBudget(1, min_per_second=0, ttl=10, clock=clock)
+        budget.record_request()
+        assert budget.try_spend()
+        assert budget.available() == 0
+
+        clock.now += 5
+        budget.record_request()
+        assert budget.available() == 1
+
+        clock.now += 6
+        assert budget.available() == 1
+        clock.now += 5
+        assert budget.available() == 0
+
+    def test_invalid_configuration(self):
+        """Test that nonsensical budgets are rejected."""
+        with pytest.raises(ValueError):
+            RetryBudget(-1)
+        with pytest.raises(ValueError):
+            RetryBudget(ttl=0)
+
+
+class TestClientRetries:
+    """Test deadline and budget enforcement in the HTTP client."""
+
+    def test_exhausted_budget_stops_retries(self, monkeypatch):
+        """Test that a GET is not retried once the budget is spent."""
+        calls = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(request.full_url)
+            raise URLError("offline")
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        budget = RetryBudget(0, min_per_second=0)
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            max_retries=3,
+            retry_budget=budget,
+        )
+
+        with pytest.raises(ApiError):
+            client.payments.get("pay_1")
+
+        assert len(calls) == 1
+        assert client.retry_budget is budget
+
+    def test_budget_permits_retries(self, monkeypatch):
+        """Test that retries proceed while budget remains."""
+        calls = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(request.full_url)
+            if len(calls) == 1:
+                raise server_error(request)
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        monkeypatch.setattr("delopay.http.backoff_delay", lambda attempt: 0)
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            retry_budget=RetryBudget(),
+        )
+
+        assert client.payments.get("pay_1").payment_id == "pay_1"
+        assert len(calls) == 2
+
+    def test_deadline_caps_attempt_timeout(self, monkeypatch):
+        """Test that a single attempt cannot outlive the call deadline."""
+        timeouts = []
+
+        def fake_urlopen(request, timeout=0):
+            timeouts.append(timeout)
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            timeout_ms=30_000,
+            deadline_ms=500,
+        )
+        client.payments.get("pay_1")
+
+        assert 0 < timeouts[0] <= 0.5
+
+    def test_deadline_skips_retries_that_cannot_start_in_time(self, monkeypatch):
+        """Test that no backoff sleep runs past the deadline."""
+        calls = []
+        sleeps = []
+
+        def fake_urlopen(request, timeout=0):
+            calls.append(request.full_url)
+            raise URLError("offline")
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        monkeypatch.setattr("delopay.http.backoff_delay", lambda attempt: 1.0)
+        monkeypatch.setattr("delopay.http.time.sleep", sleeps.append)
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            max_retries=5,
+            deadline_ms=500,
+        )
+
+        with pytest.raises(ApiError) as exc:
+            client.payments.get("pay_1")
+
+        assert exc.value.message == "Network request failed"
+        assert len(calls) == 1
+        assert sleeps == []
+
+    def test_expired_deadline_fails_without_sending(self, monkeypatch):
+        """Test the deadline error when no time is left for an attempt."""
+
+        def fake_urlopen(request, timeout=0):
+            raise AssertionError("no request expected")
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", deadline_ms=0
+        )
+
+        with pytest.raises(ApiError) as exc:
+            client.payments.get("pay_1")
+
+        assert exc.value.code == "DEADLINE_EXCEEDED"
+
+    def test_deadline_is_not_spent_waiting_for_the_limiter(self, monkeypatch):
+        """Test that a limiter pause longer than the deadline fails fast."""
+        sleeps: list = []
+
+        def fake_urlopen(request, timeout=0):
+            raise AssertionError("no request expected")
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        limiter = RateLimiter(100, sleep=sleeps.append)
+        limiter.observe("payments.read", 429, {"Retry-After": "3"})
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            deadline_ms=200,
+            rate_limiter=limiter,
+        )
+
+        with pytest.raises(ApiError) as exc:
+            client.payments.get("pay_1")
+
+        assert exc.value.code == "DEADLINE_EXCEEDED"
+        assert sleeps == []
+
+    def test_connect_timeout_is_passed_to_pool(self, monkeypatch):
+        """Test that pooled requests carry their own connect timeout."""
+        captured = {}
+
+        def fake_urlopen(request, timeout=0):
+            captured["connect"] = request.connect_timeout
+            captured["read"] = timeout
+            return FakeResponse(200, {"paymentId": "pay_1"})
+
+        monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+        client = DelopayClient(
+            api_key="test_key",
+            base_url="https://api.test.com",
+            timeout_ms=10_000,
+            connect_timeout_ms=2_000,
+        )
+        client.payments.get("pay_1")
+
+        assert captured == {"connect": 2.0, "read": 10.0}
+
+
+def test_backoff_uses_full_jitter():
+    """Test that backoff delays are spread between zero and the cap."""
+    delays = [backoff_delay(attempt) for attempt in range(10) for _ in range(20)]
+
+    assert all(0 <= delay <= BACKOFF_CAP_SECONDS for delay in delays)
+    assert len(set(delays)) > 1
+    assert max(backoff_delay(0) for _ in range(50)) <= 0.1
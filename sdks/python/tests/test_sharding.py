@@ -0,0 +1,168 @@
+"""Tests for the multi-process sharded executor."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from delopay import ApiError, PaymentResponse, ShardedExecutor
+from delopay.sharding import get_payment
+
+CLIENT_OPTIONS = {"api_key": "key", "base_url": "http://127.0.0.1:9"}
+
+
+def double(client, key):
+    return key * 2
+
+
+def fail_on_three(client, key):
+    if key == 3:
+        raise ValueError("bad key")
+    return key
+
+
+def slow(client, key):
+    time.sleep(0.05)
+    return key
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        payment_id = self.path.rsplit("/", 1)[-1]
+        if payment_id.startswith("missing"):
+            self._send(404, {"message": "Not found", "code": "E_NOT_FOUND"})
+        else:
+            self._send(200, {"paymentId": payment_id, "status": "PENDING"})
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    host, port = httpd.server_address
+    yield f"http://{host}:{port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestShardedExecutor:
+    """Test partitioning, aggregation and shutdown."""
+
+    def test_results_and_stats(self):
+        """Test that every key is processed once and counted per shard."""
+        executor = ShardedExecutor(
+            double, client_options=CLIENT_OPTIONS, processes=2, chunk_size=4
+        )
+
+        results = dict(executor.map(range(50)))
+
+        assert results == {key: key * 2 for key in range(50)}
+        stats = executor.stats()
+        assert (stats.processes, stats.submitted, stats.succeeded) == (2, 50, 50)
+        assert sum(stats.per_shard) == 50
+
+    def test_api_errors_are_yielded(self, server):
+        """Test real requests per process, with errors sent back to the parent."""
+        executor = ShardedExecutor(
+            get_payment,
+            client_options={"api_key": "key", "base_url": server, "max_retries": 0},
+            processes=2,
+            threads=2,
+        )
+
+        results = dict(executor.map(["pay_1", "missing_1", "pay_2"]))
+
+        assert isinstance(results["pay_1"], PaymentResponse)
+        assert results["pay_2"].payment_id == "pay_2"
+        assert isinstance(results["missing_1"], ApiError)
+        assert results["missing_1"].code == "E_NOT_FOUND"
+        assert executor.stats().failed == 1
+
+    def test_results_arrive_while_input_is_idle(self):
+        """Test that finished calls are handed over before more input comes."""
+        first_result = threading.Event()
+
+        def keys():
+            yield 1
+            # Hold back the rest until the first result has been received.
+            first_result.wait(10)
+            yield 2
+
+        executor = ShardedExecutor(
+            double, client_options=CLIENT_OPTIONS, processes=1, chunk_size=1
+        )
+        results = []
+        started = time.monotonic()
+        for key, value in executor.map(keys()):
+            results.append((key, value))
+            first_result.set()
+
+        assert results == [(1, 2), (2, 4)]
+        assert time.monotonic() - started < 10
+
+    def test_rate_limit_is_shared(self):
+        """Test that the global rate bounds all processes together."""
+        executor = ShardedExecutor(
+            get_payment,
+            client_options={**CLIENT_OPTIONS, "max_retries": 0},
+            processes=2,
+            rate=20,
+            burst=1,
+            chunk_size=1,
+        )
+
+        started = time.monotonic()
+        outcomes = [outcome for _, outcome in executor.map(map(str, range(11)))]
+
+        # Eleven requests from a bucket of one token refilling at 20/s.
+        assert time.monotonic() - started >= 0.5
+        assert all(isinstance(outcome, ApiError) for outcome in outcomes)
+
+    def test_task_exceptions_propagate(self):
+        """Test that a failing task stops the run and is re-raised."""
+        executor = ShardedExecutor(
+            fail_on_three, client_options=CLIENT_OPTIONS, processes=2
+        )
+
+        with pytest.raises(ValueError, match="bad key"):
+            list(executor.map(range(10)))
+        assert multiprocessing.active_children() == []
+
+    def test_leaving_early_stops_workers(self):
+        """Test that closing the iterator shuts every process down."""
+        executor = ShardedExecutor(
+            slow, client_options=CLIENT_OPTIONS, processes=2, threads=2
+        )
+
+        results = executor.map(range(10_000))
+        next(results)
+        results.close()
+
+        assert multiprocessing.active_children() == []
+        assert executor.stats().submitted < 10_000
+
+    def test_invalid_configuration(self):
+        """Test argument validation."""
+        with pytest.raises(ValueError):
+            ShardedExecutor(double, client_options=CLIENT_OPTIONS, processes=0)
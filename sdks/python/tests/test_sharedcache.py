@@ -0,0 +1,222 @@
+"""Tests for the cross-process shared cache."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+
+import pytest
+
+from delopay import (
+    DelopayClient,
+    PaymentResponse,
+    PaymentStatus,
+    PaymentStore,
+    ProviderListResponse,
+    SharedCache,
+)
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "delopay.cache"
+
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    calls: list = []
+
+    def fake_urlopen(request, timeout=0):
+        calls.append(request.full_url)
+        if request.full_url.endswith("/client-config"):
+            return FakeResponse(200, {"provider": "STRIPE", "clientId": "id"})
+        return FakeResponse(
+            200,
+            {"providers": [{"id": "STRIPE", "supportedCurrencies": ["EUR", "USD"]}]},
+        )
+
+    monkeypatch.setattr("delopay.http.urlopen", fake_urlopen)
+    return calls
+
+
+def payment(status: str = "PENDING") -> PaymentResponse:
+    return PaymentResponse.from_dict(
+        {
+            "paymentId": "pay_1",
+            "clientOrderId": "order_1",
+            "status": status,
+            "amount": 10.5,
+            "metadata": {"source": "test", "tags": ["a", "b"]},
+        }
+    )
+
+
+def read_in_child(path, key, queue) -> None:
+    cache = SharedCache(path)
+    queue.put(cache.get(key))
+    cache.close()
+
+
+class TestSharedCache:
+    """Test storage, expiry and invalidation."""
+
+    def test_models_round_trip_between_instances(self, path):
+        """Test that one instance reads dataclasses and enums written by another."""
+        writer = SharedCache(path)
+        reader = SharedCache(path)
+        writer.set(("payment", "pay_1"), payment())
+
+        result = reader.get(("payment", "pay_1"))
+
+        assert result == payment()
+        assert result.status is PaymentStatus.PENDING
+        assert reader.get(("payment", "pay_2")) is None
+        assert (reader.stats().hits, reader.stats().misses) == (1, 1)
+
+    def test_entries_expire(self, path):
+        """Test the default TTL and per-operation TTLs."""
+        clock = FakeClock()
+        cache = SharedCache(path, ttl=10, ttls={"list": 100}, clock=clock)
+        cache.set(("config", "stripe"), "a")
+        cache.set(("list",), "b")
+
+        clock.now += 50
+
+        assert cache.get(("config", "stripe")) is None
+        assert cache.get(("list",)) == "b"
+
+    def test_invalidate_reaches_other_instances(self, path):
+        """Test invalidation by prefix and of everything."""
+        first = SharedCache(path)
+        second = SharedCache(path)
+        for name in ("a", "b"):
+            first.set(("config", name), name)
+        first.set(("list",), "all")
+
+        second.invalidate("config", "a")
+        assert first.get(("config", "a")) is None
+        assert first.get(("config", "b")) == "b"
+        second.invalidate()
+        assert first.get(("list",)) is None
+        first.set(("list",), "again")
+        assert second.get(("list",)) == "again"
+
+    def test_full_probe_window_evicts(self, path):
+        """Test that keys beyond the slot count replace the soonest to expire."""
+        cache = SharedCache(path, slots=4)
+        for index in range(6):
+            cache.set(("key", index), index, ttl=100 + index)
+
+        assert sum(cache.get(("key", index)) is not None for index in range(6)) == 4
+        assert cache.get(("key", 5)) == 5
+        assert cache.stats().evictions == 2
+
+    def test_oversized_values_are_not_stored(self, path):
+        """Test that a value larger than a slot is loaded but not kept."""
+        cache = SharedCache(path, slot_size=256)
+
+        value = cache.get_or_load(("big",), lambda: "x" * 1000)
+
+        assert value == "x" * 1000
+        assert not cache.set(("big",), value)
+        assert cache.get(("big",)) is None
+
+    def test_other_processes_see_entries(self, path):
+        """Test that a separate process reads what this one wrote."""
+        SharedCache(path).set(("list",), payment())
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        child = context.Process(target=read_in_child, args=(path, ("list",), queue))
+        child.start()
+        result = queue.get(timeout=30)
+        child.join()
+
+        assert result == payment()
+
+    def test_configuration_errors(self, path):
+        """Test rejection of slots too small to hold an entry."""
+        with pytest.raises(ValueError):
+            SharedCache(path, slot_size=16)
+        with pytest.raises(ValueError):
+            SharedCache(path).set(("value",), object())
+
+
+class TestIntegration:
+    """Test the providers and payments caching paths."""
+
+    def test_providers_warm_up_once_per_host(self, path, provider_calls):
+        """Test that a second client reads what the first one loaded."""
+        clients = [
+            DelopayClient(
+                api_key="key",
+                base_url="https://api.test.com",
+                providers_cache=SharedCache(path),
+            )
+            for _ in range(2)
+        ]
+
+        first = clients[0].providers.list()
+        second = clients[1].providers.list()
+        clients[0].providers.get_client_config("stripe")
+        clients[1].providers.get_client_config("stripe")
+
+        assert isinstance(second, ProviderListResponse)
+        assert second == first
+        assert second.providers[0].supported_currencies == ["EUR", "USD"]
+        assert len(provider_calls) == 2
+
+    def test_payment_store_shares_reads(self, path):
+        """Test lookups by either ID across stores and shared invalidation."""
+        first = PaymentStore(shared=SharedCache(path))
+        second = PaymentStore(shared=SharedCache(path))
+        first.put(payment())
+
+        assert second.get_by_order("order_1") == payment()
+        assert second.get("pay_1") == payment()
+        assert second.stats().shared_hits == 1
+
+        first.invalidate("pay_1")
+        third = PaymentStore(shared=SharedCache(path))
+        assert third.get("pay_1") is None
+        assert third.get_by_order("order_1") is None
+
+    def test_payment_store_is_scoped_to_the_api_key(self, path):
+        """Test that stores of different API keys never share payments."""
+        stores = {}
+        for api_key in ("key_a", "key_a", "key_b"):
+            store = PaymentStore(shared=SharedCache(path))
+            DelopayClient(api_key=api_key, payment_store=store)
+            stores.setdefault(api_key, []).append(store)
+        stores["key_a"][0].put(payment())
+
+        assert stores["key_a"][1].get("pay_1") == payment()
+        assert stores["key_b"][0].get("pay_1") is None
+        assert stores["key_b"][0].get_by_order("order_1") is None
+        with pytest.raises(ValueError):
+            DelopayClient(api_key="key_b", payment_store=stores["key_a"][0])
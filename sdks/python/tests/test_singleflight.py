@@ -0,0 +1,170 @@
+"""Tests for coalescing of concurrent identical GETs."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+
+import pytest
+
+from delopay import ApiError, DelopayClient
+from delopay.singleflight import SingleFlight
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict | None = None) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        if self._payload is None:
+            return b""
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def make_gated_urlopen(calls: list, release: threading.Event, status: int = 200):
+    lock = threading.Lock()
+
+    def fake_urlopen(request, timeout=0):
+        with lock:
+            calls.append((request.method, request.full_url))
+        release.wait(timeout=2)
+        if status >= 400:
+            raise HTTPError(
+                url=request.full_url,
+                code=status,
+                msg="Not Found",
+                hdrs={},
+                fp=io.BytesIO(b'{"message":"Payment not found"}'),
+            )
+        return FakeResponse(200, {"paymentId": "pay_1", "metadata": {"source": "api"}})
+
+    return fake_urlopen
+
+
+def run_concurrently(func, count: int, gate: threading.Event, flight: SingleFlight):
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(func) for _ in range(count)]
+        while flight.stats().coalesced < count - 1:
+            time.sleep(0.001)
+        gate.set()
+        return [future.exception() or future.result() for future in futures]
+
+
+class TestSingleFlight:
+    """Test request coalescing."""
+
+    def test_concurrent_gets_share_one_request(self, monkeypatch):
+        """Test that identical in-flight GETs hit the network once."""
+        calls: list = []
+        gate = threading.Event()
+        monkeypatch.setattr("delopay.http.urlopen", make_gated_urlopen(calls, gate))
+
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", coalesce_requests=True
+        )
+        results = run_concurrently(
+            lambda: client.payments.get("pay_1"), 5, gate, client.single_flight
+        )
+
+        assert len(calls) == 1
+        assert all(result.payment_id == "pay_1" for result in results)
+        assert client.single_flight.stats().coalesced == 4
+        assert client.single_flight.stats().leaders == 1
+
+    def test_followers_get_independent_copies(self, monkeypatch):
+        """Test that mutating one caller's result does not affect another."""
+        calls: list = []
+        gate = threading.Event()
+        monkeypatch.setattr("delopay.http.urlopen", make_gated_urlopen(calls, gate))
+
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", coalesce_requests=True
+        )
+        first, second = run_concurrently(
+            lambda: client.payments.get("pay_1"), 2, gate, client.single_flight
+        )
+        first.metadata["source"] = "mutated"
+
+        assert second.metadata == {"source": "api"}
+
+    def test_errors_are_shared(self, monkeypatch):
+        """Test that followers receive the leader's exception."""
+        calls: list = []
+        gate = threading.Event()
+        monkeypatch.setattr(
+            "delopay.http.urlopen", make_gated_urlopen(calls, gate, status=404)
+        )
+
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", coalesce_requests=True
+        )
+        errors = run_concurrently(
+            lambda: client.payments.get("pay_1"), 3, gate, client.single_flight
+        )
+
+        assert len(calls) == 1
+        assert all(isinstance(error, ApiError) for error in errors)
+        assert all(error.status == 404 for error in errors)
+
+    def test_mutations_are_never_coalesced(self, monkeypatch):
+        """Test that POSTs bypass coalescing."""
+        calls: list = []
+        gate = threading.Event()
+        gate.set()
+        monkeypatch.setattr("delopay.http.urlopen", make_gated_urlopen(calls, gate))
+
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", coalesce_requests=True
+        )
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda _: client.payments.capture("pay_1"), range(3)))
+
+        assert len(calls) == 3
+        assert client.single_flight.stats().leaders == 0
+
+    def test_sequential_calls_are_not_coalesced(self, monkeypatch):
+        """Test that only overlapping calls share a result."""
+        calls: list = []
+        gate = threading.Event()
+        gate.set()
+        monkeypatch.setattr("delopay.http.urlopen", make_gated_urlopen(calls, gate))
+
+        client = DelopayClient(
+            api_key="test_key", base_url="https://api.test.com", coalesce_requests=True
+        )
+        client.payments.get("pay_1")
+        client.payments.get("pay_1")
+
+        assert len(calls) == 2
+
+    def test_coalescing_is_opt_in(self):
+        """Test that the default client has no single-flight group."""
+        client = DelopayClient(api_key="test_key", base_url="https://api.test.com")
+
+        assert client.single_flight is None
+
+
+def test_leader_exception_propagates_to_leader():
+    """Test that the leader itself sees its own exception."""
+    flight = SingleFlight()
+
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", boom)
+    assert flight.do("key", lambda: 1) == 1
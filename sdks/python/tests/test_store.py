@@ -0,0 +1,175 @@
+"""Tests for the read-through payment store."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from delopay import DelopayClient, PaymentResponse, PaymentStatus, PaymentStore
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+
+class FakeApi:
+    """Serves one payment whose status can be changed."""
+
+    def __init__(self, status: str = "PENDING") -> None:
+        self.status = status
+        self.calls: list[tuple[str, str]] = []
+
+    def __call__(self, request, timeout=0):
+        self.calls.append((request.get_method(), request.full_url))
+        if request.full_url.endswith("/refund"):
+            return FakeResponse(200, {"refundId": "ref_1", "paymentId": "pay_1"})
+        if request.full_url.endswith("/capture"):
+            self.status = "COMPLETED"
+        return FakeResponse(
+            200,
+            {"paymentId": "pay_1", "clientOrderId": "order_1", "status": self.status},
+        )
+
+
+@pytest.fixture
+def fake_time():
+    return FakeTime()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = FakeApi()
+    monkeypatch.setattr("delopay.http.urlopen", api)
+    return api
+
+
+@pytest.fixture
+def client(fake_time):
+    return DelopayClient(
+        api_key="key",
+        base_url="https://api.test.com",
+        payment_store=PaymentStore(ttl=5, final_ttl=300, clock=fake_time.clock),
+    )
+
+
+def payment(index: int, status: str = "PENDING") -> PaymentResponse:
+    return PaymentResponse.from_dict(
+        {
+            "paymentId": f"pay_{index}",
+            "clientOrderId": f"order_{index}",
+            "status": status,
+        }
+    )
+
+
+class TestReadThrough:
+    """Test lookups through PaymentsClient."""
+
+    def test_both_indexes_share_one_read(self, client, api):
+        """Test that a read by ID answers a read by order ID and vice versa."""
+        first = client.payments.get("pay_1")
+        second = client.payments.get_by_order("order_1")
+
+        assert second is first
+        assert len(api.calls) == 1
+        assert client.payments.store.stats().hits == 1
+
+    def test_ttl_depends_on_status(self, client, api, fake_time):
+        """Test short TTLs for open payments and long ones for final payments."""
+        client.payments.get("pay_1")
+        fake_time.now = 6
+        client.payments.get("pay_1")
+        api.status = "COMPLETED"
+        fake_time.now = 12
+        client.payments.get("pay_1")
+        fake_time.now = 200
+        client.payments.get_by_order("order_1")
+
+        assert len(api.calls) == 3
+
+    def test_mutations_update_the_store(self, client, api):
+        """Test that capture stores its result and refund drops the payment."""
+        captured = client.payments.capture("pay_1")
+
+        assert client.payments.get("pay_1") is captured
+        assert captured.status is PaymentStatus.COMPLETED
+        client.payments.refund("pay_1", {"amount": 5})
+        client.payments.get_by_order("order_1")
+        assert [method for method, _ in api.calls] == ["POST", "POST", "GET"]
+
+    def test_polling_reads_past_the_store(self, client, api):
+        """Test that wait_for_status sees changes within the TTL."""
+        client.payments.get("pay_1")
+        api.status = "COMPLETED"
+
+        result = client.payments.wait_for_status("pay_1", "COMPLETED", timeout=1)
+
+        assert result.status is PaymentStatus.COMPLETED
+        assert client.payments.get("pay_1").status is PaymentStatus.COMPLETED
+        assert len(api.calls) == 2
+
+
+class TestPaymentStore:
+    """Test eviction and invalidation."""
+
+    def test_eviction_is_bounded(self):
+        """Test LRU eviction of both indexes."""
+        store = PaymentStore(max_entries=2)
+        store.put(payment(1))
+        store.put(payment(2))
+        store.get("pay_1")
+        store.put(payment(3))
+
+        assert len(store) == 2
+        assert store.get("pay_2") is None
+        assert store.get_by_order("order_2") is None
+        assert store.get_by_order("order_1").payment_id == "pay_1"
+        assert store.stats().evictions == 1
+
+    def test_invalidate(self):
+        """Test invalidation by either ID and of everything."""
+        store = PaymentStore()
+        for index in range(3):
+            store.put(payment(index))
+
+        store.invalidate("pay_0")
+        store.invalidate(client_order_id="order_1")
+        assert store.get_by_order("order_0") is None
+        assert store.get("pay_1") is None
+        assert len(store) == 1
+        store.invalidate()
+        assert len(store) == 0
+
+    def test_loads_do_not_overwrite_newer_writes(self):
+        """Test that a read finishing after a mutation is not stored."""
+        store = PaymentStore()
+
+        def load():
+            store.put(payment(1, "COMPLETED"))
+            return payment(1)
+
+        assert store.get_or_load("pay_1", load).status == "PENDING"
+        assert store.get("pay_1").status is PaymentStatus.COMPLETED
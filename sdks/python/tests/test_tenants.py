@@ -0,0 +1,175 @@
+"""Tests for multi-tenant clients sharing one transport."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+from urllib.error import HTTPError
+
+import pytest
+
+from delopay import DelopayClientFactory, PaymentStore, RateLimiter, TTLCache
+
+
+class FakeResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status: int, payload: dict) -> None:
+        self.status = status
+        self._payload = payload
+        self.headers = {}
+
+    def read(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeApi:
+    """Answers with data belonging to the calling API key."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str]] = []
+        self.pools: set[int] = set()
+        self.throttle: set[str] = set()
+        self.gate: threading.Event | None = None
+        self.lock = threading.Lock()
+
+    def __call__(self, request, timeout=0):
+        merchant = request.get_header("Authorization").removeprefix("Bearer ")
+        with self.lock:
+            self.calls.append((merchant, request.full_url))
+            self.pools.add(id(request.pool))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if merchant in self.throttle:
+            self.throttle.discard(merchant)
+            raise HTTPError(
+                url=request.full_url,
+                code=429,
+                msg="Too Many Requests",
+                hdrs={"Retry-After": "0"},
+                fp=io.BytesIO(b"{}"),
+            )
+        if "/api/providers" in request.full_url:
+            return FakeResponse(200, {"providers": [{"id": f"STRIPE_{merchant}"}]})
+        return FakeResponse(
+            200,
+            {"paymentId": "pay_1", "clientOrderId": merchant, "status": "PENDING"},
+        )
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = FakeApi()
+    monkeypatch.setattr("delopay.http.urlopen", api)
+    return api
+
+
+@pytest.fixture
+def factory():
+    with DelopayClientFactory(
+        base_url="https://api.test.com",
+        providers_cache=TTLCache(ttl=60),
+        coalesce_requests=True,
+        tenant_rate=100,
+    ) as factory:
+        yield factory
+
+
+class TestTenants:
+    """Test per-tenant views over the shared transport."""
+
+    def test_views_share_the_pool_and_are_reused(self, factory, api):
+        """Test that tenants use one pool and a key always gets the same view."""
+        first = factory.tenant("key_a", tenant_id="merchant_a")
+        second = factory.tenant("key_b")
+
+        first.payments.get("pay_1")
+        second.payments.get("pay_1")
+
+        assert factory.tenant("key_a") is first
+        assert len(api.pools) == 1
+        assert second.tenant_id != "key_b"
+        assert first.rate_limiter is not second.rate_limiter
+        with pytest.raises(ValueError):
+            factory.tenant("key_a", tenant_id="other")
+
+    def test_caches_are_keyed_by_tenant(self, factory, api):
+        """Test that provider data is cached and invalidated per tenant."""
+        first = factory.tenant("key_a")
+        second = factory.tenant("key_b")
+
+        assert first.providers.list().providers[0].id == "STRIPE_key_a"
+        assert second.providers.list().providers[0].id == "STRIPE_key_b"
+        first.providers.list()
+        first.providers.invalidate()
+        second.providers.list()
+        first.providers.list()
+
+        assert [merchant for merchant, _ in api.calls] == [
+            "key_a",
+            "key_b",
+            "key_a",
+        ]
+
+    def test_coalescing_never_crosses_tenants(self, factory, api):
+        """Test that identical concurrent reads by two keys are both sent."""
+        api.gate = threading.Event()
+        results = {}
+
+        def read(api_key: str) -> None:
+            results[api_key] = factory.tenant(api_key).payments.get("pay_1")
+
+        threads = [threading.Thread(target=read, args=(key,)) for key in "ab"]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 1
+        while len(api.calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        api.gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert {key: result.client_order_id for key, result in results.items()} == {
+            "a": "a",
+            "b": "b",
+        }
+
+    def test_rate_limits_and_metrics_are_per_tenant(self, factory, api):
+        """Test that a 429 throttles only the tenant that received it."""
+        api.throttle.add("key_a")
+        first = factory.tenant("key_a", tenant_id="a")
+        second = factory.tenant(
+            "key_b", tenant_id="b", rate_limiter=RateLimiter(rate=50)
+        )
+
+        first.payments.get("pay_1")
+        second.payments.get("pay_1")
+        second.payments.get("pay_1")
+
+        assert first.rate_limiter.rate() < 100
+        assert second.rate_limiter.rate() == 50
+        stats = factory.stats()
+        assert (stats["a"].requests, stats["a"].attempts) == (1, 2)
+        assert stats["a"].throttled == 1
+        assert (stats["b"].requests, stats["b"].throttled) == (2, 0)
+
+    def test_payment_stores_are_per_tenant(self, factory, api):
+        """Test that a tenant's store never answers another tenant."""
+        first = factory.tenant("key_a", payment_store=PaymentStore())
+        second = factory.tenant("key_b", payment_store=PaymentStore())
+
+        first.payments.get("pay_1")
+        second.payments.get("pay_1")
+        factory.discard("key_b")
+        factory.tenant("key_b").payments.get("pay_1")
+
+        assert len(api.calls) == 3
+        assert factory.tenant("key_b").payments.store is None